@@ -7,21 +7,46 @@ Compute Base Stat Totals (BST) for Pokémon JSON files, assign tiers, and export
 Usage (from project root):
     python bst_analysis.py --in site/out/mons --out site/_bst_analysis --tiers 6
 
+Input: when dex_build's columnar site/out/stats.json sits next to --in (and was written for the same
+mon files: count and newest mtime match) it is loaded in one read instead of parsing every mon file;
+--stats off forces the scan.
+
 Outputs (under --out, NOT in /out):
   - pokemon_bst_sorted.csv
   - pokemon_bst_tiers_<k>.csv
   - tiers/tier_1.json, tiers/tier_2.json, ..., tiers/tier_k.json
+    (with several k, e.g. --tiers 4,6,7: tiers_4/, tiers_6/, tiers_7/)
+
+Tier by a single stat with --metric (speed, attack, ...; files are then named pokemon_<metric>_*),
+and within groups with --group-by primaryType|secondaryType|type: every group gets the same
+files under by_<group-by>/<group>/ ("type" puts dual-types in both of their type groups).
+
+Reruns are incremental: --out/.bst_snapshot.json remembers every mon file's mtime/size, content hash
+and stats plus the last tier assignments, so only new or edited files are parsed, outputs whose
+bytes didn't change are left untouched, and species that moved tier since the previous run (same
+--metric/--group-by/k) are listed at the end. --no-snapshot runs from scratch without it.
 """
 
 from __future__ import annotations
 import argparse
+import bisect
+import hashlib
 import json
 import math
+import os
 import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable, List, Tuple
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # --- Key variants for base stats ---
 STAT_KEYS_ALIASES: Dict[str, Tuple[str, ...]] = {
     "hp": ("hp",),
@@ -34,6 +59,36 @@ STAT_KEYS_ALIASES: Dict[str, Tuple[str, ...]] = {
 
 ID_KEYS = ("id", "name", "slug", "identifier")
 
+# --- JSON codec: orjson when installed, stdlib otherwise (same choices as dex_build --json-backend) ---
+JSON_BACKENDS = ("auto", "orjson", "json")
+_JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+def set_json_backend(name: str):
+    global _JSON_BACKEND
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name == "orjson" and orjson is None:
+        raise SystemExit("JSON backend 'orjson' requested but orjson is not installed (pip install orjson)")
+    _JSON_BACKEND = name
+
+def json_loads(data: bytes):
+    if _JSON_BACKEND == "orjson":
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+def json_dumps(obj, compact: bool = False) -> bytes:
+    """indent=2 (or compact), unescaped UTF-8, trailing newline; platform newlines like a text-mode write."""
+    data = None
+    if _JSON_BACKEND == "orjson":
+        try:
+            data = orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE | (0 if compact else orjson.OPT_INDENT_2))
+        except TypeError:
+            pass  # non-str keys or >64-bit ints
+    if data is None:
+        text = json.dumps(obj, ensure_ascii=False, **({"separators": (",", ":")} if compact else {"indent": 2}))
+        data = (text + "\n").encode("utf-8")
+    return data if os.linesep == "\n" else data.replace(b"\n", os.linesep.encode("ascii"))
+
 @dataclass
 class MonRow:
     ident: str
@@ -45,6 +100,8 @@ class MonRow:
     special_defense: int
     speed: int
     source: Path
+    primary_type: str = ""
+    secondary_type: str = ""
 
 def find_first(d: Dict, keys: Iterable[str]):
     for k in keys:
@@ -103,38 +160,190 @@ def extract_id(obj: Dict) -> str | None:
                 return ident.strip()
     return None
 
-def scan_dir(input_dir: Path) -> List[MonRow]:
-    rows: List[MonRow] = []
-    for fp in sorted(input_dir.rglob("*.json")):
+def _parse_head(raw: bytes) -> Dict | None:
+    """
+    Parse only the part of a mon file up to its baseStats object (dex_build writes id/name/...
+    and baseStats before the bulky moves/spawns). The prefix is closed with '}' and parsed;
+    that only succeeds when baseStats is a top-level key, so a None here just means "parse it all".
+    """
+    key = raw.find(b'"baseStats"')
+    if key < 0:
+        return None
+    end = raw.find(b"}", key)
+    if end < 0:
+        return None
+    try:
+        head = json_loads(raw[:end + 1] + b"}")
+    except Exception:
+        return None
+    # the first ID key must be present too, or the full document could pick a different one
+    if not isinstance(head, dict) or not isinstance(head.get("id"), str) or not isinstance(head.get("baseStats"), dict):
+        return None
+    return head
+
+def _type_of(obj: Dict, key: str) -> str:
+    v = obj.get(key)
+    return v.strip().lower() if isinstance(v, str) else ""
+
+HEAD_BYTES = 8192  # baseStats sits well inside the first few KB of a dex_build mon file
+
+def _read_row(fp: Path, fast: bool, raw: bytes | None = None) -> Tuple[MonRow | None, str]:
+    """Row for one mon file; `raw` is the whole file when the caller already read it (to hash it)."""
+    try:
+        if raw is not None:
+            data = _parse_head(raw) if fast else None
+            mode = "fast"
+            if data is None:
+                data = json_loads(raw)
+                mode = "full"
+        else:
+            with fp.open("rb") as f:
+                raw = f.read(HEAD_BYTES) if fast else f.read()
+                data = _parse_head(raw) if fast else None
+                mode = "fast"
+                if data is None:
+                    raw += f.read()
+                    data = json_loads(raw)
+                    mode = "full"
+    except Exception:
+        return None, "unreadable"
+
+    bs = extract_base_stats(data) if isinstance(data, dict) else None
+    if not bs:
+        return None, "no baseStats"
+
+    ident = extract_id(data) or fp.stem
+    bst = bs["hp"] + bs["attack"] + bs["defense"] + bs["special_attack"] + bs["special_defense"] + bs["speed"]
+    return MonRow(
+        ident=ident,
+        bst=bst,
+        hp=bs["hp"],
+        attack=bs["attack"],
+        defense=bs["defense"],
+        special_attack=bs["special_attack"],
+        special_defense=bs["special_defense"],
+        speed=bs["speed"],
+        source=fp,
+        primary_type=_type_of(data, "primaryType"),
+        secondary_type=_type_of(data, "secondaryType"),
+    ), mode
+
+# --- Incremental runs: <out>/.bst_snapshot.json keeps each mon file's signature, hash and row ---
+SNAPSHOT_NAME = ".bst_snapshot.json"
+SNAPSHOT_VERSION = 1
+ROW_FIELDS = ("ident", "hp", "attack", "defense", "special_attack", "special_defense", "speed",
+              "primary_type", "secondary_type")
+
+def load_snapshot(path: Path) -> Dict:
+    try:
+        snap = json_loads(path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return snap if isinstance(snap, dict) and snap.get("version") == SNAPSHOT_VERSION else {}
+
+def _row_from_cache(fp: Path, cached: List) -> MonRow:
+    vals = dict(zip(ROW_FIELDS, cached))
+    bst = sum(vals[k] for k in ("hp", "attack", "defense", "special_attack", "special_defense", "speed"))
+    return MonRow(bst=bst, source=fp, **vals)
+
+def _scan_one(fp: Path, fast: bool, key: str, files_cache: Dict, by_hash: Dict) -> Tuple[MonRow | None, str, Dict]:
+    """(row, mode, snapshot entry); unchanged files (same mtime+size, or same content hash) are not parsed."""
+    try:
+        st = fp.stat()
+    except OSError:
+        return None, "unreadable", {}
+    sig = [st.st_mtime_ns, st.st_size]
+    cached = files_cache.get(key)
+    if cached and cached["sig"] == sig:
+        entry = cached
+    else:
         try:
-            with fp.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception:
-            continue
-
-        bs = extract_base_stats(data)
-        if not bs:
-            continue
+            raw = fp.read_bytes()
+        except OSError:
+            return None, "unreadable", {}
+        digest = hashlib.sha1(raw).hexdigest()
+        entry = by_hash.get(digest)
+        if entry is None:
+            row, mode = _read_row(fp, fast, raw)
+            cells = [getattr(row, f) for f in ROW_FIELDS] if row else None
+            return row, mode, {"sig": sig, "hash": digest, "row": cells, "mode": mode}
+        entry = {**entry, "sig": sig}  # touched or renamed, same bytes
+    if entry["row"] is None:
+        return None, entry["mode"], entry
+    return _row_from_cache(fp, entry["row"]), "cached", entry
+
+def scan_dir(input_dir: Path, workers: int = 0, fast: bool = True, files_cache: Dict | None = None) -> List[MonRow]:
+    """Rows for every *.json under input_dir. With `files_cache` (the snapshot's "files" map, updated
+    in place) only new or changed files are read."""
+    t0 = time.perf_counter()
+    files = sorted(input_dir.rglob("*.json"))
+    # snapshot keys: posix paths relative to input_dir (string slicing; Path.relative_to is slow per file)
+    base = 0 if str(input_dir) == "." else len(str(input_dir)) + 1  # Path(".").rglob yields bare names
+    keys = [str(fp)[base:].replace(os.sep, "/") for fp in files]
+    if files_cache is None:
+        read_one = lambda fp, key: (*_read_row(fp, fast), None)
+    else:
+        by_hash = {e["hash"]: e for e in files_cache.values()}
+        read_one = lambda fp, key: _scan_one(fp, fast, key, files_cache, by_hash)
+    # threads overlap file I/O (cold cache, network drives); parsing itself holds the GIL
+    workers = workers or min(8, os.cpu_count() or 1)
+    if workers > 1 and len(files) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(read_one, files, keys, chunksize=64))
+    else:
+        results = [read_one(fp, key) for fp, key in zip(files, keys)]
+
+    if files_cache is not None:
+        files_cache.clear()  # drops deleted files
+        files_cache.update((key, entry) for key, (_, _, entry) in zip(keys, results) if entry)
+    rows = [row for row, _, _ in results if row is not None]
+    modes = Counter(mode for _, mode, _ in results)
+    ms = (time.perf_counter() - t0) * 1000
+    detail = ", ".join(f"{n} {mode}" for mode, n in sorted(modes.items()))
+    print(f"Scanned {len(files)} files in {ms:.0f} ms ({detail}; {workers} threads)")
+    for fp, (_, mode, _) in zip(files, results):
+        if mode == "unreadable":
+            print(f"  skipped (unreadable JSON): {fp}")
+    return rows
 
-        ident = extract_id(data) or fp.stem
-        bst = bs["hp"] + bs["attack"] + bs["defense"] + bs["special_attack"] + bs["special_defense"] + bs["speed"]
-        rows.append(MonRow(
-            ident=ident,
-            bst=bst,
-            hp=bs["hp"],
-            attack=bs["attack"],
-            defense=bs["defense"],
-            special_attack=bs["special_attack"],
-            special_defense=bs["special_defense"],
-            speed=bs["speed"],
-            source=fp
-        ))
+def load_stats(stats_path: Path, mons_dir: Path) -> List[MonRow]:
+    """Rows from dex_build's columnar stats.json: one read, BST summed column-wise."""
+    cols = json_loads(stats_path.read_bytes())["columns"]
+    stat_cols = [cols[k] for k in ("hp", "attack", "defence", "special_attack", "special_defence", "speed")]
+    bsts = [None if None in vals else sum(vals) for vals in zip(*stat_cols)]
+    primary = cols.get("primaryType") or [""] * len(bsts)
+    secondary = cols.get("secondaryType") or [""] * len(bsts)
+    rows: List[MonRow] = []
+    for i, ident in enumerate(cols["id"]):
+        if bsts[i] is None:
+            continue  # incomplete baseStats (scan_dir skips these too)
+        hp, atk, de, spa, spd, spe = (c[i] for c in stat_cols)
+        rows.append(MonRow(ident=ident, bst=bsts[i], hp=hp, attack=atk, defense=de,
+                           special_attack=spa, special_defense=spd, speed=spe,
+                           source=mons_dir / f"{ident}.json",
+                           primary_type=(primary[i] or "").lower(), secondary_type=(secondary[i] or "").lower()))
     return rows
 
-def quantile_cutpoints(values: List[int], k: int) -> List[float]:
+def pick_stats_file(input_dir: Path, choice: str) -> Path | None:
+    if choice == "off":
+        return None
+    if choice != "auto":
+        return Path(choice)
+    cand = input_dir.parent / "stats.json"
+    if not cand.is_file():
+        return None
+    # only trust it if the mon files (same set scan_dir reads) are exactly the ones dex_build saw:
+    # same count and same newest mtime (cheap: stat only, no file is parsed)
+    mtimes = [fp.stat().st_mtime_ns for fp in input_dir.rglob("*.json")]
+    meta = json_loads(cand.read_bytes())
+    if meta.get("monFiles") != len(mtimes) or meta.get("monsMtimeNs") != max(mtimes, default=0):
+        return None
+    return cand
+
+def quantile_cutpoints(values: List[int], k: int, presorted: bool = False) -> List[float]:
     if k <= 1 or not values:
         return []
-    vs = sorted(values)
+    vs = values if presorted else sorted(values)
     cuts = []
     for i in range(1, k):
         pos = (len(vs) - 1) * (i / k)
@@ -148,23 +357,158 @@ def quantile_cutpoints(values: List[int], k: int) -> List[float]:
     return cuts
 
 def assign_tier(bst: int, cuts: List[float]) -> int:
-    for idx, c in enumerate(cuts, start=1):
-        if bst <= c:
-            return idx
-    return len(cuts) + 1
+    # first cut >= bst (cuts ascend); past the last cut -> top tier
+    return bisect.bisect_left(cuts, bst) + 1
+
+def inclusive_quantile(vs: List[int], i: int, n: int) -> float:
+    """i-th of the n-quantiles of sorted `vs`; same result as statistics.quantiles(..., method="inclusive")[i-1]."""
+    if len(vs) == 1:
+        return vs[0]
+    j, delta = divmod(i * (len(vs) - 1), n)
+    return (vs[j] * (n - delta) + vs[j + 1] * delta) / n
+
+def tier_sets(bst_sorted: List[int], ks: List[int]) -> Dict[int, Tuple[List[float], List[int]]]:
+    """k -> (cut points, tier per row) for every k, all from the one ascending BST list."""
+    out = {}
+    for k in ks:
+        cuts = quantile_cutpoints(bst_sorted, k, presorted=True)
+        out[k] = (cuts, [assign_tier(b, cuts) for b in bst_sorted])
+    return out
 
-def write_csv(path: Path, header: List[str], rows):
+METRICS = ("bst", "hp", "attack", "defense", "special_attack", "special_defense", "speed")
+GROUP_BYS = ("primaryType", "secondaryType", "type")
+
+def group_keys(r: MonRow, group_by: str) -> List[str]:
+    if group_by == "primaryType":
+        return [r.primary_type or "none"]
+    if group_by == "secondaryType":
+        return [r.secondary_type or "none"]
+    return sorted({t for t in (r.primary_type, r.secondary_type) if t}) or ["none"]
+
+def partition(rows_sorted: List[MonRow], metric: str, group_by: str) -> Dict[str, Tuple[List[MonRow], List[int]]]:
+    """One pass over the metric-sorted rows; each group's rows stay sorted, so no group is re-sorted."""
+    groups: Dict[str, Tuple[List[MonRow], List[int]]] = {}
+    for r in rows_sorted:
+        for g in group_keys(r, group_by):
+            g_rows, g_vals = groups.setdefault(g, ([], []))
+            g_rows.append(r)
+            g_vals.append(getattr(r, metric))
+    return dict(sorted(groups.items()))
+
+def write_tier_sets(rows_sorted: List[MonRow], values: List[int], ks: List[int], out_dir: Path,
+                    metric: str, verbose: bool = True, assignments: Dict | None = None,
+                    prefix: str = "") -> List[str]:
+    """pokemon_<metric>_tiers_<k>.csv + tiers/tier_N.json (tiers_<k>/ for several k) under out_dir.
+    Fills assignments["<prefix>k=<k>"] = {ident: [tier, value]} for the tier diff."""
+    written = []
+    n = len(values)
+    for k, (cuts, tiers) in tier_sets(values, ks).items():
+        tiers_csv = out_dir / f"pokemon_{metric}_tiers_{k}.csv"
+
+        # Prepare per-tier species lists and counts
+        tier_species: List[set[str]] = [set() for _ in range(k)]
+        tier_counts = [0] * k
+        tiered_rows = []
+
+        for r, v, t in zip(rows_sorted, values, tiers):  # t in 1..k
+            tiered_rows.append((r.ident, v, t))
+            tier_counts[t - 1] += 1
+            tier_species[t - 1].add(to_species_id(r.ident))
+        if assignments is not None:
+            assignments[f"{prefix}k={k}"] = {ident: [t, v] for ident, v, t in tiered_rows}
+
+        write_csv(tiers_csv, header=["ident", metric, "tier"], rows=tiered_rows)
+
+        # Friendly printout of tier boundaries with counts
+        if verbose:
+            print(f"\nTier boundaries for k={k} (quantile cutpoints):")
+            if not cuts:
+                print(f"  1 tier: all {n} Pokémon in the same tier.")
+            else:
+                bounds = [values[0]] + [round(c) for c in cuts] + [values[-1]]
+                for idx in range(1, k + 1):
+                    lo = bounds[idx - 1]
+                    hi = bounds[idx]
+                    lo_sym = "[" if idx == 1 else "("  # first bin inclusive, others (lo..hi]
+                    print(f"  Tier {idx}: {lo_sym}{lo}, {hi}]  count={tier_counts[idx-1]}")
+        else:
+            print(f"  {out_dir.name:16s} n={n:<4d} k={k}  cuts={[round(c) for c in cuts]}  counts={tier_counts}")
+
+        # --- NEW: write per-tier species JSONs ---
+        # one k keeps the historical tiers/ folder; several get tiers_<k>/ each
+        tiers_dir = out_dir / ("tiers" if len(ks) == 1 else f"tiers_{k}")
+        for idx in range(1, k + 1):
+            species_sorted = sorted(tier_species[idx - 1])
+            tier_path = tiers_dir / f"tier_{idx}.json"
+            write_json(tier_path, {"species": species_sorted})
+        written += [str(tiers_csv), f"{tiers_dir}/tier_*.json"]
+    return written
+
+def _slug(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in name) or "none"
+
+def parse_tiers(value: str) -> List[int]:
+    ks = []
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            k = max(1, int(part))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"--tiers expects integers like 7 or 4,6,7 (got {value!r})")
+        if k not in ks:
+            ks.append(k)
+    if not ks:
+        raise argparse.ArgumentTypeError("--tiers needs at least one value")
+    return ks
+
+_WRITES = Counter()
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    """Leave outputs whose bytes are unchanged alone (mtimes stay put for diff tools / sync)."""
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            _WRITES["unchanged"] += 1
+            return False
+    except OSError:
+        pass
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8", newline="") as f:
-        f.write(",".join(header) + "\n")
-        for r in rows:
-            f.write(",".join(str(x) for x in r) + "\n")
+    path.write_bytes(data)
+    _WRITES["rewritten"] += 1
+    return True
+
+def write_csv(path: Path, header: List[str], rows):
+    lines = [",".join(header)] + [",".join(str(x) for x in r) for r in rows]
+    _write_if_changed(path, ("\n".join(lines) + "\n").encode("utf-8"))
 
 def write_json(path: Path, obj: Dict):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+    _write_if_changed(path, json_dumps(obj))
+
+def print_tier_diff(prev: Dict, cur: Dict, label: str):
+    """Species that changed tier since the previous run, per tier set (same metric/grouping/k)."""
+    missing = [key for key in cur if key not in prev]
+    if missing:
+        scope = "" if len(missing) == len(cur) else f" for {len(missing)} of {len(cur)} tier sets"
+        print(f"\nTier changes: no previous run to compare against{scope}.")
+    for key, now in cur.items():
+        before = prev.get(key)
+        if before is None:
+            continue
+        moved = sorted((ident for ident in now if ident in before and before[ident][0] != now[ident][0]),
+                       key=lambda i: (now[i][0] - before[i][0], i))
+        added = sorted(set(now) - set(before))
+        removed = sorted(set(before) - set(now))
+        if not (moved or added or removed):
+            continue
+        print(f"\nTier changes ({key}): {len(moved)} moved, {len(added)} added, {len(removed)} removed")
+        for ident in moved:
+            (t0, v0), (t1, v1) = before[ident], now[ident]
+            print(f"  {ident:24s} tier {t0} -> {t1}  ({label} {v0} -> {v1})")
+        for ident in added:
+            print(f"  + {ident:22s} tier {now[ident][0]}  ({label} {now[ident][1]})")
+        for ident in removed:
+            print(f"  - {ident:22s} was tier {before[ident][0]}")
 
 def to_species_id(ident: str) -> str:
     """Ensure namespaced species ID (default to cobblemon:)."""
@@ -176,99 +520,118 @@ def main():
                     help="Input folder to scan for *.json (recursively).")
     ap.add_argument("--out", dest="output_dir", type=Path, default=Path("bst_analysis"),
                     help="Output folder (must NOT be inside /out).")
-    ap.add_argument("--tiers", dest="tiers", type=int, default=7,
-                    help="Number of quantile-based tiers.")
+    ap.add_argument("--tiers", dest="tiers", type=parse_tiers, default=[7],
+                    help="Number of quantile-based tiers; comma-separate several (e.g. 4,6,7) to write each set in one run.")
+    ap.add_argument("--metric", choices=METRICS, default="bst",
+                    help="Value to tier by: total BST (default) or a single base stat.")
+    ap.add_argument("--group-by", dest="group_by", choices=GROUP_BYS, default=None,
+                    help="Tier within each group instead of across all species (type = either type).")
     ap.add_argument("--show-top", dest="show_top", type=int, default=5,
-                    help="Console: show top N by BST.")
+                    help="Console: show top N by the metric.")
     ap.add_argument("--show-bottom", dest="show_bottom", type=int, default=5,
-                    help="Console: show bottom N by BST.")
+                    help="Console: show bottom N by the metric.")
+    ap.add_argument("--json-backend", choices=JSON_BACKENDS, default="auto",
+                    help="JSON parser/serializer: orjson if installed (auto), or force one.")
+    ap.add_argument("--workers", type=int, default=0,
+                    help="Scan: reader threads (0 = one per CPU, up to 8; 1 = sequential).")
+    ap.add_argument("--full-parse", action="store_true",
+                    help="Scan: always decode whole files (disable the baseStats-prefix fast path).")
+    ap.add_argument("--stats", default="auto",
+                    help="Columnar stats.json from dex_build: 'auto' (use <in>/../stats.json if current), a path, or 'off'.")
+    ap.add_argument("--no-snapshot", dest="snapshot", action="store_false",
+                    help=f"Ignore and don't update <out>/{SNAPSHOT_NAME} (rescan everything, no tier diff).")
     args = ap.parse_args()
+    set_json_backend(args.json_backend)
 
     # Guard: avoid writing into /out
     out_parts = [p.lower() for p in args.output_dir.parts]
     if "out" in out_parts:
         raise SystemExit("Refusing to write into a folder named 'out'. Choose a different --out directory.")
 
-    rows = scan_dir(args.input_dir)
+    snapshot_path = args.output_dir / SNAPSHOT_NAME
+    snapshot = load_snapshot(snapshot_path) if args.snapshot else {}
+    input_key = str(args.input_dir.resolve())
+    files_cache = snapshot.get("files", {}) if snapshot.get("input") == input_key else {}
+
+    stats_file = pick_stats_file(args.input_dir, args.stats)
+    if stats_file:
+        print(f"Reading columnar stats: {stats_file}")
+        rows = load_stats(stats_file, args.input_dir)
+    else:
+        rows = scan_dir(args.input_dir, workers=args.workers, fast=not args.full_parse,
+                        files_cache=files_cache if args.snapshot else None)
     if not rows:
         print(f"No Pokémon JSONs with baseStats found under: {args.input_dir}")
         return
 
-    rows_sorted = sorted(rows, key=lambda r: (r.bst, r.ident.lower()))
-    bst_values = [r.bst for r in rows_sorted]
+    # the only sort: everything below (percentiles, cut points, tiers, groups) reads this order
+    metric = args.metric
+    label = metric.upper() if metric == "bst" else metric
+    rows_sorted = sorted(rows, key=lambda r: (getattr(r, metric), r.ident.lower()))
+    values = [getattr(r, metric) for r in rows_sorted]
 
     # Stats
-    n = len(bst_values)
-    bst_min, bst_max = min(bst_values), max(bst_values)
-    bst_mean = statistics.fmean(bst_values)
-    bst_median = statistics.median(bst_values)
-    bst_stdev = statistics.pstdev(bst_values) if n > 1 else 0.0
+    n = len(values)
+    v_min, v_max = values[0], values[-1]
+    v_mean = statistics.fmean(values)
+    v_median = values[n // 2] if n % 2 else (values[n // 2 - 1] + values[n // 2]) / 2
+    v_stdev = statistics.pstdev(values) if n > 1 else 0.0
     p10, p25, p50, p75, p90 = (
-        statistics.quantiles(bst_values, n=10, method="inclusive")[0],
-        statistics.quantiles(bst_values, n=4, method="inclusive")[0],
-        bst_median,
-        statistics.quantiles(bst_values, n=4, method="inclusive")[2],
-        statistics.quantiles(bst_values, n=10, method="inclusive")[8],
+        inclusive_quantile(values, 1, 10),
+        inclusive_quantile(values, 1, 4),
+        v_median,
+        inclusive_quantile(values, 3, 4),
+        inclusive_quantile(values, 9, 10),
     )
 
     print(f"\nFound {n} Pokémon.")
-    print(f"BST  min={bst_min}  max={bst_max}  mean={bst_mean:.2f}  median={bst_median:.2f}  stdev={bst_stdev:.2f}")
+    print(f"{label}  min={v_min}  max={v_max}  mean={v_mean:.2f}  median={v_median:.2f}  stdev={v_stdev:.2f}")
     print(f"Pct  p10={p10:.0f}  p25={p25:.0f}  p50={p50:.0f}  p75={p75:.0f}  p90={p90:.0f}\n")
 
-    print("Bottom by BST:")
+    print(f"Bottom by {label}:")
     for r in rows_sorted[:args.show_bottom]:
         print(f"  {r.ident:20s}  BST={r.bst:4d}  (hp {r.hp}, atk {r.attack}, def {r.defense}, spa {r.special_attack}, spd {r.special_defense}, spe {r.speed})")
 
-    print("\nTop by BST:")
+    print(f"\nTop by {label}:")
     for r in rows_sorted[-args.show_top:]:
         print(f"  {r.ident:20s}  BST={r.bst:4d}  (hp {r.hp}, atk {r.attack}, def {r.defense}, spa {r.special_attack}, spd {r.special_defense}, spe {r.speed})")
 
     # Sorted CSV
-    sorted_csv = args.output_dir / "pokemon_bst_sorted.csv"
+    sorted_csv = args.output_dir / f"pokemon_{metric}_sorted.csv"
     write_csv(
         sorted_csv,
         header=["ident", "bst", "hp", "attack", "defense", "special_attack", "special_defense", "speed", "source_path"],
         rows=((r.ident, r.bst, r.hp, r.attack, r.defense, r.special_attack, r.special_defense, r.speed, str(r.source)) for r in rows_sorted),
     )
 
-    # Tiers + counts
-    k = max(1, args.tiers)
-    cuts = quantile_cutpoints(bst_values, k)
-    tiers_csv = args.output_dir / f"pokemon_bst_tiers_{k}.csv"
-
-    # Prepare per-tier species lists and counts
-    tier_species: List[set[str]] = [set() for _ in range(k)]
-    tier_counts = [0] * k
-    tiered_rows = []
-
-    for r in rows_sorted:
-        t = assign_tier(r.bst, cuts)  # 1..k
-        tiered_rows.append((r.ident, r.bst, t))
-        tier_counts[t - 1] += 1
-        tier_species[t - 1].add(to_species_id(r.ident))
-
-    write_csv(tiers_csv, header=["ident", "bst", "tier"], rows=tiered_rows)
-
-    # Friendly printout of tier boundaries with counts
-    print("\nTier boundaries (quantile cutpoints):")
-    if not cuts:
-        print(f"  1 tier: all {n} Pokémon in the same tier.")
+    # Tiers + counts: every requested k from the same sorted list (per group with --group-by)
+    written = [str(sorted_csv)]
+    assignments: Dict[str, Dict] = {}
+    if not args.group_by:
+        written += write_tier_sets(rows_sorted, values, args.tiers, args.output_dir, metric,
+                                   assignments=assignments, prefix=f"{metric} ")
     else:
-        bounds = [bst_min] + [round(c) for c in cuts] + [bst_max]
-        for idx in range(1, k + 1):
-            lo = bounds[idx - 1]
-            hi = bounds[idx]
-            lo_sym = "[" if idx == 1 else "("  # first bin inclusive, others (lo..hi]
-            print(f"  Tier {idx}: {lo_sym}{lo}, {hi}]  count={tier_counts[idx-1]}")
-
-    # --- NEW: write per-tier species JSONs ---
-    tiers_dir = args.output_dir / "tiers"
-    for idx in range(1, k + 1):
-        species_sorted = sorted(tier_species[idx - 1])
-        tier_path = tiers_dir / f"tier_{idx}.json"
-        write_json(tier_path, {"species": species_sorted})
-
-    print(f"\nWrote:\n  - {sorted_csv}\n  - {tiers_csv}\n  - {tiers_dir}/tier_*.json\n")
+        groups = partition(rows_sorted, metric, args.group_by)
+        print(f"\nTiers by {label} within each {args.group_by} ({len(groups)} groups):")
+        group_root = args.output_dir / f"by_{args.group_by}"
+        for g, (g_rows, g_vals) in groups.items():
+            write_tier_sets(g_rows, g_vals, args.tiers, group_root / _slug(g), metric, verbose=False,
+                            assignments=assignments, prefix=f"{metric} {args.group_by}={g} ")
+        written.append(f"{group_root}/<group>/pokemon_{metric}_tiers_*.csv + tiers*/tier_*.json")
+
+    print("\nWrote:\n" + "".join(f"  - {w}\n" for w in written))
+    print(f"{_WRITES['rewritten']} files rewritten, {_WRITES['unchanged']} unchanged")
+
+    if args.snapshot:
+        prev_tiers = snapshot.get("tiers", {})
+        print_tier_diff(prev_tiers, assignments, label)
+        # tier sets from other --metric/--group-by/--tiers runs are kept for their next diff
+        _write_if_changed(snapshot_path, json_dumps({
+            "version": SNAPSHOT_VERSION,
+            "input": input_key,
+            "files": files_cache,
+            "tiers": {**prev_tiers, **assignments},
+        }, compact=True))
 
 if __name__ == "__main__":
     main()
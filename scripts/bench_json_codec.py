@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compare dex_build's JSON backends (stdlib json vs orjson) on real generated data.
+
+Usage (from project root):
+    python scripts/bench_json_codec.py --in site/out --repeat 3
+
+Loads every *.json under --in into memory once, then for each available backend times
+parsing all files and serializing them back (indent=2, the out/ format). Also checks that
+each backend's output is byte-stable across repeats and reports whether the backends agree
+with each other and with the files on disk.
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import dex_build  # noqa: E402
+
+
+def _run(blobs, repeat):
+    best_load = best_dump = float("inf")
+    outputs = None
+    stable = True
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        objs = [dex_build.json_loads(b) for b in blobs]
+        t1 = time.perf_counter()
+        dumped = [dex_build.json_dumps(o) for o in objs]
+        t2 = time.perf_counter()
+        best_load = min(best_load, t1 - t0)
+        best_dump = min(best_dump, t2 - t1)
+        if outputs is not None and dumped != outputs:
+            stable = False
+        outputs = dumped
+    return best_load, best_dump, outputs, stable
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the JSON codec backends on generated data.")
+    ap.add_argument("--in", dest="input_dir", type=Path, default=Path("site/out"),
+                    help="Folder to scan for *.json (recursively).")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per backend; the best time is reported.")
+    args = ap.parse_args()
+
+    files = sorted(args.input_dir.rglob("*.json"))
+    if not files:
+        raise SystemExit(f"No JSON files under {args.input_dir}")
+    blobs = [fp.read_bytes() for fp in files]
+    print(f"{len(files)} files, {sum(map(len, blobs)) / 2**20:.1f} MB under {args.input_dir}")
+
+    backends = ["json"] + (["orjson"] if dex_build.orjson is not None else [])
+    if len(backends) == 1:
+        print("orjson is not installed; only the stdlib backend is measured (pip install orjson)")
+
+    results = {}
+    print(f"\n{'backend':8s} {'parse':>8s} {'serialize':>10s} {'stable':>7s} {'== disk':>8s}")
+    for name in backends:
+        dex_build.set_json_backend(name)
+        load_s, dump_s, outputs, stable = _run(blobs, max(1, args.repeat))
+        results[name] = (load_s, dump_s, outputs)
+        # files may have been generated on Windows (text-mode writes -> CRLF)
+        same_disk = sum(o == b.replace(b"\r\n", b"\n") for o, b in zip(outputs, blobs))
+        print(f"{name:8s} {load_s:7.3f}s {dump_s:9.3f}s {'yes' if stable else 'NO':>7s} {same_disk:4d}/{len(blobs)}")
+
+    if "orjson" in results:
+        (jl, jd, jout), (ol, od, oout) = results["json"], results["orjson"]
+        differing = [fp for fp, a, b in zip(files, jout, oout) if a != b]
+        print(f"\norjson speedup: parse {jl / ol:.1f}x, serialize {jd / od:.1f}x")
+        print(f"backends produce identical bytes for {len(files) - len(differing)}/{len(files)} files")
+        for fp in differing[:10]:
+            print(f"  differs: {fp}")
+
+
+if __name__ == "__main__":
+    main()
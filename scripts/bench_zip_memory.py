@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Peak-RSS benchmark for jar reading: the old zipfile read()/decode() path vs dex_build's mmap ArchiveReader.
+
+Usage (from project root):
+    python scripts/bench_zip_memory.py --size-mb 300
+
+Builds a synthetic jar (species-style JSON, a few very large JSON entries and PNG-sized blobs,
+mixing stored and deflated entries), then scans it once per reader and phase in a fresh subprocess:
+every *.json entry is parsed (phase "json") and every *.png entry is copied to a temp folder
+(phase "png"), exactly like collect_species/collect_sprites do. Reports peak RSS (VmHWM, or ru_maxrss off Linux) and wall time per reader.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM is per-process; ru_maxrss survives fork+exec on Linux and would report the parent's peak
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _species_json(rng: random.Random, i: int, target_bytes: int) -> str:
+    moves = []
+    body = {"name": f"Mon{i}", "nationalPokedexNumber": i, "primaryType": "normal",
+            "baseStats": {"hp": 50, "attack": 50, "defence": 50, "special_attack": 50,
+                          "special_defence": 50, "speed": 50},
+            "moves": moves}
+    size = 0
+    while size < target_bytes:
+        m = f"{rng.randint(1, 100)}:move_{rng.randint(0, 10**9)}"
+        moves.append(m)
+        size += len(m) + 8
+    return json.dumps(body, indent=2)
+
+
+def make_jar(path: Path, size_mb: int, seed: int = 1):
+    rng = random.Random(seed)
+    budget = size_mb * 1024 * 1024
+    written = 0
+    i = 0
+    with zipfile.ZipFile(path, "w") as z:
+        # a handful of very large entries (the ones that dominate peak memory)
+        for big in range(4):
+            text = _species_json(rng, 90000 + big, budget // 16)
+            z.writestr(f"data/cobblemon/species/big/big_{big}.json", text,
+                       compress_type=zipfile.ZIP_STORED if big % 2 == 0 else zipfile.ZIP_DEFLATED)
+            written += len(text)
+        for big in range(4):
+            blob = rng.randbytes(budget // 32)
+            z.writestr(f"assets/cobblemon/textures/gui/pokedex/big_{big}.png", blob,
+                       compress_type=zipfile.ZIP_STORED)
+            written += len(blob)
+        # many ordinary entries
+        while written < budget:
+            i += 1
+            text = _species_json(rng, i, rng.randint(4_000, 60_000))
+            z.writestr(f"data/cobblemon/species/generation{i % 9 + 1}/mon_{i}.json", text,
+                       compress_type=zipfile.ZIP_STORED if i % 2 else zipfile.ZIP_DEFLATED)
+            written += len(text)
+            if i % 5 == 0:
+                blob = rng.randbytes(rng.randint(2_000, 40_000))
+                z.writestr(f"assets/cobblemon/textures/gui/pokedex/mon_{i}.png", blob,
+                           compress_type=zipfile.ZIP_STORED)
+                written += len(blob)
+
+
+def scan_zipfile(jar: str, phase: str, out_dir: Path) -> int:
+    """The pre-ArchiveReader code path (z.open(...).read() then .decode())."""
+    n = 0
+    with zipfile.ZipFile(jar) as z:
+        for name in z.namelist():
+            if phase == "json" and name.endswith(".json"):
+                with z.open(name) as f:
+                    json.loads(f.read().decode("utf-8"))
+                n += 1
+            elif phase == "png" and name.endswith(".png"):
+                with z.open(name) as f_in, open(out_dir / Path(name).name, "wb") as f_out:
+                    f_out.write(f_in.read())
+                n += 1
+    return n
+
+
+def scan_mmap(jar: str, phase: str, out_dir: Path) -> int:
+    import dex_build
+    n = 0
+    with dex_build.open_archive(jar) as z:
+        for name in z.namelist():
+            if phase == "json" and name.endswith(".json"):
+                z.read_json(name)
+                n += 1
+            elif phase == "png" and name.endswith(".png"):
+                z.copy_to(name, out_dir / Path(name).name)
+                n += 1
+    return n
+
+
+READERS = {"zipfile": scan_zipfile, "mmap": scan_mmap}
+PHASES = ("json", "png")
+
+
+def child(reader: str, phase: str, jar: str):
+    # import the extractor up front in every child so module size doesn't skew the baseline
+    sys.path.insert(0, str(HERE))
+    import dex_build  # noqa: F401
+    with tempfile.TemporaryDirectory() as tmp:
+        base = _peak_rss_mb()
+        t0 = time.perf_counter()
+        n = READERS[reader](jar, phase, Path(tmp))
+        dt = time.perf_counter() - t0
+        print(json.dumps({"reader": reader, "phase": phase, "entries": n, "seconds": dt,
+                          "peak_rss_mb": _peak_rss_mb(), "baseline_rss_mb": base}))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare peak RSS of zipfile vs mmap jar reading.")
+    ap.add_argument("--size-mb", type=int, default=300, help="Approximate uncompressed size of the synthetic jar.")
+    ap.add_argument("--jar", type=Path, default=None, help="Benchmark an existing jar instead of a synthetic one.")
+    ap.add_argument("--child", nargs=3, metavar=("READER", "PHASE", "JAR"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jar = args.jar
+        if jar is None:
+            jar = Path(tmp) / "synthetic.jar"
+            t0 = time.perf_counter()
+            make_jar(jar, args.size_mb)
+            print(f"Built {jar.name}: {jar.stat().st_size / 2**20:.1f} MB on disk "
+                  f"(~{args.size_mb} MB uncompressed) in {time.perf_counter() - t0:.1f}s")
+
+        results = []
+        for phase in PHASES:
+            for reader in READERS:
+                # fresh interpreter per run so peak RSS is not shared
+                proc = subprocess.run([sys.executable, __file__, "--child", reader, phase, str(jar)],
+                                      check=True, capture_output=True, text=True, cwd=tmp,
+                                      env={**os.environ, "PYTHONHASHSEED": "0"})
+                results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"\n{'phase':6s} {'reader':10s} {'entries':>8s} {'time':>8s} {'peak RSS':>10s} {'over baseline':>14s}")
+    for r in results:
+        print(f"{r['phase']:6s} {r['reader']:10s} {r['entries']:8d} {r['seconds']:7.2f}s {r['peak_rss_mb']:8.1f}MB "
+              f"{r['peak_rss_mb'] - r['baseline_rss_mb']:12.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
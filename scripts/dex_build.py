@@ -1,6 +1,8 @@
-import os, json, zipfile
+import argparse, hashlib, io, mmap, os, json, shutil, sqlite3, struct, time, unicodedata, zipfile, zlib
+from contextlib import contextmanager
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import re
 
 ROOT = Path(".")        # run from your instance root (same folder as /mods, /datapacks or /world/datapacks)
@@ -9,13 +11,25 @@ PRESETS_OUT = ROOT / "out/presets.json"
 BIOMES_OUT = ROOT / "out/biomes.json"
 BLOCKS_OUT = ROOT / "out/blocks.json"   # NEW
 SPECIES_SOURCES_OUT = ROOT / "out/species_sources.json"  # NEW
+PROVENANCE_OUT = ROOT / "out/provenance.json"
+PARSE_REPORT_OUT = ROOT / "out/parse_report.json"
 
 # --- Per-mon output directories ---
 OUT_DIR = ROOT / "out"
 MONS_DIR = OUT_DIR / "mons"
-OUT_DIR.mkdir(parents=True, exist_ok=True)
-MONS_DIR.mkdir(parents=True, exist_ok=True)
-DROPS_OUT = ROOT / "out" / "drops_index.json"
+DROPS_OUT = ROOT / "out" / "drops_index.json"  # pre-sharding format; removed when out/drops/ is written
+DROPS_DIR = OUT_DIR / "drops"
+DROPS_CHUNK = 25  # items per shard file (DropsPage's default page size)
+SEARCH_DIR = OUT_DIR / "search"
+BIOME_SPAWNS_DIR = OUT_DIR / "biome_spawns"
+STATS_OUT = OUT_DIR / "stats.json"
+EVOLUTIONS_OUT = OUT_DIR / "evolutions.json"
+NEIGHBORS_OUT = OUT_DIR / "neighbors.json"
+MOVES_DIR = OUT_DIR / "moves"
+CONDITIONS_OUT = OUT_DIR / "conditions.json"
+BUNDLE_OUT = OUT_DIR / "dex.bundle"
+SQLITE_OUT = OUT_DIR / "dex.sqlite"
+PRECACHE_OUT = OUT_DIR / "precache.json"
 
 
 
@@ -304,21 +318,394 @@ def iter_mod_jars():
     if mods.is_dir():
         yield from sorted(mods.glob("*.jar"))
 
+# ---------------- JSON codec ----------------
+# orjson is used when installed (parses straight from bytes/memoryviews, serializes much faster);
+# the stdlib module is the fallback. Each backend's output is byte-stable from run to run, and
+# for the data we emit both produce the same bytes (scripts/bench_json_codec.py checks this).
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKENDS = ("auto", "orjson", "json")
+_JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+def set_json_backend(name: str):
+    global _JSON_BACKEND
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name == "orjson" and orjson is None:
+        raise SystemExit("JSON backend 'orjson' requested but orjson is not installed (pip install orjson)")
+    _JSON_BACKEND = name
+
+def json_backend() -> str:
+    return _JSON_BACKEND
+
+def json_loads(data):
+    """Parse str, bytes or any buffer (bytearray, memoryview) with the active backend."""
+    if _JSON_BACKEND == "orjson":
+        return orjson.loads(data)
+    if not isinstance(data, str):
+        data = str(data, "utf-8")
+    return json.loads(data)
+
+def json_dumps(obj, compact=False) -> bytes:
+    """UTF-8, unescaped, indent=2 -- the format of every file in out/ (compact: no whitespace at all)."""
+    if _JSON_BACKEND == "orjson":
+        try:
+            return orjson.dumps(obj) if compact else orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass  # non-str keys or >64-bit ints; the stdlib encoder handles those
+    if compact:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+def out_bytes(obj, compact=False) -> bytes:
+    """json_dumps() with platform newlines, i.e. exactly what the old text-mode writes produced."""
+    data = json_dumps(obj, compact)
+    return data if os.linesep == "\n" else data.replace(b"\n", os.linesep.encode("ascii"))
+
+# ---------------- Lenient fallback + parse diagnostics ----------------
+# Files that fail the strict parser get a second pass through a JSON5-ish rewriter (comments,
+# trailing commas, single-quoted strings, unquoted keys, BOM). Strict parses are only counted;
+# every recovered or failed file is logged with timings and written to out/parse_report.json.
+_PARSE_LOG = {"strict": 0, "strict_seconds": 0.0, "files": {}, "moves": {}}
+
+_JSON5_IDENT = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*")
+
+def _string_end(text, i, quote):
+    j, n = i + 1, len(text)
+    while j < n:
+        c = text[j]
+        if c == "\\":
+            j += 2
+        elif c == quote:
+            return j + 1
+        else:
+            j += 1
+    raise ValueError(f"unterminated string at offset {i}")
+
+def _single_quoted_to_json(body):
+    out, i, n = [], 0, len(body)
+    while i < n:
+        c = body[i]
+        if c == "\\" and i + 1 < n:
+            out.append("'" if body[i + 1] == "'" else body[i:i + 2])
+            i += 2
+            continue
+        out.append('\\"' if c == '"' else c)
+        i += 1
+    return '"' + "".join(out) + '"'
+
+def _json5_to_json(text: str):
+    """Rewrite JSON5-ish text into strict JSON. Returns (json_text, {fix_kind: count})."""
+    out = []
+    fixes = defaultdict(int)
+    if text.startswith("\ufeff"):
+        text = text[1:]
+        fixes["bom"] += 1
+    pending_comma = False  # held back until we know it isn't trailing
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if c in " \t\r\n":
+            out.append(c)
+            i += 1
+            continue
+        if text.startswith("//", i):
+            j = text.find("\n", i)
+            i = n if j < 0 else j
+            fixes["comments"] += 1
+            continue
+        if text.startswith("/*", i):
+            j = text.find("*/", i + 2)
+            if j < 0:
+                raise ValueError(f"unterminated comment at offset {i}")
+            i = j + 2
+            fixes["comments"] += 1
+            continue
+        if pending_comma:
+            if c in "}]":
+                fixes["trailing_commas"] += 1
+            else:
+                out.append(",")
+            pending_comma = False
+        if c == ",":
+            pending_comma = True
+            i += 1
+        elif c == '"':
+            j = _string_end(text, i, '"')
+            out.append(text[i:j])
+            i = j
+        elif c == "'":
+            j = _string_end(text, i, "'")
+            out.append(_single_quoted_to_json(text[i + 1:j - 1]))
+            fixes["single_quotes"] += 1
+            i = j
+        else:
+            m = _JSON5_IDENT.match(text, i)
+            if not m:
+                out.append(c)
+                i += 1
+                continue
+            word, k = m.group(0), m.end()
+            while k < n and text[k] in " \t\r\n":
+                k += 1
+            if k < n and text[k] == ":":
+                out.append(json.dumps(word))
+                fixes["unquoted_keys"] += 1
+            else:
+                out.append(word)  # true/false/null, exponents, NaN/Infinity
+            i = m.end()
+    if pending_comma:
+        out.append(",")
+    return "".join(out), fixes
+
+def _short_error(e: Exception) -> str:
+    return f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"[:200]
+
+def _note_strict(source, seconds):
+    _PARSE_LOG["strict"] += 1
+    _PARSE_LOG["strict_seconds"] += seconds
+    if _PARSE_LOG["files"]:
+        _PARSE_LOG["files"].pop(source, None)  # watch mode: the file was fixed
+
+def _parse_lenient(load, source, strict_error, strict_seconds):
+    """Second-tier parse for a file the strict parser rejected; logs the outcome either way."""
+    t0 = time.perf_counter()
+    entry = {"strictError": _short_error(strict_error), "strictMs": round(strict_seconds * 1000, 3)}
+    obj = None
+    try:
+        data = load()
+        text = data if isinstance(data, str) else str(data, "utf-8-sig")
+        converted, fixes = _json5_to_json(text)
+        obj = json.loads(converted, strict=False)  # strict=False: raw control chars in strings
+        entry.update(status="recovered", fixes=dict(sorted(fixes.items())))
+    except Exception as e:
+        entry.update(status="failed", error=_short_error(e))
+    entry["lenientMs"] = round((time.perf_counter() - t0) * 1000, 3)
+    _PARSE_LOG["files"][source] = entry
+    return obj
+
 def read_json_from_fs(path: Path):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
+        data = path.read_bytes()
+    except OSError:
         return None
+    t0 = time.perf_counter()
+    try:
+        obj = json_loads(data)
+    except Exception as e:
+        return _parse_lenient(lambda: data, path.as_posix(), e, time.perf_counter() - t0)
+    _note_strict(path.as_posix(), time.perf_counter() - t0)
+    return obj
+
+def write_parse_report():
+    files = _PARSE_LOG["files"]
+    recovered = sorted(src for src, e in files.items() if e["status"] == "recovered")
+    failed = sorted(src for src, e in files.items() if e["status"] == "failed")
+    PARSE_REPORT_OUT.write_bytes(out_bytes({
+        "backend": json_backend(),
+        "strictParses": _PARSE_LOG["strict"],
+        "strictSeconds": round(_PARSE_LOG["strict_seconds"], 3),
+        "recovered": len(recovered),
+        "failed": len(failed),
+        "files": {src: files[src] for src in sorted(files)},
+        # species whose moves kept the raw strings because an entry didn't fit the packed moveRefs
+        "unpackedMoves": dict(sorted(_PARSE_LOG["moves"].items())),
+    }))
+    print(f"Wrote {PARSE_REPORT_OUT}: {_PARSE_LOG['strict']} strict, "
+          f"{len(recovered)} recovered leniently, {len(failed)} failed")
+    for sid, entries in sorted(_PARSE_LOG["moves"].items())[:10]:
+        print(f"  unpacked moves: {sid} ({', '.join(entries[:3])})")
+    for label, srcs in (("recovered", recovered), ("FAILED", failed)):
+        for src in srcs[:10]:
+            e = files[src]
+            print(f"  {label}: {src} ({e.get('error') or e['strictError']})")
+        if len(srcs) > 10:
+            print(f"  ... {len(srcs) - 10} more {label.lower()} (see {PARSE_REPORT_OUT.name})")
+
+# jar path -> ((mtime_ns, size), {entry name: json or None}); only populated in --watch mode, and
+# only with the data entries the collectors asked for (never a jar's client assets)
+_ARCHIVE_CACHE = None
+
+class ArchiveReader:
+    """
+    Read-only jar/zip reader backed by mmap.
+    Stored (uncompressed) entries are served as zero-copy memoryviews over the mapping,
+    deflated entries are inflated straight from the mapped bytes, and the pages of each
+    entry are handed back to the OS once it has been consumed, so scanning a multi-hundred
+    MB jar never holds more than one entry in memory.
+    """
+    _LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
 
-def read_jsons_from_zip(z, prefix):
-    for name in z.namelist():
-        if name.startswith(prefix) and name.endswith(".json"):
-            try:
-                with z.open(name) as f:
-                    yield name, json.loads(f.read().decode("utf-8"))
-            except Exception:
-                pass
+    def __init__(self, path):
+        self.filename = str(path)
+        self._f = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._f.close()
+            raise zipfile.BadZipFile(f"{path}: empty archive")
+        # the central directory and deflate streams go through plain file reads; the mapping is
+        # only touched for the entries we actually view
+        self._zip = zipfile.ZipFile(self._f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._zip.close()
+        self._mm.close()
+        self._f.close()
+
+    def namelist(self):
+        return self._zip.namelist()
+
+    def _read_at(self, offset, n):
+        if hasattr(os, "pread"):
+            return os.pread(self._f.fileno(), n, offset)
+        return self._mm[offset:offset + n]
+
+    def _data_span(self, info):
+        fields = self._LOCAL_HEADER.unpack(self._read_at(info.header_offset, self._LOCAL_HEADER.size))
+        if fields[0] != b"PK\x03\x04":
+            raise zipfile.BadZipFile(f"{self.filename}: bad local header for {info.filename}")
+        start = info.header_offset + self._LOCAL_HEADER.size + fields[9] + fields[10]
+        return start, info.compress_size
+
+    def _release(self, start, length):
+        # drop the entry's pages from our RSS; the data stays in the OS page cache.
+        # Round out to the kernel's fault-around window, which maps neighbouring pages too.
+        if not hasattr(mmap, "MADV_DONTNEED") or length <= 0:
+            return
+        win = max(mmap.PAGESIZE, 64 * 1024)
+        lo = start - start % win
+        hi = min(len(self._mm), -(-(start + length) // win) * win)
+        try:
+            self._mm.madvise(mmap.MADV_DONTNEED, lo, hi - lo)
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def _inflate(view, size, chunk=1 << 18):
+        # feed the compressed bytes in slices and write into one preallocated buffer, so the
+        # output is never held twice (zlib's one-shot decompress joins its blocks at the end)
+        out = bytearray(size)
+        d = zlib.decompressobj(-zlib.MAX_WBITS)
+        pos = 0
+        for i in range(0, len(view), chunk):
+            part = d.decompress(view[i:i + chunk])
+            out[pos:pos + len(part)] = part
+            pos += len(part)
+        part = d.flush()
+        out[pos:pos + len(part)] = part
+        pos += len(part)
+        if pos != size:
+            del out[pos:]
+        return out
+
+    @contextmanager
+    def entry(self, name):
+        """Yield an entry's bytes: a memoryview over the mapping when stored, else inflated bytes."""
+        info = self._zip.getinfo(name)
+        if info.flag_bits & 0x1 or info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            yield self._zip.read(name)  # encrypted / exotic compression: let zipfile handle it
+            return
+        start, length = self._data_span(info)
+        view = memoryview(self._mm)[start:start + length]
+        try:
+            if info.compress_type == zipfile.ZIP_STORED:
+                yield view
+            else:
+                yield self._inflate(view, info.file_size)
+        finally:
+            view.release()
+            self._release(start, length)
+
+    def read_json(self, name):
+        with self.entry(name) as data:
+            if _JSON_BACKEND == "orjson":
+                # parse the mapped/inflated buffer in place (zero-copy for stored entries)
+                return orjson.loads(data)
+            # stdlib needs a str: decode straight from the buffer (no intermediate bytes copy);
+            # the entry's pages are released before parsing starts
+            text = str(data, "utf-8")
+        return json.loads(text)
+
+    def read_bytes(self, name) -> bytes:
+        with self.entry(name) as data:
+            return bytes(data)
+
+    def copy_to(self, name, out_path: Path):
+        """Copy an entry to disk without materializing it: stored entries go file-to-file in the
+        kernel (sendfile) or straight from the mapping, deflated ones are streamed in chunks."""
+        info = self._zip.getinfo(name)
+        with open(out_path, "wb") as f_out:
+            if info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 0x1:
+                start, length = self._data_span(info)
+                if hasattr(os, "sendfile"):
+                    try:
+                        sent = 0
+                        while sent < length:
+                            n = os.sendfile(f_out.fileno(), self._f.fileno(), start + sent, length - sent)
+                            if n == 0:
+                                break
+                            sent += n
+                        if sent == length:
+                            return
+                        f_out.seek(0)
+                        f_out.truncate()
+                    except OSError:
+                        f_out.seek(0)
+                        f_out.truncate()
+                with self.entry(name) as view:
+                    f_out.write(view)
+            else:
+                with self._zip.open(name) as f_in:
+                    shutil.copyfileobj(f_in, f_out)
+
+def open_archive(path):
+    return ArchiveReader(path)
+
+def _read_zip_json(z, name):
+    """One jar entry, through the lenient fallback when needed; None when it can't be read."""
+    source = f"{Path(z.filename).name if z.filename else '?'}!/{name}"
+    t0 = time.perf_counter()
+    try:
+        js = z.read_json(name)
+    except Exception as e:
+        return _parse_lenient(lambda: z.read_bytes(name), source, e, time.perf_counter() - t0)
+    _note_strict(source, time.perf_counter() - t0)
+    return js
+
+def _zip_json_names(z, prefix, want):
+    return (name for name in z.namelist()
+            if name.startswith(prefix) and name.endswith(".json") and (want is None or want(name)))
+
+def read_jsons_from_zip(z, prefix, want=None):
+    """(name, json) for the *.json entries under `prefix`; with `want`, only names it accepts are read.
+    In --watch mode the parsed entries are kept per jar until the jar changes."""
+    entries = None
+    if _ARCHIVE_CACHE is not None and z.filename:
+        st = os.stat(z.filename)
+        sig = (st.st_mtime_ns, st.st_size)
+        cached = _ARCHIVE_CACHE.get(z.filename)
+        if cached is None or cached[0] != sig:
+            cached = _ARCHIVE_CACHE[z.filename] = (sig, {})
+        entries = cached[1]
+    for name in _zip_json_names(z, prefix, want):
+        if entries is None:
+            js = _read_zip_json(z, name)
+        elif name in entries:
+            js = entries[name]
+        else:
+            js = entries[name] = _read_zip_json(z, name)
+        if js is not None:
+            yield name, js
 
 def _filter_species(name):
     filters = ['_mega', '_gmax', '_bias', '_hero', 'partner']
@@ -434,7 +821,7 @@ def collect_species():
 
     # from mods
     for jar in iter_mod_jars():
-        with zipfile.ZipFile(jar) as z:
+        with open_archive(jar) as z:
             for name, js in read_jsons_from_zip(z, "data/cobblemon/species/"):
                 if not js:
                     continue
@@ -509,8 +896,8 @@ def collect_spawns():
 
     # mods
     for jar in iter_mod_jars():
-        with zipfile.ZipFile(jar) as z:
-            for name, js in read_jsons_from_zip(z, "data/"):
+        with open_archive(jar) as z:
+            for name, js in read_jsons_from_zip(z, "data/", lambda n: "/spawn_pool_world/" in n):
                 if "/spawn_pool_world/" in name and name.endswith(".json"):
                     add_spawn_entry(f"{Path(jar).name}!/{name}", js)
 
@@ -687,12 +1074,14 @@ def collect_biome_tags():
     """
     Build a map of '#namespace:tag' -> list(values...), where values are biome IDs or other '#tag's.
     Later datapacks/files overwrite earlier ones (last-writer-wins per tag file).
+    Returns (tags, sources) where sources maps each tag to every file that defined it.
     """
     tags = {}
+    sources = defaultdict(list)
     # From mod jars
     for jar in iter_mod_jars():
-        with zipfile.ZipFile(jar) as z:
-            for name, js in read_jsons_from_zip(z, "data/"):
+        with open_archive(jar) as z:
+            for name, js in read_jsons_from_zip(z, "data/", lambda n: "/tags/worldgen/biome/" in n):
                 if "/tags/worldgen/biome/" in name and name.endswith(".json"):
                     # data/<ns>/tags/worldgen/biome/<tag>.json  (no nested folders here usually)
                     parts = name.split("/")
@@ -702,6 +1091,7 @@ def collect_biome_tags():
                         tag_key = f"#{ns}:{tag}"
                         vals = _normalize_tag_values(js.get("values", []))
                         tags[tag_key] = vals
+                        sources[tag_key].append(f"{Path(jar).name}!/{name}")
                     except Exception:
                         pass
     # From datapacks
@@ -713,9 +1103,10 @@ def collect_biome_tags():
                 js = read_json_from_fs(p) or {}
                 vals = _normalize_tag_values(js.get("values", []))
                 tags[tag_key] = vals
+                sources[tag_key].append(p.as_posix())
             except Exception:
                 pass
-    return tags
+    return tags, dict(sources)
 
 def resolve_biome_selectors(selectors, tag_map):
     """
@@ -765,18 +1156,22 @@ def _normalize_preset_json(js: dict):
 
 def collect_presets():
     """
-    Returns: dict[preset_name -> {"conditions": {...}, "anticonditions": {...}, "contexts": [...] }]
+    Returns: (presets, sources)
+      presets: dict[preset_name -> {"conditions": {...}, "anticonditions": {...}, "contexts": [...] }]
+      sources: dict[preset_name -> [files that defined it]]
     Later datapacks override earlier ones (last-writer-wins).
     """
     presets = {}
+    sources = defaultdict(list)
     # From mod jars
     for jar in iter_mod_jars():
-        with zipfile.ZipFile(jar) as z:
-            for name, js in read_jsons_from_zip(z, "data/"):
+        with open_archive(jar) as z:
+            for name, js in read_jsons_from_zip(z, "data/", lambda n: "/spawn_detail_presets/" in n):
                 if "/spawn_detail_presets/" in name and name.endswith(".json"):
                     try:
                         preset_name = Path(name).stem
                         presets[preset_name] = _normalize_preset_json(js or {})
+                        sources[preset_name].append(f"{Path(jar).name}!/{name}")
                     except Exception:
                         pass
     # From datapacks
@@ -785,9 +1180,10 @@ def collect_presets():
             try:
                 js = read_json_from_fs(p) or {}
                 presets[p.stem] = _normalize_preset_json(js)
+                sources[p.stem].append(p.as_posix())
             except Exception:
                 pass
-    return presets
+    return presets, dict(sources)
 
 # ------------------------- BLOCK TAGS (improved) -------------------------
 
@@ -826,27 +1222,29 @@ def _extract_block_tag_key_from_fs(path: Path):
         return f"#{ns}:{rel}"
     return None
 
+def _is_block_tag(name: str) -> bool:
+    return "/tags/blocks/" in name or "/tags/block/" in name
+
 def collect_block_tags():
     """
     Build a map of '#namespace:path' -> list(values...) for BLOCK tags.
     Scans both tags/blocks/** and tags/block/** recursively.
+    Returns (tags, sources) where sources maps each tag to every file that defined it.
     """
     tags = {}
+    sources = defaultdict(list)
     # From mod jars
     for jar in iter_mod_jars():
-        with zipfile.ZipFile(jar) as z:
-            # scan all jsons under data/**/tags/**block(s)/**.json
-            for name in z.namelist():
-                if "/tags/blocks/" in name or "/tags/block/" in name:
-                    if not name.endswith(".json"): continue
-                    try:
-                        key = _extract_block_tag_key_from_zip(name)
-                        if not key: continue
-                        with z.open(name) as f:
-                            js = json.loads(f.read().decode("utf-8"))
-                        tags[key] = _normalize_tag_values(js.get("values", []))
-                    except Exception:
-                        pass
+        with open_archive(jar) as z:
+            # scan all jsons under data/**/tags/**block(s)/**.json; nothing else is opened
+            for name, js in read_jsons_from_zip(z, "data/", _is_block_tag):
+                try:
+                    key = _extract_block_tag_key_from_zip(name)
+                    if not key: continue
+                    tags[key] = _normalize_tag_values(js.get("values", []))
+                    sources[key].append(f"{Path(jar).name}!/{name}")
+                except Exception:
+                    pass
     # From datapacks (recursive)
     for dp in iter_datapack_dirs():
         # both singular & plural, recursive
@@ -856,9 +1254,10 @@ def collect_block_tags():
                 if not key: continue
                 js = read_json_from_fs(p) or {}
                 tags[key] = _normalize_tag_values(js.get("values", []))
+                sources[key].append(p.as_posix())
             except Exception:
                 pass
-    return tags
+    return tags, dict(sources)
 
 def resolve_block_selectors(selectors, tag_map, include_unresolved_child_tags=True):
     """
@@ -1027,7 +1426,9 @@ def flatten_spawn_entry_linked(entry, block_tag_map=None):
 
         presets  = _as_list(e.get("presets"))
         contexts = _as_list(e.get("context"))
-        times = sorted({str(t).lower() for t in _as_list(cond.get("times"))})
+        # Cobblemon writes "timeRange"; older packs "times"/"time". This is what mon files' spawn
+        # "times" show (only "times" was read before) and what the biome odds split on.
+        times = _extract_times(cond)
 
         inc_tags = _as_list(cond.get("biomes"))
         exc_tags = _as_list(anti.get("biomes"))
@@ -1085,7 +1486,11 @@ def flatten_spawn_entry_linked(entry, block_tag_map=None):
 
 # ------------------------- Sprites (images from resourcepacks & mods) -------------------------
 SPRITES_OUT = ROOT / "out/sprites.json"
+SPRITE_ICONS_OUT = ROOT / "out/sprite_icons.json"
 SPRITES_DIR = ROOT / "out/sprites"
+ATLAS_OUT = ROOT / "out/atlas.json"
+ATLAS_DIR = ROOT / "out/atlas"
+SPRITE_CACHE_DIR = ROOT / ".sprite_cache" / "v1"  # optimized sprites by source hash (--optimize-sprites)
 
 def iter_resourcepacks():
     rp = ROOT / "resourcepacks"
@@ -1221,21 +1626,22 @@ def _is_shiny_from_filename(base_name: str) -> bool:
 
 def _save_zip_png(z, name: str, out_path: Path):
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with z.open(name) as f_in, open(out_path, "wb") as f_out:
-        f_out.write(f_in.read())
+    z.copy_to(name, out_path)
 
 def _save_fs_png(src_path: Path, out_path: Path):
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(src_path, "rb") as f_in, open(out_path, "wb") as f_out:
-        f_out.write(f_in.read())
+    shutil.copyfile(src_path, out_path)
 
 def collect_sprites(species_dict):
     """
-    Returns { species_id: { "normal": [paths...], "shiny": [paths...] } }
+    Returns (sprites, sources)
+      sprites: { species_id: { "normal": [paths...], "shiny": [paths...] } }
+      sources: { sprite path: [pack files it was copied from] }
     Writes extracted files under ./sprites/<namespace>/file.png
     Priority: resourcepacks override mods.
     """
     sprites = defaultdict(lambda: {"normal": [], "shiny": []})
+    sprite_sources = defaultdict(list)
 
     # indexes
     species_ids = set(species_dict.keys())
@@ -1292,11 +1698,13 @@ def collect_sprites(species_dict):
         aliases_by_id[sid] = [a for a in al if a]
 
 
-    def _register_png(rel_path: Path, sid: str, shiny: bool):
+    def _register_png(rel_path: Path, sid: str, shiny: bool, marker: str | None = None):
         key = "shiny" if shiny else "normal"
         rel = rel_path.as_posix()
         if rel not in sprites[sid][key]:
             sprites[sid][key].append(rel)
+        if marker and marker not in sprite_sources[rel]:
+            sprite_sources[rel].append(marker)
 
     # 1) resourcepacks
     for kind, pack in iter_resourcepacks():
@@ -1313,12 +1721,12 @@ def collect_sprites(species_dict):
                 out_abs = ROOT / out_rel
                 try:
                     _save_fs_png(p, out_abs)
-                    _register_png(out_rel, sid, shiny)
+                    _register_png(out_rel, sid, shiny, p.as_posix())
                 except Exception:
                     pass
         else:
             try:
-                with zipfile.ZipFile(pack) as z:
+                with open_archive(pack) as z:
                     for name in z.namelist():
                         if not _is_pokemon_sprite_path(name): continue
                         ns = _assets_namespace(name)
@@ -1330,7 +1738,7 @@ def collect_sprites(species_dict):
                         out_abs = ROOT / out_rel
                         try:
                             _save_zip_png(z, name, out_abs)
-                            _register_png(out_rel, sid, shiny)
+                            _register_png(out_rel, sid, shiny, f"{Path(pack).name}!/{name}")
                         except Exception:
                             pass
             except Exception:
@@ -1339,7 +1747,7 @@ def collect_sprites(species_dict):
     # 2) mods (jars)
     for jar in iter_mod_jars():
         try:
-            with zipfile.ZipFile(jar) as z:
+            with open_archive(jar) as z:
                 for name in z.namelist():
                     if not _is_pokemon_sprite_path(name): continue
                     ns = _assets_namespace(name)
@@ -1349,228 +1757,1897 @@ def collect_sprites(species_dict):
                     shiny = _is_shiny_from_filename(base)
                     out_rel = Path("out/sprites") / ns / Path(name).name
                     out_abs = ROOT / out_rel
+                    marker = f"{Path(jar).name}!/{name}"
                     if out_abs.exists():
-                        _register_png(out_rel, sid, shiny)
+                        # written by a resourcepack this run -> the jar copy didn't contribute
+                        written_now = out_rel.as_posix() in sprite_sources
+                        _register_png(out_rel, sid, shiny, None if written_now else marker)
                         continue
                     try:
                         _save_zip_png(z, name, out_abs)
-                        _register_png(out_rel, sid, shiny)
+                        _register_png(out_rel, sid, shiny, marker)
                     except Exception:
                         pass
         except Exception:
             pass
 
-    return sprites
+    return sprites, dict(sprite_sources)
 
 
 
 
 # ------------------------- Main build -------------------------
 
-def main():
+def _sources_for(mon_id: str, species_sources: dict):
+    if mon_id in species_sources:
+        return species_sources[mon_id]
+    base = mon_id.split("_", 1)[0]
+    return species_sources.get(base, [])
+
+def _raw_spawns_for(sid: str, sdata: dict, spawns_by_species: dict):
+    """Raw spawn groups for a species; variants fall back to their base species' spawns."""
+    base_id = sdata.get("variantOf")
+    raw_spawns_list = spawns_by_species.get(sid, [])
+    if not raw_spawns_list and base_id:
+        raw_spawns_list = spawns_by_species.get(base_id, [])
+    return raw_spawns_list
+
+def _images_for(sid: str, sdata: dict, sprites_map):
+    base_id = sdata.get("variantOf")
+    if isinstance(sprites_map, dict):
+        return sprites_map.get(sid) or (sprites_map.get(base_id) if base_id else {}) or {}
+    return {}
+
+def collect_all():
+    """
+    Collect every input dataset from the instance.
+    Returns the build context dict the emitters (and watch mode) work from.
+    """
     species, species_sources = collect_species()
-
-
-    def _sources_for(mon_id: str):
-        if mon_id in species_sources:
-            return species_sources[mon_id]
-        base = mon_id.split("_", 1)[0]
-        return species_sources.get(base, [])
-
     print(f"Total Species: {len(species)}")
     species_full = expand_species_with_forms(species)  # NEW: add form entries
     print(f"Total Expanded Species: {len(species_full)}")
     spawns_by_species = collect_spawns()
 
     # Sprites (after species are known)
-    sprites_map = collect_sprites(species_full)
-    SPRITES_OUT.write_text(json.dumps({"images": sprites_map}, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Wrote {SPRITES_OUT} with sprites for {len(sprites_map)} species")
-
+    sprites_map, sprite_sources = collect_sprites(species_full)
 
     # Reference datasets
-    preset_map = collect_presets()
-    biome_tag_map = collect_biome_tags()
+    preset_map, preset_sources = collect_presets()
+    biome_tag_map, biome_tag_sources = collect_biome_tags()
+    block_tag_map, block_tag_sources = collect_block_tags()
 
-    # Resolved biome tags + all concrete biomes
-    resolved_biome_map = { tag: resolve_biome_selectors(values, biome_tag_map) for tag, values in biome_tag_map.items() }
-    all_biomes = sorted({ b for lst in resolved_biome_map.values() for b in lst if ":" in b and not b.startswith("#") })
-
-    # Block tags (NEW) + resolved + inventory
-    block_tag_map = collect_block_tags()
-    resolved_block_map = { tag: resolve_block_selectors(values, block_tag_map) for tag, values in block_tag_map.items() }
-    all_blocks = sorted({ b for lst in resolved_block_map.values() for b in lst if ":" in b and not b.startswith("#") })
+    return {
+        "species_sources": species_sources,
+        "species_full": species_full,
+        "spawns_by_species": spawns_by_species,
+        "sprites_map": sprites_map,
+        "preset_map": preset_map,
+        "biome_tag_map": biome_tag_map,
+        "block_tag_map": block_tag_map,
+        # input file markers per reference entry (for provenance.json)
+        "sprite_sources": sprite_sources,
+        "preset_sources": preset_sources,
+        "biome_tag_sources": biome_tag_sources,
+        "block_tag_sources": block_tag_sources,
+        # Emission state: final id order + per-species index rows
+        "mon_order": [],
+        "dex_rows": {},
+        "drop_rows": {},
+        "search_terms": {},
+        "spawn_entries": {},  # flattened spawns per mon (as in out/mons/<id>.json)
+        "move_lists": {},     # parsed (method, move, level) per mon
+        "move_table": None,   # interned names/methods behind the mons' moveRefs
+        "intern_conditions": False,  # --intern-conditions: spawns reference out/conditions.json
+        "bundle": False,             # --bundle: also pack out/ into out/dex.bundle
+        "sqlite": False,             # --sqlite: also write out/dex.sqlite
+        "sprite_atlas": False,       # --sprite-atlas: pack list thumbnails into out/atlas/
+        "sprite_opt": None,          # --optimize-sprites: {"sizes": [px, ...], "webp": bool}
+    }
 
-    # Enrich presets with resolved blocks under a "resolved" key
-    enriched_presets = {}
-    for name, base in preset_map.items():
-        resolved_section = {
-            "conditions": _resolved_blocks_subset(base.get("conditions", {}), block_tag_map),
-            "anticonditions": _resolved_blocks_subset(base.get("anticonditions", {}), block_tag_map),
+def build_mon(sid: str, sdata: dict, ctx: dict):
+    """
+    Build one per-mon payload.
+    Returns (mon, dex_row, drop_rows) where drop_rows is { item_id: row } for the drops index.
+    """
+    raw_spawns_list = _raw_spawns_for(sid, sdata, ctx["spawns_by_species"])
+
+    # NEW: extract spawn-sourced drops
+    spawn_drop_objs = []
+    for raw in raw_spawns_list:
+        for s in raw.get("spawns", []):
+            extracted = _extract_drops_from_spawn(s)
+            if extracted:
+                spawn_drop_objs.append(extracted)
+
+    # NEW: merge species-level drops with spawn-level drops
+    merged_drops = _merge_drops(sdata.get("drops") or {}, spawn_drop_objs)
+
+    # --- aggregate drops for the global index (using merged drops now) ---
+    drop_rows = {}
+    for ent in merged_drops.get("entries", []):
+        item = (ent.get("item") or "").strip().lower()
+        if not item:
+            continue
+        prev = drop_rows.get(item)
+        curr = {
+            "id": sid,
+            "name": sdata.get("name", sid),
+            "percentage": ent.get("percentage"),
+            "quantityRange": ent.get("quantityRange"),
         }
-        enriched_presets[name] = { **base, "resolved": resolved_section }
+        if ent.get("biomes"):
+            curr["biomes"] = ent["biomes"]
+        if ent.get("excludeBiomes"):
+            curr["exclusiveBiomes"] = ent["excludeBiomes"]
+        if not prev or (curr["percentage"] is not None and prev.get("percentage") is None):
+            drop_rows[item] = curr
+
+    # keep your spawn flattening (for the UI spawn tab), unchanged:
+    spawn_entries = []
+    for raw in raw_spawns_list:
+        flattened = flatten_spawn_entry_linked(raw, ctx["block_tag_map"])
+        if flattened == []:
+            continue
+        spawn_entries.append(flattened)
+
+    mon = {
+        "id": sid,
+        "dexnum": sdata.get("nationalPokedexNumber", ""),
+        "name": sdata.get("name", sid),
+        "primaryType": sdata.get("primaryType", ""),
+        "secondaryType": sdata.get("secondaryType", ""),
+        "maleRatio": sdata.get("maleRatio", ""),
+        "labels": sdata.get("labels", []),
+        "abilities": sdata.get("abilities", []),
+        "eggGroups": sdata.get("eggGroups", []),
+        "baseStats": sdata.get("baseStats", {}),
+        "evYield": sdata.get("evYield", {}),
+        "experienceGroup": sdata.get("experienceGroup", ""),
+        "catchRate": sdata.get("catchRate", ""),
+        # ⟵ NEW: assign merged drops here
+        "drops": merged_drops,
+        **_moves_field(sid, sdata, ctx),
+        "forms": [f.get("name") for f in sdata.get("forms", [])] if isinstance(sdata.get("forms"), list) else [],
+        "types": sdata.get("types", []),
+        "evolutions": sdata.get("evolutions", []),
+        "spawns": spawn_entries,
+        "implemented": sdata.get("implemented", False),
+        "images": _images_for(sid, sdata, ctx["sprites_map"]),
+        "speciesSources": _sources_for(sid, ctx["species_sources"])
+    }
 
-    # Build per-mon JSON files + a LEAN dex index
-    dex_index = []
-    _added_ids = set()
+    # Keep the lean dex index as-is...
+    dex_row = {
+        "id": mon["id"],
+        "name": mon["name"],
+        "dexnum": mon["dexnum"],
+        "primaryType": mon["primaryType"],
+        "secondaryType": mon["secondaryType"],
+        "spawnCount": len(spawn_entries)
+    }
+    return mon, dex_row, drop_rows
 
-    items_to_mons = defaultdict(lambda: {})  # item_id -> { mon_id: {id,name,percentage,quantityRange} }
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.write_bytes(data)
+    return True
 
+def emit_mons(ctx: dict, ids=None) -> set:
+    """
+    Write out/mons/<id>.json and refresh the per-species index rows in ctx.
+    ids=None emits every species; otherwise only those ids are rebuilt (and only
+    files whose content actually changed are rewritten). Returns the ids written or removed.
+    """
+    order = [sid for sid in ctx["species_full"] if not _filter_species(sid)]
+    order.sort(key=lambda sid: _dex_sort_key(ctx["species_full"][sid]))  # stable: forms stay after their base
+    ctx["mon_order"] = order
+    written = set()
+
+    # moveRefs index the shared table; when it changes (a move added/removed anywhere) ids shift
+    table = build_move_table(ctx)
+    prev = ctx["move_table"]
+    if ids is not None and (prev is None or (table["methods"], table["moves"]) != (prev["methods"], prev["moves"])):
+        ids = set(order)
+    ctx["move_table"] = table
+
+    # species that disappeared from the build
+    for sid in set(ctx["dex_rows"]) - set(order):
+        ctx["dex_rows"].pop(sid, None)
+        ctx["drop_rows"].pop(sid, None)
+        ctx["search_terms"].pop(sid, None)
+        ctx["spawn_entries"].pop(sid, None)
+        (MONS_DIR / f"{sid}.json").unlink(missing_ok=True)
+        written.add(sid)
+
+    targets = order if ids is None else [sid for sid in order if sid in ids]
+    for sid in targets:
+        mon, dex_row, drop_rows = build_mon(sid, ctx["species_full"][sid], ctx)
+        ctx["dex_rows"][sid] = dex_row
+        ctx["drop_rows"][sid] = drop_rows
+        ctx["search_terms"][sid] = _search_terms(mon, ctx["move_lists"].get(sid, []))
+        ctx["spawn_entries"][sid] = mon["spawns"]
 
-    for sid, sdata in species_full.items():
-        if sid in _added_ids:
+        # Write one file per mon (unchanged)
+        data = out_bytes(intern_mon_conditions(mon) if ctx["intern_conditions"] else mon)
+        if ids is None:
+            (MONS_DIR / f"{sid}.json").write_bytes(data)
+            written.add(sid)
+        elif _write_if_changed(MONS_DIR / f"{sid}.json", data):
+            written.add(sid)
+    return written
+
+# dex.json is {version, fields, rows}: one array per species with the values in DEX_FIELDS order,
+# rows already sorted by dex number (species without one last), so the list view never sorts.
+# Every other row-indexed file (search, stats, moves, sprite_icons, neighbors, sqlite) uses the
+# same ctx["mon_order"].
+DEX_VERSION = 2
+DEX_FIELDS = ("id", "name", "dexnum", "primaryType", "secondaryType", "spawnCount")
+
+def _dex_sort_key(sdata: dict):
+    n = _stat_int(sdata.get("nationalPokedexNumber"))
+    return (n is None, n or 0)
+
+def write_dex_index(ctx: dict):
+    rows = [[ctx["dex_rows"][sid].get(f) for f in DEX_FIELDS] for sid in ctx["mon_order"]]
+    DEX_OUT.parent.mkdir(parents=True, exist_ok=True)
+    DEX_OUT.write_bytes(out_bytes({"version": DEX_VERSION, "fields": list(DEX_FIELDS), "rows": rows}, compact=True))
+    print(f"Wrote {DEX_OUT} with {len(rows)} entries")
+
+# ------------------------- Columnar stats (out/stats.json) -------------------------
+# Struct-of-arrays view of the numeric/categorical species fields, one column per field in
+# dex.json row order, so analytics (bst_sort.py) load everything in a single read.
+STAT_FIELDS = ("hp", "attack", "defence", "special_attack", "special_defence", "speed")
+
+def _stat_int(v):
+    if isinstance(v, bool):
+        return None
+    if isinstance(v, (int, float)):
+        return int(v)
+    if isinstance(v, str):
+        try:
+            return int(float(v.strip()))
+        except ValueError:
+            return None
+    return None
+
+def write_stats(ctx: dict):
+    order = ctx["mon_order"]
+    species = ctx["species_full"]
+    columns = {"id": list(order)}
+    columns["dexnum"] = [species[sid].get("nationalPokedexNumber") for sid in order]
+    columns["primaryType"] = [species[sid].get("primaryType", "") for sid in order]
+    columns["secondaryType"] = [species[sid].get("secondaryType", "") for sid in order]
+    for prefix, key in (("", "baseStats"), ("ev_", "evYield")):
+        blocks = [species[sid].get(key) if isinstance(species[sid].get(key), dict) else {} for sid in order]
+        for stat in STAT_FIELDS:
+            columns[prefix + stat] = [_stat_int(b.get(stat)) for b in blocks]
+    columns["catchRate"] = [_stat_int(species[sid].get("catchRate")) for sid in order]
+    columns["experienceGroup"] = [species[sid].get("experienceGroup", "") for sid in order]
+    # the mon files these columns were built next to; bst_sort only trusts the file while they match
+    mtimes = [fp.stat().st_mtime_ns for fp in MONS_DIR.rglob("*.json")]
+    STATS_OUT.write_bytes(out_bytes({
+        "version": 1, "count": len(order),
+        "monFiles": len(mtimes), "monsMtimeNs": max(mtimes, default=0),
+        "columns": columns,
+    }, compact=True))
+    print(f"Wrote {STATS_OUT} with {len(columns)} columns x {len(order)} species")
+
+# ------------------------- Evolution families (out/evolutions.json) -------------------------
+# preEvolution / evolutions[].result are Pokémon property strings ("raichu alolan",
+# "silvally rks_memory=fire", "meowth region_bias=galar"); resolve them to emitted species ids
+# once so the site can draw a whole family from one file.
+def resolve_species_ref(ref, known: set) -> str | None:
+    if not isinstance(ref, str) or not ref.strip():
+        return None
+    base, *props = ref.strip().lower().split()
+    base = _canon(base.split(":")[-1])
+    suffixes = []
+    for prop in props:
+        key, _, value = prop.partition("=")
+        if value in ("true", "yes"):
+            value = key  # mega=true -> mega
+        elif not value:
+            value = key  # bare aspect: "alolan", "hisuian"
+        elif value in ("false", "no", "none"):
             continue
-        if _filter_species(sid):
+        suffixes.append(FORM_SYNONYMS.get(value, _canon(value)))
+    if suffixes:
+        for cand in (f"{base}_{'_'.join(suffixes)}", *(f"{base}_{sfx}" for sfx in suffixes)):
+            if cand in known:
+                return cand
+    return base if base in known else None
+
+def evolution_requirement_text(req) -> str:
+    """Short label for one requirement; same wording as evolRequirementLabel() in site/utils/helpers.js."""
+    if not isinstance(req, dict):
+        return ""
+    v = req.get("variant") or ""
+    if v == "level":
+        level = req.get("minLevel", req.get("level", "?"))
+        return f"Level {level}" + (f" @ {req['timeRange']}" if req.get("timeRange") else "")
+    if v == "has_move":
+        return f"Know {req.get('move') or 'a move'}"
+    if v == "has_move_type":
+        return f"Know {req.get('type') or 'a type'} move"
+    if v == "held_item":
+        return f"Hold {req.get('item') or req.get('itemCondition') or 'item'}"
+    if v == "weather":
+        return str(req.get("weather") or "weather")
+    if v == "friendship":
+        return f"Friendship {req.get('min') or req.get('amount') or ''}".strip()
+    if v == "time_range":
+        return f"Time {req.get('range')}"
+    if v == "properties" and req.get("target"):
+        return str(req["target"])
+    if v == "property_range" and req.get("feature"):
+        return f"{req['feature']} {req.get('range', '')}".strip()
+    if v == "biome":
+        biome = req.get("biomeCondition") or req.get("biome")
+        if biome:
+            return f"In {biome}"
+        if req.get("biomeAnticondition"):
+            return f"Not in {req['biomeAnticondition']}"
+    return v.replace("_", " ")
+
+def _evolution_edge(ev: dict) -> dict:
+    reqs = ev.get("requirements") or []
+    if not isinstance(reqs, list):
+        reqs = [reqs]
+    edge = {"variant": ev.get("variant", "")}
+    texts = [t for t in (evolution_requirement_text(r) for r in reqs) if t]
+    if ev.get("requiredContext"):
+        texts.insert(0, f"Use {ev['requiredContext']}")
+    if texts:
+        edge["requirements"] = texts
+    return edge
+
+def build_evolution_families(ctx: dict) -> dict:
+    """
+    Evolution DAG over emitted species, split into families (connected components).
+    {"families": [{"nodes": [id...], "depth": [stage...], "edges": [[from, to, {variant, requirements}]...]}],
+     "family": {id: family index}} -- edge endpoints are indexes into that family's nodes.
+    """
+    order = ctx["mon_order"]
+    known = set(order)
+    species = ctx["species_full"]
+    edges = {}  # (from, to) -> edge; evolutions[] wins over a bare preEvolution link
+    unresolved = 0
+    for sid in order:
+        sdata = species[sid]
+        evolutions = sdata.get("evolutions")
+        for ev in evolutions if isinstance(evolutions, list) else []:
+            if not isinstance(ev, dict):
+                continue
+            target = resolve_species_ref(ev.get("result"), known)
+            if target is None:
+                unresolved += 1
+            elif target != sid:
+                edges.setdefault((sid, target), _evolution_edge(ev))
+        pre = resolve_species_ref(sdata.get("preEvolution"), known)
+        if pre and pre != sid:
+            edges.setdefault((pre, sid), {"variant": ""})
+
+    # connected components via union-find, then stages by BFS distance from the roots
+    # (form changes like silvally <-> silvally_fire make cycles, so this is not a strict DAG walk)
+    parent = {}
+    def find(x):
+        while parent.get(x, x) != x:
+            parent[x] = parent.get(parent[x], parent[x])
+            x = parent[x]
+        return x
+    for a, b in edges:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[ra] = rb
+    rank = {sid: i for i, sid in enumerate(order)}
+    members = defaultdict(list)
+    for sid in {x for e in edges for x in e}:
+        members[find(sid)].append(sid)
+    children = defaultdict(list)
+    has_parent = set()
+    for a, b in edges:
+        children[a].append(b)
+        has_parent.add(b)
+
+    families, family_of = [], {}
+    for group in sorted(members.values(), key=lambda g: min(rank[x] for x in g)):
+        group.sort(key=rank.get)
+        depth = {}
+        for seed in [sid for sid in group if sid not in has_parent] + group:  # a pure cycle has no root
+            if seed in depth:
+                continue
+            depth[seed] = 0
+            queue = [seed]
+            for sid in queue:
+                for child in sorted(children[sid], key=rank.get):
+                    if child not in depth:
+                        depth[child] = depth[sid] + 1
+                        queue.append(child)
+        nodes = sorted(group, key=lambda x: (depth[x], rank[x]))
+        index = {sid: i for i, sid in enumerate(nodes)}
+        fam_edges = sorted(([index[a], index[b], e] for (a, b), e in edges.items() if a in index),
+                           key=lambda x: (x[0], x[1]))
+        for sid in nodes:
+            family_of[sid] = len(families)
+        families.append({"nodes": nodes, "depth": [depth[x] for x in nodes], "edges": fam_edges})
+    return {"version": 1, "families": families, "family": family_of, "unresolved": unresolved}
+
+def write_evolutions(ctx: dict):
+    data = build_evolution_families(ctx)
+    unresolved = data.pop("unresolved")
+    _write_if_changed(EVOLUTIONS_OUT, out_bytes(data, compact=True))
+    print(f"Wrote {EVOLUTIONS_OUT} with {len(data['families'])} families "
+          f"({len(data['family'])} species, {unresolved} unresolved evolution targets)")
+    write_neighbors(ctx, data)
+
+# ------------------------- Prefetch hints (out/neighbors.json) -------------------------
+# Per species, the mon pages a visitor most likely opens next, so the site can fetch them while
+# idle: nearest evolution stages, the previous/next dex number, then other forms of the species.
+NEIGHBOR_LIMIT = 8
+
+def build_neighbors(ctx: dict, families: dict) -> list:
+    """[[dex.json row, ...] per row] in dex.json row order."""
+    order = ctx["mon_order"]
+    rank = {sid: i for i, sid in enumerate(order)}
+    by_dex = defaultdict(list)  # dexnum -> ids in row order
+    dexnum = {}
+    for sid in order:
+        n = _stat_int(ctx["dex_rows"][sid].get("dexnum"))
+        if n is not None:
+            dexnum[sid] = n
+            by_dex[n].append(sid)
+    numbers = sorted(by_dex)
+    position = {n: i for i, n in enumerate(numbers)}
+    variants = defaultdict(list)  # base id -> variant ids
+    for sid in order:
+        base = ctx["species_full"][sid].get("variantOf")
+        if base in rank:
+            variants[base].append(sid)
+
+    out = []
+    for sid in order:
+        family = []
+        idx = families["family"].get(sid)
+        if idx is not None:
+            fam = families["families"][idx]
+            mine = fam["depth"][fam["nodes"].index(sid)]
+            family = [x for _, _, x in sorted((abs(d - mine), rank[x], x) for x, d in zip(fam["nodes"], fam["depth"]))]
+        adjacent = []
+        if sid in dexnum:
+            i = position[dexnum[sid]]
+            adjacent = [by_dex[numbers[j]][0] for j in (i - 1, i + 1) if 0 <= j < len(numbers)]
+        base = ctx["species_full"][sid].get("variantOf")
+        forms = by_dex.get(dexnum.get(sid), []) + ([base] if base in rank else []) + variants[base or sid]
+
+        picked = []
+        for x in family[:4] + adjacent + forms[:2] + family[4:] + forms[2:]:
+            if x != sid and x not in picked:
+                picked.append(x)
+        out.append([rank[x] for x in picked[:NEIGHBOR_LIMIT]])
+    return out
+
+def write_neighbors(ctx: dict, families: dict):
+    neighbors = build_neighbors(ctx, families)
+    _write_if_changed(NEIGHBORS_OUT, out_bytes({
+        "version": 1,
+        "rows": len(neighbors),
+        "neighbors": neighbors,
+    }, compact=True))
+    print(f"Wrote {NEIGHBORS_OUT} ({sum(map(len, neighbors))} prefetch hints for {len(neighbors)} species)")
+
+# ------------------------- Interned spawn conditions (out/conditions.json) -------------------------
+# With --intern-conditions every spawn keeps only its own rarity/weight/levels/source and points
+# at its condition block (presets, contexts, times, biomeTags, nearbyBlocks, sky, ...) by content
+# hash. Blocks repeat across spawns and species, so the shared table is far smaller than the
+# copies it replaces, and ids only depend on content (incremental rebuilds stay local).
+SPAWN_OWN_KEYS = ("rarity", "weight", "levels", "source")
+
+def condition_id(block: dict) -> str:
+    canon = json.dumps(block, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(canon.encode("utf-8")).hexdigest()[:12]
+
+def _split_spawn(spawn: dict) -> tuple:
+    own = {k: v for k, v in spawn.items() if k in SPAWN_OWN_KEYS}
+    block = {k: v for k, v in spawn.items() if k not in SPAWN_OWN_KEYS}
+    return own, block
+
+def intern_mon_conditions(mon: dict) -> dict:
+    """Copy of `mon` whose spawns carry "cond": <id> in place of their condition keys."""
+    groups = []
+    for group in mon["spawns"]:
+        spawns = []
+        for spawn in group:
+            own, block = _split_spawn(spawn)
+            if block:
+                own["cond"] = condition_id(block)
+            spawns.append(own)
+        groups.append(spawns)
+    return {**mon, "spawns": groups}
+
+def write_conditions(ctx: dict):
+    if not ctx["intern_conditions"]:
+        CONDITIONS_OUT.unlink(missing_ok=True)  # mon files are self-contained again
+        return
+    table = {}
+    for sid in ctx["mon_order"]:
+        for group in ctx["spawn_entries"][sid]:
+            for spawn in group:
+                _, block = _split_spawn(spawn)
+                if not block:
+                    continue
+                cid = condition_id(block)
+                if table.setdefault(cid, block) != block:
+                    raise RuntimeError(f"condition id collision on {cid}")
+    _write_if_changed(CONDITIONS_OUT, out_bytes(dict(sorted(table.items())), compact=True))
+    print(f"Wrote {CONDITIONS_OUT} with {len(table)} spawn condition blocks")
+
+# ------------------------- Offline cache manifest (out/precache.json) -------------------------
+# Read by site/sw.js: "core" files are precached on install, mons and sprites (+ atlas sheets) are cached as they
+# are viewed. Every entry is [content hash, size]; when a deploy changes the manifest the worker
+# re-fetches exactly the entries whose hash changed and drops the stale mons/sprites.
+PRECACHE_CORE = (
+    "dex.json", "presets.json", "biomes.json", "sprite_icons.json", "evolutions.json", "conditions.json",
+    "search/manifest.json", "moves/table.json", "drops/index.json", "atlas.json", "neighbors.json",
+)
+
+def _content_hash(path: Path):
+    data = path.read_bytes()
+    return [hashlib.sha1(data).hexdigest()[:10], len(data)]
+
+def write_precache(ctx: dict):
+    core = {rel: _content_hash(OUT_DIR / rel) for rel in PRECACHE_CORE if (OUT_DIR / rel).is_file()}
+    mons = {sid: _content_hash(MONS_DIR / f"{sid}.json") for sid in ctx["mon_order"]}
+    images = [p for d in (SPRITES_DIR, ATLAS_DIR) if d.is_dir() for p in d.rglob("*.png")]
+    sprites = {
+        p.relative_to(OUT_DIR).as_posix(): _content_hash(p)
+        for p in sorted(images, key=lambda x: x.as_posix())
+    }
+    entries = {"core": core, "mons": mons, "sprites": sprites}
+    build = hashlib.sha1(json.dumps(entries, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    _write_if_changed(PRECACHE_OUT, out_bytes({"version": 1, "build": build, **entries}, compact=True))
+    size = sum(v[1] for v in core.values())
+    print(f"Wrote {PRECACHE_OUT} ({len(core)} core files, {size / 1024:.0f} KB; {len(mons)} mons, {len(sprites)} sprites)")
+
+# ------------------------- SQLite export (out/dex.sqlite, --sqlite) -------------------------
+# The same data as out/mons/ in normalized tables, for ad-hoc SQL instead of one-off scripts:
+#   sqlite3 out/dex.sqlite "SELECT biome, count(*) FROM spawn_biomes GROUP BY biome ORDER BY 2 DESC"
+# Rebuilt from scratch each time (into a temp file, then swapped in), one transaction.
+SQLITE_SCHEMA = """
+CREATE TABLE species (
+    row INTEGER PRIMARY KEY,  -- dex.json row
+    id TEXT NOT NULL UNIQUE, name TEXT, dexnum INTEGER,
+    primary_type TEXT, secondary_type TEXT, male_ratio REAL, experience_group TEXT, catch_rate INTEGER,
+    hp INTEGER, attack INTEGER, defence INTEGER, special_attack INTEGER, special_defence INTEGER, speed INTEGER,
+    bst INTEGER,
+    ev_hp INTEGER, ev_attack INTEGER, ev_defence INTEGER, ev_special_attack INTEGER, ev_special_defence INTEGER,
+    ev_speed INTEGER,
+    implemented INTEGER NOT NULL
+);
+CREATE TABLE forms (species_id TEXT NOT NULL, name TEXT NOT NULL);
+CREATE TABLE abilities (species_id TEXT NOT NULL, ability TEXT NOT NULL, hidden INTEGER NOT NULL);
+CREATE TABLE egg_groups (species_id TEXT NOT NULL, egg_group TEXT NOT NULL);
+CREATE TABLE tags (species_id TEXT NOT NULL, tag TEXT NOT NULL);  -- species labels (gen1, legendary, ...)
+CREATE TABLE biome_tags (tag TEXT NOT NULL, biome TEXT NOT NULL);  -- fully expanded
+CREATE TABLE spawns (
+    spawn_id INTEGER PRIMARY KEY, species_id TEXT NOT NULL, pool INTEGER NOT NULL,
+    rarity TEXT, weight REAL, level_min INTEGER, level_max INTEGER,
+    contexts TEXT, times TEXT,  -- comma-separated
+    source TEXT,
+    conditions TEXT             -- every other spawn key, as JSON
+);
+CREATE TABLE spawn_biomes (spawn_id INTEGER NOT NULL, biome TEXT NOT NULL);
+CREATE TABLE drops (species_id TEXT NOT NULL, item TEXT NOT NULL, percentage REAL, quantity_range TEXT, source TEXT);
+CREATE TABLE moves (species_id TEXT NOT NULL, move TEXT NOT NULL, method TEXT NOT NULL, level INTEGER NOT NULL);
+CREATE TABLE sources (species_id TEXT NOT NULL, source TEXT NOT NULL);  -- species definition files
+"""
+SQLITE_INDEXES = """
+CREATE INDEX species_dexnum ON species(dexnum);
+CREATE INDEX forms_species ON forms(species_id);
+CREATE INDEX abilities_species ON abilities(species_id);
+CREATE INDEX abilities_ability ON abilities(ability);
+CREATE INDEX egg_groups_species ON egg_groups(species_id);
+CREATE INDEX egg_groups_group ON egg_groups(egg_group);
+CREATE INDEX tags_species ON tags(species_id);
+CREATE INDEX tags_tag ON tags(tag);
+CREATE INDEX biome_tags_tag ON biome_tags(tag);
+CREATE INDEX biome_tags_biome ON biome_tags(biome);
+CREATE INDEX spawns_species ON spawns(species_id);
+CREATE INDEX spawn_biomes_spawn ON spawn_biomes(spawn_id);
+CREATE INDEX spawn_biomes_biome ON spawn_biomes(biome);
+CREATE INDEX drops_species ON drops(species_id);
+CREATE INDEX drops_item ON drops(item);
+CREATE INDEX moves_species ON moves(species_id);
+CREATE INDEX moves_move ON moves(move);
+CREATE INDEX sources_species ON sources(species_id);
+"""
+SQLITE_SPAWN_COLUMNS = ("rarity", "weight", "levels", "contexts", "times", "source")
+
+def _level_range(levels) -> tuple:
+    """'16-32' -> (16, 32), '5' -> (5, 5); (None, None) when it isn't a level range."""
+    lo, _, hi = str(levels or "").partition("-")
+    lo, hi = _stat_int(lo), _stat_int(hi or lo)
+    return (lo, hi) if lo is not None and hi is not None else (None, None)
+
+def _num(v):
+    return v if isinstance(v, (int, float)) and not isinstance(v, bool) else None
+
+def sqlite_rows(ctx: dict) -> dict:
+    """{ table: [tuple, ...] } in SQLITE_SCHEMA column order, from out/mons/ and ctx."""
+    t = defaultdict(list)
+    resolved = {}
+    spawn_id = 0
+    for row, sid in enumerate(ctx["mon_order"]):
+        mon = json_loads((MONS_DIR / f"{sid}.json").read_bytes())
+        stats = mon.get("baseStats") if isinstance(mon.get("baseStats"), dict) else {}
+        evs = mon.get("evYield") if isinstance(mon.get("evYield"), dict) else {}
+        base = [_stat_int(stats.get(k)) for k in STAT_FIELDS]
+        t["species"].append((
+            row, sid, mon.get("name"), _stat_int(mon.get("dexnum")),
+            mon.get("primaryType") or None, mon.get("secondaryType") or None, _num(mon.get("maleRatio")),
+            mon.get("experienceGroup") or None, _stat_int(mon.get("catchRate")),
+            *base, sum(base) if None not in base else None,
+            *(_stat_int(evs.get(k)) for k in STAT_FIELDS),
+            1 if mon.get("implemented") else 0,
+        ))
+        t["forms"] += [(sid, f) for f in mon.get("forms") or [] if isinstance(f, str)]
+        for a in mon.get("abilities") or []:
+            if isinstance(a, str):
+                hidden = a.startswith("h:")
+                t["abilities"].append((sid, a[2:] if hidden else a, int(hidden)))
+        t["egg_groups"] += [(sid, g) for g in mon.get("eggGroups") or [] if isinstance(g, str)]
+        t["tags"] += [(sid, lab) for lab in mon.get("labels") or [] if isinstance(lab, str)]
+        t["sources"] += [(sid, src) for src in mon.get("speciesSources") or []]
+        for ent in (mon.get("drops") or {}).get("entries") or []:
+            qr = ent.get("quantityRange")
+            t["drops"].append((sid, (ent.get("item") or "").strip().lower(), _num(ent.get("percentage")),
+                               None if qr is None else str(qr), ent.get("source")))
+        t["moves"] += [(sid, name, method, level) for method, name, level in ctx["move_lists"].get(sid, [])]
+        # spawns from ctx: mon files may carry interned conditions (--intern-conditions)
+        for pool, group in enumerate(ctx["spawn_entries"].get(sid, [])):
+            for entry in group:
+                spawn_id += 1
+                rest = {k: v for k, v in entry.items() if k not in SQLITE_SPAWN_COLUMNS}
+                t["spawns"].append((
+                    spawn_id, sid, pool, entry.get("rarity"), _num(entry.get("weight")),
+                    *_level_range(entry.get("levels")),
+                    ",".join(entry.get("contexts") or []) or None, ",".join(entry.get("times") or []) or None,
+                    entry.get("source"), json.dumps(rest, sort_keys=True, ensure_ascii=False) if rest else None,
+                ))
+                t["spawn_biomes"] += [(spawn_id, b) for b in spawn_biomes(entry, ctx["biome_tag_map"], resolved)]
+    for tag in sorted(ctx["biome_tag_map"]):
+        t["biome_tags"] += [(tag, b) for b in resolve_biome_selectors(tag, ctx["biome_tag_map"])]
+    return t
+
+def write_sqlite(ctx: dict):
+    if not ctx["sqlite"]:
+        SQLITE_OUT.unlink(missing_ok=True)
+        return
+    tables = sqlite_rows(ctx)
+    tmp = SQLITE_OUT.with_suffix(".sqlite.tmp")
+    tmp.unlink(missing_ok=True)
+    con = sqlite3.connect(tmp)
+    try:
+        # a fresh file that's swapped in whole: no journal / fsync needed
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        con.executescript(SQLITE_SCHEMA)
+        with con:
+            for name, rows in tables.items():
+                if rows:
+                    marks = ",".join("?" * len(rows[0]))
+                    con.executemany(f"INSERT INTO {name} VALUES ({marks})", rows)
+        con.executescript(SQLITE_INDEXES)
+        con.execute("ANALYZE")
+        con.commit()
+    finally:
+        con.close()
+    os.replace(tmp, SQLITE_OUT)
+    print(f"Wrote {SQLITE_OUT} ({len(tables['species'])} species, {len(tables['spawns'])} spawns, "
+          f"{len(tables['spawn_biomes'])} spawn biomes, {len(tables['moves'])} moves)")
+
+# ------------------------- Binary bundle (out/dex.bundle, --bundle) -------------------------
+# Everything in out/ in one memory-mappable file (read with scripts/dex_bundle.py or
+# site/utils/bundle.js). Little-endian; offsets are absolute unless noted.
+#
+#   header   BUNDLE_HEADER (48 bytes)
+#   records  mon_count x BUNDLE_RECORD, sorted by id (UTF-8 byte order) for binary search
+#   strings  u32[string_count + 1] offsets (relative to the string data) + UTF-8 data; string 0 is ""
+#   sections section_count x (u32 name string, u32 offset, u32 length); offsets relative to blobs
+#   blobs    8-byte aligned: compact mon JSON (one per record), then section bytes
+#
+# Records hold the numeric/categorical fields so analytics read them without parsing any JSON;
+# the full mon (as in out/mons/<id>.json) is the record's blob. Sections carry the other
+# outputs (dex.json, moves/..., sprites/...png) under their out/-relative path.
+BUNDLE_MAGIC = b"DEXB"
+BUNDLE_VERSION = 2  # v2: u32 dex.json row (was u16)
+# magic, version, header size, mon count, record size, records off, string count, strings off,
+# section count, sections off, blobs off, total size, reserved
+BUNDLE_HEADER = struct.Struct("<4sHHIIIIIIIIII")
+# id, name, dexnum, dex.json row, primaryType, secondaryType, baseStats x6 (STAT_FIELDS order),
+# evYield x6, catchRate, spawnCount, flags (bit 0: implemented), mon blob offset, mon blob length
+BUNDLE_RECORD = struct.Struct("<IIHIII6H6BHHHII")
+BUNDLE_NONE = 0xFFFF  # u16 "missing" (stat / catchRate / dexnum not a number)
+BUNDLE_SKIP = ("parse_report.json", "provenance.json", "dex.sqlite")  # diagnostics / other exports
+
+def _u16(v) -> int:
+    v = _stat_int(v)
+    return v if v is not None and 0 <= v < BUNDLE_NONE else BUNDLE_NONE
+
+def build_bundle(ctx: dict) -> bytes:
+    order = ctx["mon_order"]
+    strings = {"": 0}
+    def intern(value) -> int:
+        return strings.setdefault(str(value or ""), len(strings))
+
+    rows = {sid: i for i, sid in enumerate(order)}
+    blobs = bytearray()
+    records = []
+    for sid in sorted(order, key=lambda x: x.encode("utf-8")):
+        mon = json_loads((MONS_DIR / f"{sid}.json").read_bytes())
+        blob = json_dumps(mon, compact=True)
+        stats = mon.get("baseStats") if isinstance(mon.get("baseStats"), dict) else {}
+        evs = mon.get("evYield") if isinstance(mon.get("evYield"), dict) else {}
+        records.append(BUNDLE_RECORD.pack(
+            intern(sid), intern(mon.get("name")), _u16(mon.get("dexnum")), rows[sid],
+            intern(mon.get("primaryType")), intern(mon.get("secondaryType")),
+            *(_u16(stats.get(k)) for k in STAT_FIELDS),
+            *(min(max(_stat_int(evs.get(k)) or 0, 0), 255) for k in STAT_FIELDS),
+            _u16(mon.get("catchRate")), min(ctx["dex_rows"][sid].get("spawnCount", 0), BUNDLE_NONE),
+            1 if mon.get("implemented") else 0,
+            len(blobs), len(blob),
+        ))
+        blobs += blob
+
+    sections = []
+    for path in sorted(OUT_DIR.rglob("*"), key=lambda x: x.as_posix()):
+        rel = path.relative_to(OUT_DIR).as_posix()
+        if not path.is_file() or rel.startswith("mons/") or rel in BUNDLE_SKIP or path == BUNDLE_OUT:
             continue
-        _added_ids.add(sid)
+        data = path.read_bytes()
+        sections.append((intern(rel), len(blobs), len(data)))
+        blobs += data
+
+    encoded = [k.encode("utf-8") for k in strings]  # dict order == string index
+    offsets, pos = [], 0
+    for e in encoded:
+        offsets.append(pos)
+        pos += len(e)
+    offsets.append(pos)
+    string_block = struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(encoded)
+    section_block = b"".join(struct.pack("<III", *sec) for sec in sections)
+
+    records_off = BUNDLE_HEADER.size
+    strings_off = records_off + BUNDLE_RECORD.size * len(records)
+    sections_off = strings_off + len(string_block)
+    blobs_off = -(-(sections_off + len(section_block)) // 8) * 8
+    total = blobs_off + len(blobs)
+    header = BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, BUNDLE_HEADER.size, len(records),
+                                BUNDLE_RECORD.size, records_off, len(encoded), strings_off,
+                                len(sections), sections_off, blobs_off, total, 0)
+    pad = b"\0" * (blobs_off - sections_off - len(section_block))
+    return b"".join((header, *records, string_block, section_block, pad, bytes(blobs)))
+
+def write_bundle(ctx: dict):
+    if not ctx["bundle"]:
+        BUNDLE_OUT.unlink(missing_ok=True)  # don't leave a stale bundle next to fresh outputs
+        return
+    data = build_bundle(ctx)
+    _write_if_changed(BUNDLE_OUT, data)
+    print(f"Wrote {BUNDLE_OUT} ({len(data) / 2**20:.1f} MB, {len(ctx['mon_order'])} mons)")
+
+# ------------------------- Moves (out/moves/) -------------------------
+# Species list moves as strings ("12:tackle", "tm:earthquake", "egg:...", "tutor:..."). They are
+# parsed once here: mon files carry integer moveRefs into moves/table.json, and
+# moves/learners/<shard>.json answers "who learns X" without touching any mon file.
+MOVE_METHODS = ("level", "egg", "tm", "tutor")  # fixed ids; other prefixes follow, sorted
+# one int per move, so the indented mon files keep one short line per move:
+#   ref = move_id << 14 | method_id << 10 | level
+MOVE_LEVEL_BITS, MOVE_METHOD_BITS = 10, 4
+
+def parse_move(entry) -> tuple:
+    """'12:tackle' -> ('level', 'tackle', 12), 'tm:earthquake' -> ('tm', 'earthquake', 0),
+    'tackle' -> ('other', 'tackle', 0). Same split as splitMove() in site/utils/helpers.js."""
+    s = str(entry).strip()
+    head, sep, tail = s.partition(":")
+    head = head.strip()
+    if not sep:
+        return "other", s, 0
+    tail = tail.split(":", 1)[0].strip()
+    if head.isascii() and head.isdigit():
+        return "level", tail, int(head)
+    return head.lower(), tail, 0
+
+def build_move_table(ctx: dict) -> dict:
+    """Parse every emitted species' moves into ctx["move_lists"]; returns the interned table."""
+    lists, names, methods = {}, set(), set()
+    for sid in ctx["mon_order"]:
+        raw = ctx["species_full"][sid].get("moves")
+        parsed = [parse_move(m) for m in raw] if isinstance(raw, list) else []
+        lists[sid] = parsed
+        for method, name, _ in parsed:
+            methods.add(method)
+            names.add(name)
+    ctx["move_lists"] = lists
+    extra = sorted(methods - set(MOVE_METHODS))
+    return {"methods": [*MOVE_METHODS, *extra], "moves": sorted(names)}
+
+def _move_ids(table: dict) -> tuple:
+    cached = table.get("_ids")
+    if cached is None:
+        cached = table["_ids"] = ({m: i for i, m in enumerate(table["methods"])},
+                                  {n: i for i, n in enumerate(table["moves"])})
+    return cached
+
+def _unpackable(method_id: int, level: int) -> bool:
+    return not (0 <= level < 1 << MOVE_LEVEL_BITS and method_id < 1 << MOVE_METHOD_BITS)
+
+def encode_moves(parsed: list, table: dict) -> list:
+    """Packed refs (see MOVE_LEVEL_BITS) into the table, in source order; None when an entry
+    doesn't fit the layout (a level past MOVE_LEVEL_BITS, a method id past MOVE_METHOD_BITS)."""
+    method_ids, move_ids = _move_ids(table)
+    out = []
+    for method, name, level in parsed:
+        if _unpackable(method_ids[method], level):
+            return None
+        out.append(move_ids[name] << (MOVE_LEVEL_BITS + MOVE_METHOD_BITS) | method_ids[method] << MOVE_LEVEL_BITS | level)
+    return out
 
-        base_id = sdata.get("variantOf")
-        raw_spawns_list = spawns_by_species.get(sid, [])
-        if not raw_spawns_list and base_id:
-            raw_spawns_list = spawns_by_species.get(base_id, [])
+def _moves_field(sid: str, sdata: dict, ctx: dict) -> dict:
+    """{"moveRefs": [...]}, or the source strings as {"moves": [...]} (the pre-moveRefs format the
+    site still reads) when some entry can't be packed; those entries go to the parse report."""
+    parsed = ctx["move_lists"].get(sid, [])
+    refs = encode_moves(parsed, ctx["move_table"])
+    if refs is not None:
+        _PARSE_LOG["moves"].pop(sid, None)
+        return {"moveRefs": refs}
+    method_ids, _ = _move_ids(ctx["move_table"])
+    raw = [str(m).strip() for m in sdata.get("moves", [])]
+    _PARSE_LOG["moves"][sid] = [r for r, (method, _, level) in zip(raw, parsed) if _unpackable(method_ids[method], level)]
+    return {"moves": raw}
+
+def write_move_index(ctx: dict):
+    order = ctx["mon_order"]
+    table = ctx["move_table"]
+    method_ids, _ = _move_ids(table)
+    learners = defaultdict(list)  # move -> flat [row, method, level, ...] (rows index dex.json)
+    for row, sid in enumerate(order):
+        for method, name, level in dict.fromkeys(ctx["move_lists"][sid]):
+            learners[name] += (row, method_ids[method], level)
+
+    shards = defaultdict(dict)
+    for name in sorted(learners):
+        shards[_search_shard(name or "0")][name] = learners[name]
+    learners_dir = MOVES_DIR / "learners"
+    learners_dir.mkdir(parents=True, exist_ok=True)
+    for key, shard in shards.items():
+        _write_if_changed(learners_dir / f"{key}.json", out_bytes(shard, compact=True))
+    for stale in learners_dir.glob("*.json"):
+        if stale.stem not in shards:
+            stale.unlink()
+    _write_if_changed(MOVES_DIR / "table.json", out_bytes({
+        "version": 1,
+        "rows": len(order),
+        "levelBits": MOVE_LEVEL_BITS,
+        "methodBits": MOVE_METHOD_BITS,
+        "methods": table["methods"],
+        "moves": table["moves"],
+        "shards": sorted(shards),
+    }, compact=True))
+    print(f"Wrote {MOVES_DIR} with {len(table['moves'])} moves in {len(shards)} learner shards")
+
+# ------------------------- Search index (out/search/) -------------------------
+# Inverted index over dex.json rows: field -> token -> posting list of row numbers (the position
+# in dex.json), sharded by the token's first character so the site fetches only the shards a
+# query touches. Posting lists are delta-encoded ([3, 1, 5] means rows 3, 4, 9).
+SEARCH_FIELDS = ("name", "ability", "move", "egg", "label", "biome")
+_BIOME_TAG_NOISE = {"is", "has"}
+
+def search_tokens(text) -> list:
+    """Lowercase ASCII word tokens, accents folded. Mirrors tokenize() in site/utils/search.js."""
+    if not isinstance(text, str):
+        return []
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return [t for t in re.split(r"[^a-z0-9]+", text.lower()) if t]
+
+def _index_tokens(value) -> set:
+    # words plus the joined form, so "sparse jungle" / "flame thrower" prefix-match
+    # 'sparse_jungle' / 'flamethrower' the way the site joins a field term's words
+    toks = search_tokens(value)
+    return set(toks) | ({"".join(toks)} if len(toks) > 1 else set())
+
+def _strip_ns(value) -> str:
+    # 'h:chlorophyll' / '12:tackle' / 'minecraft:plains' / '#cobblemon:is_jungle' -> last segment
+    return value.rsplit(":", 1)[-1] if isinstance(value, str) else ""
+
+def _search_terms(mon: dict, moves: list) -> dict:
+    """Raw searchable values of one mon (`moves` as parsed by parse_move); biome selectors are kept
+    unresolved so a biome tag change only needs the index rewritten, not the mon rebuilt."""
+    def as_list(v):
+        return v if isinstance(v, list) else []
+
+    biome_sels = []
+    for group in as_list(mon.get("spawns")):
+        for entry in (group if isinstance(group, list) else [group]):
+            tags = (entry or {}).get("biomeTags") or {}
+            biome_sels.append((tuple(as_list(tags.get("include"))), tuple(as_list(tags.get("exclude")))))
+    return {
+        "name": [mon.get("name"), mon.get("id")],
+        "ability": [_strip_ns(a) for a in as_list(mon.get("abilities"))],
+        "move": [_strip_ns(name) for _, name, _ in moves],
+        "egg": as_list(mon.get("eggGroups")),
+        "label": as_list(mon.get("labels")),
+        "biome": sorted(set(biome_sels)),
+    }
 
-        # NEW: extract spawn-sourced drops
-        spawn_drop_objs = []
-        for raw in raw_spawns_list:
-            for s in raw.get("spawns", []):
-                extracted = _extract_drops_from_spawn(s)
-                if extracted:
-                    spawn_drop_objs.append(extracted)
+def _search_shard(token: str) -> str:
+    return token[0] if "a" <= token[0] <= "z" else "0"
 
-        # NEW: merge species-level drops with spawn-level drops
-        merged_drops = _merge_drops(sdata.get("drops") or {}, spawn_drop_objs)
+def _delta_encode(rows):
+    out, prev = [], 0
+    for r in rows:
+        out.append(r - prev)
+        prev = r
+    return out
 
-        # --- aggregate drops for the global index (using merged drops now) ---
-        for ent in merged_drops.get("entries", []):
-            item = (ent.get("item") or "").strip().lower()
-            if not item:
-                continue
-            prev = items_to_mons[item].get(sid)
-            curr = {
-                "id": sid,
-                "name": sdata.get("name", sid),
-                "percentage": ent.get("percentage"),
-                "quantityRange": ent.get("quantityRange"),
-                # You *can* keep biome metadata here if you want later filtering:
-                # "biomes": ent.get("biomes"),
-            }
-            if ent.get("biomes"):
-                curr["biomes"] = ent["biomes"]
-            if ent.get("excludeBiomes"):
-                curr["exclusiveBiomes"] = ent["excludeBiomes"]
-            if not prev or (curr["percentage"] is not None and prev.get("percentage") is None):
-                items_to_mons[item][sid] = curr
-
-        # keep your spawn flattening (for the UI spawn tab), unchanged:
-        spawn_entries = []
-        for raw in raw_spawns_list:
-            flattened = flatten_spawn_entry_linked(raw, block_tag_map)
-            if flattened == []:
+def write_search_index(ctx: dict):
+    order = ctx["mon_order"]
+    biome_tag_map = ctx["biome_tag_map"]
+    resolved = {}  # (include, exclude) -> concrete biome tokens + tag words
+    postings = {f: defaultdict(list) for f in SEARCH_FIELDS}
+
+    for row, sid in enumerate(order):
+        terms = ctx["search_terms"][sid]
+        tokens = {f: set() for f in SEARCH_FIELDS}
+        for f in SEARCH_FIELDS:
+            if f == "biome":
                 continue
-            spawn_entries.append(flattened)
-        
-        no_spawns = []
-        if len(spawn_entries) == 0:
-            no_spawns.append(sid)
-
-        # Optionally include sprite refs
-        images = {}
-        if isinstance(sprites_map, dict):
-            images = sprites_map.get(sid) or (sprites_map.get(base_id) if base_id else {}) or {}
-
-        mon = {
-            "id": sid,
-            "dexnum": sdata.get("nationalPokedexNumber", ""),
-            "name": sdata.get("name", sid),
-            "primaryType": sdata.get("primaryType", ""),
-            "secondaryType": sdata.get("secondaryType", ""),
-            "maleRatio": sdata.get("maleRatio", ""),
-            "labels": sdata.get("labels", []),
-            "abilities": sdata.get("abilities", []),
-            "eggGroups": sdata.get("eggGroups", []),
-            "baseStats": sdata.get("baseStats", {}),
-            "evYield": sdata.get("evYield", {}),
-            "experienceGroup": sdata.get("experienceGroup", ""),
-            "catchRate": sdata.get("catchRate", ""),
-            # ⟵ NEW: assign merged drops here
-            "drops": merged_drops,
-            "moves": sdata.get("moves", []),
-            "forms": [f.get("name") for f in sdata.get("forms", [])] if isinstance(sdata.get("forms"), list) else [],
-            "types": sdata.get("types", []),
-            "evolutions": sdata.get("evolutions", []),
-            "spawns": spawn_entries,
-            "implemented": sdata.get("implemented", False),
-            "images": images,
-            "speciesSources": _sources_for(sid)
-        }
+            for value in terms[f]:
+                tokens[f] |= _index_tokens(value)
+        for sel in terms["biome"]:
+            if sel not in resolved:
+                inc, exc = sel
+                biomes = set(resolve_biome_selectors(list(inc), biome_tag_map)) - \
+                    set(resolve_biome_selectors(list(exc), biome_tag_map))
+                words = set()
+                for b in biomes:
+                    words |= _index_tokens(_strip_ns(b))
+                for tag in inc:
+                    if isinstance(tag, str) and tag.startswith("#"):
+                        words |= _index_tokens(_strip_ns(tag)) - _BIOME_TAG_NOISE
+                resolved[sel] = words
+            tokens["biome"] |= resolved[sel]
+        for f, toks in tokens.items():
+            for tok in toks:
+                postings[f][tok].append(row)  # rows ascend because `order` is walked once
+
+    shards = defaultdict(dict)
+    for f in SEARCH_FIELDS:
+        for tok in sorted(postings[f]):
+            shards[_search_shard(tok)].setdefault(f, {})[tok] = _delta_encode(postings[f][tok])
+
+    SEARCH_DIR.mkdir(parents=True, exist_ok=True)
+    for key, shard in shards.items():
+        _write_if_changed(SEARCH_DIR / f"{key}.json", out_bytes(shard, compact=True))
+    for stale in SEARCH_DIR.glob("*.json"):
+        if stale.stem != "manifest" and stale.stem not in shards:
+            stale.unlink()
+    _write_if_changed(SEARCH_DIR / "manifest.json", out_bytes({
+        "version": 1,
+        "rows": len(order),
+        "fields": list(SEARCH_FIELDS),
+        "encoding": "delta",
+        "shards": sorted(shards),
+    }))
+    n_tokens = sum(len(p) for p in postings.values())
+    print(f"Wrote {SEARCH_DIR} with {n_tokens} tokens in {len(shards)} shards")
+
+# ------------------------- Biome -> species spawn index (out/biome_spawns/) -------------------------
+# One file per concrete biome ('minecraft:plains' -> biome_spawns/minecraft/plains.json) listing every
+# flattened spawn entry whose biome tags resolve to it and the biome's spawn odds (see spawn_odds),
+# plus index.json with the per-biome counts.
+RARITY_ORDER = {"common": 0, "uncommon": 1, "rare": 2, "ultra-rare": 3}
+BIOME_SPAWN_KEYS = ("rarity", "weight", "levels", "times", "contexts")
+
+def biome_spawn_file(biome: str) -> str:
+    ns, _, path = biome.partition(":")
+    return f"{ns}/{path}.json"
+
+def spawn_biomes(entry: dict, biome_tag_map: dict, cache: dict) -> list:
+    """Concrete biomes of one flattened spawn (include minus exclude); cache is keyed by the selectors."""
+    tags = entry.get("biomeTags") or {}
+    sel = (tuple(tags.get("include") or []), tuple(tags.get("exclude") or []))
+    if sel not in cache:
+        cache[sel] = sorted(
+            set(resolve_biome_selectors(list(sel[0]), biome_tag_map))
+            - set(resolve_biome_selectors(list(sel[1]), biome_tag_map)))
+    return cache[sel]
+
+def invert_spawns_by_biome(ctx: dict) -> dict:
+    """{ concrete biome: [ {id, rarity, weight, levels, times, contexts}, ... ] } over ctx["mon_order"]."""
+    resolved = {}
+    by_biome = defaultdict(list)
+    for sid in ctx["mon_order"]:
+        for group in ctx["spawn_entries"].get(sid, []):
+            for entry in group:
+                # the same spawn often ships in more than one pool (jar + datapack copy): keep it
+                # once. Compare whole entries, not rows, since spawns differing only in conditions
+                # the row leaves out (sky light, structures, y range...) each count toward the odds.
+                key = (sid, json.dumps({k: v for k, v in entry.items() if k != "source"}, sort_keys=True))
+                row = {"id": sid, **{k: entry[k] for k in BIOME_SPAWN_KEYS if k in entry}}
+                for biome in spawn_biomes(entry, ctx["biome_tag_map"], resolved):
+                    by_biome[biome].append((key, row))
+    for biome, keyed in by_biome.items():
+        seen, rows = set(), []
+        for key, r in keyed:
+            if key not in seen:
+                seen.add(key)
+                rows.append(r)
+        by_biome[biome] = rows
+        rows.sort(key=lambda r: (RARITY_ORDER.get(r.get("rarity"), len(RARITY_ORDER)),
+                                 -(r.get("weight") or 0), r["id"]))
+    return by_biome
 
-        # Write one file per mon (unchanged)
-        (MONS_DIR / f"{sid}.json").write_text(
-            json.dumps(mon, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-
-        # Keep the lean dex index as-is...
-        dex_index.append({
-            "id": mon["id"],
-            "name": mon["name"],
-            "dexnum": mon["dexnum"],
-            "primaryType": mon["primaryType"],
-            "secondaryType": mon["secondaryType"],
-            "spawnCount": len(spawn_entries)
-        })
-    
-    DEX_OUT.parent.mkdir(parents=True, exist_ok=True)
-    DEX_OUT.write_text(json.dumps(dex_index, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Wrote {DEX_OUT} with {len(dex_index)} entries")
-
-    # turn { item: {monId: {...}} } into { items: [{ item, mons: [...] }, ...] }
-    drops_index = {
-        "items": [
-            {
-                "item": item,
-                "mons": sorted(list(mdict.values()), key=lambda m: (m["name"], m["id"]))
+def spawn_odds(rows) -> dict:
+    """
+    { bucket: { context: { time: { species: percent } } } } for one biome's spawn rows.
+
+    Within a bucket the game picks among the eligible spawns proportionally to weight, so each
+    species' chance is its summed weight over the bucket/context/time total. Spawns without a
+    time condition are eligible at every time; "anytime" is the table when no timed spawn applies.
+    Time labels are taken as written (the data doesn't say that "noon" lies inside "day").
+    """
+    # single pass: sum weights per (bucket, context, time | None, species)
+    sums = defaultdict(float)
+    for r in rows:
+        weight = r.get("weight") or 0
+        if not isinstance(weight, (int, float)) or weight <= 0:
+            continue
+        bucket = r.get("rarity") or "unknown"
+        for context in r.get("contexts") or ["any"]:
+            for t in r.get("times") or [None]:
+                sums[(bucket, context, t, r["id"])] += weight
+
+    untimed = defaultdict(dict)                    # (bucket, context) -> {species: weight}
+    timed = defaultdict(lambda: defaultdict(dict))  # (bucket, context) -> time -> {species: weight}
+    for (bucket, context, t, sid), w in sums.items():
+        if t is None:
+            untimed[(bucket, context)][sid] = w
+        else:
+            timed[(bucket, context)][t][sid] = w
+
+    odds = {}
+    for bucket, context in sorted(set(untimed) | set(timed),
+                                  key=lambda bc: (RARITY_ORDER.get(bc[0], len(RARITY_ORDER)), bc)):
+        base = untimed.get((bucket, context), {})
+        per_time = {"anytime": base} if base else {}
+        for t, weights in sorted(timed.get((bucket, context), {}).items()):
+            merged = dict(base)
+            for sid, w in weights.items():
+                merged[sid] = merged.get(sid, 0) + w
+            per_time[t] = merged
+        for t, weights in per_time.items():
+            total = sum(weights.values())
+            odds.setdefault(bucket, {}).setdefault(context, {})[t] = {
+                sid: round(100 * w / total, 2)
+                for sid, w in sorted(weights.items(), key=lambda kv: (-kv[1], kv[0]))
             }
-            for item, mdict in sorted(items_to_mons.items(), key=lambda kv: kv[0])
-        ]
+    return odds
+
+def write_biome_spawns(ctx: dict):
+    by_biome = invert_spawns_by_biome(ctx)
+    wanted = set()
+    for biome, rows in by_biome.items():
+        path = BIOME_SPAWNS_DIR / biome_spawn_file(biome)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_if_changed(path, out_bytes({"biome": biome, "spawns": rows, "odds": spawn_odds(rows)}, compact=True))
+        wanted.add(path)
+    index_path = BIOME_SPAWNS_DIR / "index.json"
+    for stale in BIOME_SPAWNS_DIR.rglob("*.json"):
+        if stale not in wanted and stale != index_path:
+            stale.unlink()
+    _write_if_changed(index_path, out_bytes({
+        biome: {"file": biome_spawn_file(biome), "spawns": len(rows), "species": len({r["id"] for r in rows})}
+        for biome, rows in sorted(by_biome.items())
+    }))
+    print(f"Wrote {BIOME_SPAWNS_DIR} with spawn lists for {len(by_biome)} biomes")
+
+def write_drops_index(ctx: dict):
+    """
+    out/drops/index.json lists every item id (sorted) with its mon count; the mons live in
+    out/drops/<n>.json, DROPS_CHUNK items per file in index order, so the drops page only
+    fetches the chunks on screen and the site no longer loads drops at startup.
+    """
+    items_to_mons = defaultdict(lambda: {})  # item_id -> { mon_id: {id,name,percentage,quantityRange} }
+    for sid in ctx["mon_order"]:
+        for item, row in ctx["drop_rows"].get(sid, {}).items():
+            items_to_mons[item][sid] = row
+
+    # mons in display order: highest drop chance first, unknown chance last, then by name
+    items = [
+        (item, sorted(mdict.values(), key=lambda m: (-(m["percentage"] if m["percentage"] is not None else -1),
+                                                     (m["name"] or m["id"]).lower(), m["id"])))
+        for item, mdict in sorted(items_to_mons.items(), key=lambda kv: kv[0])
+    ]
+
+    DROPS_DIR.mkdir(parents=True, exist_ok=True)
+    n_chunks = (len(items) + DROPS_CHUNK - 1) // DROPS_CHUNK
+    for n in range(n_chunks):
+        chunk = dict(items[n * DROPS_CHUNK:(n + 1) * DROPS_CHUNK])
+        _write_if_changed(DROPS_DIR / f"{n}.json", out_bytes(chunk, compact=True))
+    for stale in DROPS_DIR.glob("*.json"):
+        if stale.stem != "index" and not (stale.stem.isdigit() and int(stale.stem) < n_chunks):
+            stale.unlink()
+    _write_if_changed(DROPS_DIR / "index.json", out_bytes({
+        "version": 1,
+        "chunk": DROPS_CHUNK,
+        "items": [[item, len(mons)] for item, mons in items],
+    }, compact=True))
+    DROPS_OUT.unlink(missing_ok=True)
+    print(f"Wrote {DROPS_DIR} with {len(items)} items in {n_chunks} chunks")
+
+def write_species_sources(ctx: dict):
+    # Build a sources map aligned to FINAL ids in the lean index
+    src_out = {sid: _sources_for(sid, ctx["species_sources"]) for sid in ctx["mon_order"]}
+    SPECIES_SOURCES_OUT.write_bytes(out_bytes(src_out))
+    print(f"Wrote {SPECIES_SOURCES_OUT} with {len(src_out)} species")
+
+# ------------------------- Sprite atlas (out/atlas/, --sprite-atlas) -------------------------
+# The dex list shows one icon per species; packing those into a few sheets turns ~1400 image
+# requests into a handful. PNGs are decoded/encoded here with zlib only (no imaging library).
+PNG_SIG = b"\x89PNG\r\n\x1a\n"
+ATLAS_SHEET = 512  # max sheet width/height in px
+ATLAS_PAD = 1      # transparent gap between sprites (no bleeding when scaled)
+
+def _paeth(a: int, b: int, c: int) -> int:
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+def png_decode(data: bytes):
+    """(width, height, RGBA bytearray), or None for PNGs this doesn't handle (interlaced, <8-bit gray)."""
+    if data[:8] != PNG_SIG:
+        return None
+    pos, idat, palette, trns, ihdr = 8, [], None, None, None
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            ihdr = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE":
+            palette = body
+        elif kind == b"tRNS":
+            trns = body
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+    if not ihdr:
+        return None
+    w, h, depth, ctype, _, _, interlace = ihdr
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}.get(ctype)
+    if not channels or interlace or (depth < 8 and ctype != 3) or depth not in (1, 2, 4, 8, 16):
+        return None
+    if ctype == 3 and not palette:
+        return None
+    bpp = max(1, channels * depth // 8)
+    stride = (w * channels * depth + 7) // 8
+    raw = zlib.decompress(b"".join(idat))
+    if len(raw) < h * (stride + 1):
+        return None
+
+    rgba = bytearray(w * h * 4)
+    prev = bytearray(stride)
+    for y in range(h):
+        ft = raw[y * (stride + 1)]
+        line = bytearray(raw[y * (stride + 1) + 1:(y + 1) * (stride + 1)])
+        if ft == 1:
+            for x in range(bpp, stride):
+                line[x] = (line[x] + line[x - bpp]) & 255
+        elif ft == 2:
+            for x in range(stride):
+                line[x] = (line[x] + prev[x]) & 255
+        elif ft == 3:
+            for x in range(stride):
+                a = line[x - bpp] if x >= bpp else 0
+                line[x] = (line[x] + ((a + prev[x]) >> 1)) & 255
+        elif ft == 4:
+            for x in range(stride):
+                a = line[x - bpp] if x >= bpp else 0
+                c = prev[x - bpp] if x >= bpp else 0
+                line[x] = (line[x] + _paeth(a, prev[x], c)) & 255
+        elif ft != 0:
+            return None
+        prev = line
+
+        if depth == 16:
+            line = line[0::2]  # keep the high byte of each sample
+        if ctype == 3 and depth < 8:
+            per = 8 // depth
+            mask = (1 << depth) - 1
+            line = bytearray((line[i // per] >> (8 - depth * (i % per + 1))) & mask for i in range(w))
+        out = y * w * 4
+        if ctype == 6:
+            rgba[out:out + w * 4] = line[:w * 4]
+            continue
+        for x in range(w):
+            o = out + x * 4
+            if ctype == 2:
+                r, g, b = line[x * 3:x * 3 + 3]
+                rgba[o:o + 4] = (r, g, b, 255)
+            elif ctype == 0:
+                v = line[x]
+                rgba[o:o + 4] = (v, v, v, 255)
+            elif ctype == 4:
+                v, a = line[x * 2], line[x * 2 + 1]
+                rgba[o:o + 4] = (v, v, v, a)
+            else:
+                i = line[x]
+                r, g, b = palette[i * 3:i * 3 + 3] if i * 3 + 3 <= len(palette) else (0, 0, 0)
+                rgba[o:o + 4] = (r, g, b, trns[i] if trns and i < len(trns) else 255)
+    return w, h, rgba
+
+def _png_chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body) & 0xFFFFFFFF)
+
+def png_filter_rgba(w: int, h: int, rgba) -> bytes:
+    """Filtered scanlines for RGBA8; per row, the filter (none/sub/up/paeth) with the smallest absolute sum wins."""
+    stride, bpp = w * 4, 4
+    prev = bytes(stride)
+    out = bytearray()
+    for y in range(h):
+        line = rgba[y * stride:(y + 1) * stride]
+        sub = bytes((line[x] - (line[x - bpp] if x >= bpp else 0)) & 255 for x in range(stride))
+        up = bytes((line[x] - prev[x]) & 255 for x in range(stride))
+        paeth = bytes(
+            (line[x] - _paeth(line[x - bpp] if x >= bpp else 0, prev[x], prev[x - bpp] if x >= bpp else 0)) & 255
+            for x in range(stride))
+        candidates = ((0, bytes(line)), (1, sub), (2, up), (4, paeth))
+        ft, best = min(candidates, key=lambda c: sum(v if v < 128 else 256 - v for v in c[1]))
+        out.append(ft)
+        out += best
+        prev = line
+    return bytes(out)
+
+def png_encode(w: int, h: int, rgba) -> bytes:
+    return b"".join((
+        PNG_SIG,
+        _png_chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0)),
+        _png_chunk(b"IDAT", zlib.compress(png_filter_rgba(w, h, rgba), 9)),
+        _png_chunk(b"IEND", b""),
+    ))
+
+def pack_shelves(sizes: dict, limit: int) -> tuple:
+    """
+    Shelf-pack { key: (w, h) } tallest first into sheets of at most limit x limit.
+    Returns ({ key: (sheet, x, y) }, [(sheet_w, sheet_h), ...]).
+    """
+    placed, sheets = {}, []
+    x = y = shelf_h = sheet_w = 0
+    for key in sorted(sizes, key=lambda k: (-sizes[k][1], -sizes[k][0], k)):
+        w, h = sizes[key]
+        if x + w > limit:  # next shelf
+            x, y, shelf_h = 0, y + shelf_h + ATLAS_PAD, 0
+        if not sheets or y + h > limit:  # next sheet
+            sheets.append((0, 0))
+            x = y = shelf_h = sheet_w = 0
+        placed[key] = (len(sheets) - 1, x, y)
+        x += w + ATLAS_PAD
+        shelf_h = max(shelf_h, h)
+        sheet_w = max(sheet_w, x - ATLAS_PAD)
+        sheets[-1] = (sheet_w, y + shelf_h)
+    return placed, sheets
+
+def write_sprite_atlas(ctx: dict):
+    """out/atlas/<n>.png sheets + out/atlas.json { sheets: [{file, w, h}], sprites: { id: [sheet, x, y, w, h] } }."""
+    if not ctx["sprite_atlas"]:
+        ATLAS_OUT.unlink(missing_ok=True)
+        shutil.rmtree(ATLAS_DIR, ignore_errors=True)
+        return
+    # the list icon is spriteFrom(sprites, id): the first normal image; species sharing a file share a slot
+    first = {sid: imgs["normal"][0] for sid, imgs in ctx["sprites_map"].items() if imgs.get("normal")}
+    images, skipped = {}, 0
+    for path in sorted(set(first.values())):
+        try:
+            decoded = png_decode((ROOT / path).read_bytes())
+        except (OSError, zlib.error, struct.error, ValueError):
+            decoded = None
+        if decoded and decoded[0] <= ATLAS_SHEET and decoded[1] <= ATLAS_SHEET:
+            images[path] = decoded
+        else:
+            skipped += 1  # the list falls back to the PNG itself
+    placed, sheet_sizes = pack_shelves({p: img[:2] for p, img in images.items()}, ATLAS_SHEET)
+
+    pixels = [bytearray(sw * sh * 4) for sw, sh in sheet_sizes]
+    for path, (sheet, x, y) in placed.items():
+        w, h, rgba = images[path]
+        sw = sheet_sizes[sheet][0]
+        for row in range(h):
+            o = ((y + row) * sw + x) * 4
+            pixels[sheet][o:o + w * 4] = rgba[row * w * 4:(row + 1) * w * 4]
+
+    ATLAS_DIR.mkdir(parents=True, exist_ok=True)
+    sheets = []
+    for n, ((sw, sh), px) in enumerate(zip(sheet_sizes, pixels)):
+        _write_if_changed(ATLAS_DIR / f"{n}.png", png_encode(sw, sh, px))
+        sheets.append({"file": f"out/atlas/{n}.png", "w": sw, "h": sh})
+    for stale in ATLAS_DIR.glob("*.png"):
+        if not (stale.stem.isdigit() and int(stale.stem) < len(sheets)):
+            stale.unlink()
+    sprites = {
+        sid: [*placed[path], *images[path][:2]]
+        for sid, path in sorted(first.items()) if path in placed
     }
+    _write_if_changed(ATLAS_OUT, out_bytes({"version": 1, "sheets": sheets, "sprites": sprites}, compact=True))
+    print(f"Wrote {ATLAS_DIR} with {len(placed)} sprites in {len(sheets)} sheets"
+          + (f" ({skipped} left as separate files)" if skipped else ""))
+
+# ------------------------- Sprite optimization (--optimize-sprites) -------------------------
+# Sprites are copied from the packs byte for byte, and most carry several KB of XMP text for a
+# ~1 KB image. This stage rewrites each one losslessly (metadata stripped, image data re-deflated
+# or re-filtered, whichever is smallest), optionally adds downscaled <stem>@<px>.png copies and
+# lossless <stem>.webp files (WebP needs Pillow), and caches every result under the source's hash
+# in .sprite_cache/ so later builds only process new or changed sprites.
+PNG_KEEP_CHUNKS = {b"IHDR", b"PLTE", b"tRNS", b"IDAT", b"IEND", b"sRGB", b"gAMA", b"cHRM", b"iCCP"}
+
+try:
+    from PIL import Image  # optional, only for --sprite-webp
+except ImportError:
+    Image = None
+
+def png_strip(data: bytes) -> bytes:
+    """Lossless: drop metadata chunks, re-deflate the image data, and for RGBA8 also try re-filtering.
+    Animated PNGs (acTL) are returned as-is: their frames live in fcTL/fdAT chunks."""
+    if data[:8] != PNG_SIG:
+        return data
+    pos, chunks, idat = 8, [], []
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b"acTL":
+            return data
+        if kind == b"IDAT":
+            if not idat:
+                chunks.append((kind, None))  # placeholder keeps the chunk order
+            idat.append(body)
+        elif kind in PNG_KEEP_CHUNKS:
+            chunks.append((kind, body))
+        if kind == b"IEND":
+            break
+    if not idat:
+        return data
+    candidates = [zlib.compress(zlib.decompress(b"".join(idat)), 9)]
+    ihdr = dict(chunks).get(b"IHDR") or b""
+    if len(ihdr) == 13 and ihdr[8:10] == b"\x08\x06" and ihdr[12] == 0:  # RGBA8, not interlaced
+        decoded = png_decode(data)
+        if decoded:
+            candidates.append(zlib.compress(png_filter_rgba(*decoded), 9))
+    best = min(candidates, key=len)
+    out = PNG_SIG + b"".join(_png_chunk(k, best if b is None else b) for k, b in chunks)
+    return out if len(out) < len(data) else data
+
+def png_downscale(w: int, h: int, rgba, nw: int, nh: int) -> bytearray:
+    """Area-average resample (alpha-weighted, so transparent pixels don't darken the edges)."""
+    def spans(n_src, n_dst):
+        out = []
+        for i in range(n_dst):
+            a, b = i * n_src / n_dst, (i + 1) * n_src / n_dst
+            out.append([(j, min(b, j + 1) - max(a, j)) for j in range(int(a), min(n_src, -int(-b // 1)))])
+        return out
+    xs, ys = spans(w, nw), spans(h, nh)
+    out = bytearray(nw * nh * 4)
+    for y, yspan in enumerate(ys):
+        for x, xspan in enumerate(xs):
+            r = g = b = a = area = 0.0
+            for sy, wy in yspan:
+                for sx, wx in xspan:
+                    wgt = wy * wx
+                    o = (sy * w + sx) * 4
+                    pa = rgba[o + 3] * wgt
+                    r += rgba[o] * pa
+                    g += rgba[o + 1] * pa
+                    b += rgba[o + 2] * pa
+                    a += pa
+                    area += wgt
+            if a:
+                o = (y * nw + x) * 4
+                out[o:o + 4] = (round(r / a), round(g / a), round(b / a), round(a / area))
+    return out
 
-    DROPS_OUT.parent.mkdir(parents=True, exist_ok=True)
-    DROPS_OUT.write_text(json.dumps(drops_index, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Wrote {DROPS_OUT} with {len(drops_index['items'])} items")
+def _png_size(data: bytes) -> tuple:
+    return struct.unpack(">II", data[16:24]) if data[:8] == PNG_SIG and len(data) >= 24 else (0, 0)
+
+def _sprite_suffixes(opts: dict, data: bytes) -> list:
+    """Files a sprite gets: itself, downscaled copies for sizes it exceeds, and the WebP copy."""
+    w, h = _png_size(data)
+    return [".png", *(f"@{n}.png" for n in opts["sizes"] if max(w, h) > n),
+            *([".webp"] if opts["webp"] and Image is not None else [])]
+
+def _optimize_sprite_job(job) -> dict:
+    """Worker: { suffix: bytes } for one source PNG (".png" is the optimized sprite itself)."""
+    data, opts = job
+    best = png_strip(data)
+    out = {".png": best}
+    decoded = None
+    for sfx in _sprite_suffixes(opts, data):
+        if sfx.startswith("@"):
+            decoded = decoded or png_decode(best)
+            if not decoded:
+                break
+            w, h, rgba = decoded
+            scale = int(sfx[1:-len(".png")]) / max(w, h)
+            nw, nh = max(1, round(w * scale)), max(1, round(h * scale))
+            out[sfx] = png_encode(nw, nh, png_downscale(w, h, rgba, nw, nh))
+        elif sfx == ".webp":
+            buf = io.BytesIO()
+            Image.open(io.BytesIO(best)).save(buf, "WEBP", lossless=True, method=6)
+            out[sfx] = buf.getvalue()
+    return out
+
+def optimize_sprites(ctx: dict):
+    opts = ctx["sprite_opt"]
+    if not opts:
+        return
+    if opts["webp"] and Image is None:
+        print("Pillow isn't installed: skipping the WebP copies")
+    paths = sorted({p for imgs in ctx["sprites_map"].values() for key in ("normal", "shiny") for p in imgs.get(key, [])})
+    SPRITE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    todo, plan = {}, []
+    for path in paths:
+        src = ROOT / path
+        try:
+            data = src.read_bytes()
+        except OSError:
+            continue
+        digest = hashlib.sha1(data).hexdigest()
+        suffixes = _sprite_suffixes(opts, data)
+        plan.append((src, digest, len(data), suffixes))
+        if not all((SPRITE_CACHE_DIR / f"{digest}{sfx}").is_file() for sfx in suffixes):
+            todo[digest] = data
+
+    if todo:
+        with ProcessPoolExecutor() as pool:
+            results = pool.map(_optimize_sprite_job, [(data, opts) for data in todo.values()], chunksize=16)
+            for digest, out in zip(todo, results):
+                # jar sprites aren't re-copied over an existing file, so the next build may hash the
+                # optimized sprite itself: store the results under that hash too
+                for key in {digest, hashlib.sha1(out[".png"]).hexdigest()}:
+                    for sfx, blob in out.items():
+                        (SPRITE_CACHE_DIR / f"{key}{sfx}").write_bytes(blob)
+
+    before = after = extra = 0
+    for src, digest, size, suffixes in plan:
+        for sfx in suffixes:
+            cached = SPRITE_CACHE_DIR / f"{digest}{sfx}"
+            if not cached.is_file():
+                continue  # e.g. a downscale of a PNG png_decode can't read
+            blob = cached.read_bytes()
+            if sfx == ".png":
+                _write_if_changed(src, blob)
+                before, after = before + size, after + len(blob)
+            else:
+                _write_if_changed(src.with_name(src.stem + sfx), blob)
+                extra += len(blob)
+    saved = before - after
+    print(f"Optimized {len(plan)} sprites ({len(todo)} processed, {len(plan) - len(todo)} cached): "
+          f"{before / 2**20:.2f} MB -> {after / 2**20:.2f} MB, saved {saved / 2**20:.2f} MB "
+          f"({100 * saved / max(before, 1):.0f}%)" + (f"; extra copies {extra / 2**20:.2f} MB" if extra else ""))
+
+def write_sprites(ctx: dict):
+    sprites_map = ctx["sprites_map"]
+    SPRITES_OUT.write_bytes(out_bytes({"images": sprites_map}))
+    print(f"Wrote {SPRITES_OUT} with sprites for {len(sprites_map)} species")
+    write_sprite_atlas(ctx)
+
+def write_sprite_icons(ctx: dict):
+    """
+    out/sprite_icons.json: the one sprite the site shows per species (first normal image, base
+    species' for variants without their own), in dex.json row order, with the namespace folders
+    interned: { dir, namespaces, rows, icons: [[ns index, file stem] | null, ...] }.
+    Loaded at startup instead of sprites.json; the full normal/shiny lists are in each mon file.
+    """
+    namespaces, icons = {}, []
+    for sid in ctx["mon_order"]:
+        normal = _images_for(sid, ctx["species_full"][sid], ctx["sprites_map"]).get("normal") or []
+        head, _, name = normal[0].rpartition("/") if normal else ("", "", "")
+        ns = head[len("out/sprites/"):] if head.startswith("out/sprites/") else None
+        if ns is None or not name.endswith(".png"):
+            icons.append(None)
+            continue
+        icons.append([namespaces.setdefault(ns, len(namespaces)), name[:-len(".png")]])
+    _write_if_changed(SPRITE_ICONS_OUT, out_bytes({
+        "version": 1,
+        "dir": "out/sprites/",
+        "namespaces": list(namespaces),
+        "rows": len(icons),
+        "icons": icons,
+    }, compact=True))
+    print(f"Wrote {SPRITE_ICONS_OUT} with icons for {sum(i is not None for i in icons)} species")
+
+def write_presets(ctx: dict):
+    # Enrich presets with resolved blocks under a "resolved" key
+    block_tag_map = ctx["block_tag_map"]
+    enriched_presets = {}
+    for name, base in ctx["preset_map"].items():
+        resolved_section = {
+            "conditions": _resolved_blocks_subset(base.get("conditions", {}), block_tag_map),
+            "anticonditions": _resolved_blocks_subset(base.get("anticonditions", {}), block_tag_map),
+        }
+        enriched_presets[name] = { **base, "resolved": resolved_section }
+    PRESETS_OUT.write_bytes(out_bytes(enriched_presets))
+    print(f"Wrote {PRESETS_OUT} with {len(enriched_presets)} presets (with resolved blocks)")
 
-    # Write the unchanged reference files
-    PRESETS_OUT.write_text(json.dumps(enriched_presets, ensure_ascii=False, indent=2), encoding="utf-8")
-    BIOMES_OUT.write_text(json.dumps({
+def write_biomes(ctx: dict):
+    # Resolved biome tags + all concrete biomes
+    biome_tag_map = ctx["biome_tag_map"]
+    resolved_biome_map = { tag: resolve_biome_selectors(values, biome_tag_map) for tag, values in biome_tag_map.items() }
+    all_biomes = sorted({ b for lst in resolved_biome_map.values() for b in lst if ":" in b and not b.startswith("#") })
+    BIOMES_OUT.write_bytes(out_bytes({
         "tags": biome_tag_map,
         "resolved": resolved_biome_map,
         "all_biomes": all_biomes
-    }, ensure_ascii=False, indent=2), encoding="utf-8")
-    BLOCKS_OUT.write_text(json.dumps({
+    }))
+    print(f"Wrote {BIOMES_OUT} with {len(biome_tag_map)} biome tags and {len(all_biomes)} concrete biomes")
+
+def write_blocks(ctx: dict):
+    # Block tags (NEW) + resolved + inventory
+    block_tag_map = ctx["block_tag_map"]
+    resolved_block_map = { tag: resolve_block_selectors(values, block_tag_map) for tag, values in block_tag_map.items() }
+    all_blocks = sorted({ b for lst in resolved_block_map.values() for b in lst if ":" in b and not b.startswith("#") })
+    BLOCKS_OUT.write_bytes(out_bytes({
         "tags": block_tag_map,
         "resolved": resolved_block_map,
         "all_blocks": all_blocks
-    }, ensure_ascii=False, indent=2), encoding="utf-8")
+    }))
+    print(f"Wrote {BLOCKS_OUT} with {len(block_tag_map)} block tags and {len(all_blocks)} concrete blocks")
 
-    # Build a sources map aligned to FINAL ids in the lean index
-    src_out = {}
-    for entry in dex_index:
-        sid = entry["id"]
-        if sid in species_sources:
-            src_out[sid] = species_sources[sid]
-        else:
-            base = sid.split("_", 1)[0]
-            if base in species_sources:
-                src_out[sid] = species_sources[base]
-            else:
-                src_out[sid] = []
+def build_all(ctx: dict):
+    optimize_sprites(ctx)
+    write_sprites(ctx)
+    emit_mons(ctx)
+    write_dex_index(ctx)
+    write_sprite_icons(ctx)
+    write_search_index(ctx)
+    write_biome_spawns(ctx)
+    write_stats(ctx)
+    write_evolutions(ctx)
+    write_move_index(ctx)
+    write_conditions(ctx)
+    write_drops_index(ctx)
+    write_species_sources(ctx)
+    print(f"Wrote per-mon files to {MONS_DIR}")
+    write_presets(ctx)
+    write_biomes(ctx)
+    write_blocks(ctx)
+    write_provenance(ctx)
+    write_precache(ctx)
+    write_parse_report()
+    write_sqlite(ctx)
+    write_bundle(ctx)  # last: packs the files written above
+
+# ------------------------- Provenance (input file -> outputs) -------------------------
+
+def _block_tags_reached(selectors, tag_map):
+    """Every '#tag' visited while expanding block selectors (child tags included)."""
+    reached = set()
+
+    def walk(sel):
+        if not isinstance(sel, str) or not sel.startswith("#") or sel in reached:
+            return
+        reached.add(sel)
+        for v in tag_map.get(sel) or []:
+            walk(v)
 
-    SPECIES_SOURCES_OUT.write_text(json.dumps(src_out, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Wrote {SPECIES_SOURCES_OUT} with {len(src_out)} species")
+    for s in _as_list(selectors):
+        walk(s)
+    return reached
 
-    print(f"Wrote per-mon files to {MONS_DIR}")
-    print(f"Wrote {PRESETS_OUT} with {len(enriched_presets)} presets (with resolved blocks)")
-    print(f"Wrote {BIOMES_OUT} with {len(biome_tag_map)} biome tags and {len(all_biomes)} concrete biomes")
-    print(f"Wrote {BLOCKS_OUT} with {len(block_tag_map)} block tags and {len(all_blocks)} concrete blocks")
+def build_provenance(ctx: dict):
+    """
+    Map every input entry (species file, spawn pool file, tag file, preset file, sprite file)
+    to the outputs it influenced, plus the reverse.
+    Output ids are paths relative to out/ ("mons/<id>.json", "presets.json", "sprites/<ns>/<file>.png").
+    dex.json, drops/ and species_sources.json are rebuilt from the mon rows, so
+    they follow from any "mons/*" output and are not listed per input.
+    """
+    inputs = defaultdict(set)
+
+    def link(markers, output):
+        for m in markers or []:
+            inputs[m].add(output)
+
+    used_presets = defaultdict(set)     # preset -> mon outputs
+    used_block_tags = defaultdict(set)  # block tag -> mon outputs
+    for sid in ctx["mon_order"]:
+        sdata = ctx["species_full"][sid]
+        out_id = f"mons/{sid}.json"
+        link(_sources_for(sid, ctx["species_sources"]), out_id)
+        for raw in _raw_spawns_for(sid, sdata, ctx["spawns_by_species"]):
+            for s in raw.get("spawns", []):
+                link([s.get("_source")], out_id)
+                for preset in _as_list(s.get("presets")):
+                    used_presets[preset].add(out_id)
+                needed = (s.get("condition") or {}).get("neededNearbyBlocks")
+                for tag in _block_tags_reached(needed, ctx["block_tag_map"]):
+                    used_block_tags[tag].add(out_id)
+        images = _images_for(sid, sdata, ctx["sprites_map"])
+        for path in images.get("normal", []) + images.get("shiny", []):
+            link(ctx["sprite_sources"].get(path), out_id)
+
+    for path, markers in ctx["sprite_sources"].items():
+        rel = path[len("out/"):] if path.startswith("out/") else path
+        link(markers, rel)
+        link(markers, "sprites.json")
+
+    for name, markers in ctx["preset_sources"].items():
+        link(markers, "presets.json")
+        for out_id in used_presets.get(name, ()):
+            link(markers, out_id)
+
+    for tag, markers in ctx["biome_tag_sources"].items():
+        link(markers, "biomes.json")
+
+    preset_block_tags = set()
+    for base in ctx["preset_map"].values():
+        for section in ("conditions", "anticonditions"):
+            needed = (base.get(section) or {}).get("neededNearbyBlocks")
+            preset_block_tags |= _block_tags_reached(needed, ctx["block_tag_map"])
+    for tag, markers in ctx["block_tag_sources"].items():
+        link(markers, "blocks.json")
+        if tag in preset_block_tags:
+            link(markers, "presets.json")
+        for out_id in used_block_tags.get(tag, ()):
+            link(markers, out_id)
+
+    outputs = defaultdict(set)
+    for marker, outs in inputs.items():
+        for o in outs:
+            outputs[o].add(marker)
+
+    return {
+        "inputs": {k: sorted(v) for k, v in sorted(inputs.items())},
+        "outputs": {k: sorted(v) for k, v in sorted(outputs.items())},
+    }
+
+def write_provenance(ctx: dict):
+    prov = build_provenance(ctx)
+    PROVENANCE_OUT.write_bytes(out_bytes(prov))
+    print(f"Wrote {PROVENANCE_OUT} with {len(prov['inputs'])} inputs -> {len(prov['outputs'])} outputs")
+
+# ------------------------- Watch mode -------------------------
+
+WATCH_DIRS = ("mods", "datapacks", "world/datapacks", "resourcepacks")
+INPUT_KINDS = ("species", "spawns", "biome_tags", "block_tags", "presets", "sprites")
+
+def snapshot_inputs():
+    """{ posix path: (mtime_ns, size) } for every file under the watched instance folders."""
+    snap = {}
+    for rel in WATCH_DIRS:
+        base = ROOT / rel
+        if not base.is_dir():
+            continue
+        for dirpath, _dirnames, filenames in os.walk(base):
+            for fn in filenames:
+                p = os.path.join(dirpath, fn)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                snap[Path(p).as_posix()] = (st.st_mtime_ns, st.st_size)
+    return snap
+
+def classify_input_change(path: str) -> set:
+    """
+    Map a changed instance file to the input kinds it can affect (empty set = irrelevant).
+    A mod jar can carry anything, so it maps to every kind.
+    """
+    low = path.replace("\\", "/").lower()
+    parts = low.split("/")
+    if parts[0] == "mods":
+        return set(INPUT_KINDS) if len(parts) == 2 and low.endswith(".jar") else set()
+    if parts[0] == "resourcepacks":
+        if len(parts) == 2 and low.endswith((".zip", ".jar")):
+            return {"sprites"}
+        return {"sprites"} if _is_pokemon_sprite_path(low) else set()
+
+    # datapacks/<pack>/data/... or world/datapacks/<pack>/data/...
+    if not low.endswith(".json") or "/data/" not in low:
+        return set()
+    if "/data/cobblemon/species/" in low:
+        return {"species"}
+    if "/spawn_pool_world/" in low:
+        return {"spawns"}
+    if "/tags/worldgen/biome/" in low:
+        return {"biome_tags"}
+    if "/tags/block/" in low or "/tags/blocks/" in low:
+        return {"block_tags"}
+    if "/spawn_detail_presets/" in low:
+        return {"presets"}
+    return set()
+
+def rebuild_changed(ctx: dict, kinds: set) -> set:
+    """
+    Re-collect only the datasets in `kinds`, diff them against ctx and regenerate the
+    affected mon files, index rows and reference files. Returns the mon ids rewritten.
+    """
+    kinds = set(kinds)
+    affected = set()
+    refs = set()
+
+    if "species" in kinds:
+        old_full, old_sources = ctx["species_full"], ctx["species_sources"]
+        species, species_sources = collect_species()
+        new_full = expand_species_with_forms(species)
+        for sid in set(old_full) | set(new_full):
+            if old_full.get(sid) != new_full.get(sid) or \
+                    _sources_for(sid, old_sources) != _sources_for(sid, species_sources):
+                affected.add(sid)
+        if set(old_full) != set(new_full):
+            kinds.add("sprites")  # sprite matching depends on the species id set
+        ctx["species_full"], ctx["species_sources"] = new_full, species_sources
+
+    if "spawns" in kinds:
+        old_spawns = ctx["spawns_by_species"]
+        new_spawns = collect_spawns()
+        for sid, sdata in ctx["species_full"].items():
+            if _raw_spawns_for(sid, sdata, old_spawns) != _raw_spawns_for(sid, sdata, new_spawns):
+                affected.add(sid)
+        ctx["spawns_by_species"] = new_spawns
+
+    if "block_tags" in kinds:
+        ctx["block_tag_map"], ctx["block_tag_sources"] = collect_block_tags()
+        # only spawns with neededNearbyBlocks carry resolved block lists
+        for sid, sdata in ctx["species_full"].items():
+            for raw in _raw_spawns_for(sid, sdata, ctx["spawns_by_species"]):
+                if any((s.get("condition") or {}).get("neededNearbyBlocks") for s in raw.get("spawns", [])):
+                    affected.add(sid)
+                    break
+        refs |= {"presets", "blocks"}
+
+    if "biome_tags" in kinds:
+        ctx["biome_tag_map"], ctx["biome_tag_sources"] = collect_biome_tags()
+        refs.add("biomes")
+
+    if "presets" in kinds:
+        ctx["preset_map"], ctx["preset_sources"] = collect_presets()
+        refs.add("presets")
+
+    if "sprites" in kinds:
+        old_map = ctx["sprites_map"]
+        ctx["sprites_map"], ctx["sprite_sources"] = collect_sprites(ctx["species_full"])
+        for sid, sdata in ctx["species_full"].items():
+            if _images_for(sid, sdata, old_map) != _images_for(sid, sdata, ctx["sprites_map"]):
+                affected.add(sid)
+        optimize_sprites(ctx)
+        write_sprites(ctx)
+
+    written = emit_mons(ctx, affected) if affected else set()
+    if written or "sprites" in kinds:
+        write_sprite_icons(ctx)
+    if written:
+        write_dex_index(ctx)
+        write_drops_index(ctx)
+        write_species_sources(ctx)
+        write_stats(ctx)
+        write_evolutions(ctx)
+        write_move_index(ctx)
+        write_conditions(ctx)
+    if written or "biomes" in refs:
+        write_search_index(ctx)  # rows follow dex.json; biome postings follow the tag map
+        write_biome_spawns(ctx)
+    if "presets" in refs:
+        write_presets(ctx)
+    if "biomes" in refs:
+        write_biomes(ctx)
+    if "blocks" in refs:
+        write_blocks(ctx)
+    if written or "biomes" in refs:
+        write_sqlite(ctx)
+    if written or refs or "sprites" in kinds:
+        write_provenance(ctx)
+        write_precache(ctx)
+        write_bundle(ctx)
+    write_parse_report()
+    return written
+
+def watch(ctx: dict, interval: float = 1.0):
+    """
+    Poll the instance folders (stat only) and rebuild what each change affects.
+    Mod jars keep their parsed JSON cached between rounds, so unchanged jars are not re-read.
+    """
+    global _ARCHIVE_CACHE
+    if _ARCHIVE_CACHE is None:
+        _ARCHIVE_CACHE = {}
+    prev = snapshot_inputs()
+    print(f"[watch] watching {', '.join(WATCH_DIRS)} ({len(prev)} files); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(interval)
+            curr = snapshot_inputs()
+            changed = sorted(p for p in set(prev) | set(curr) if prev.get(p) != curr.get(p))
+            prev = curr
+            kinds = set()
+            for p in changed:
+                k = classify_input_change(p)
+                if k:
+                    print(f"[watch] {p} -> {', '.join(sorted(k))}")
+                kinds |= k
+            if not kinds:
+                continue
+            t0 = time.perf_counter()
+            written = rebuild_changed(ctx, kinds)
+            dt = time.perf_counter() - t0
+            shown = ", ".join(sorted(written)[:10]) + (" ..." if len(written) > 10 else "")
+            print(f"[watch] rebuilt {len(written)} mon(s) in {dt:.2f}s{': ' + shown if written else ''}")
+    except KeyboardInterrupt:
+        print("[watch] stopped")
+
+def _int_list(value: str) -> list:
+    try:
+        out = sorted({int(v) for v in value.split(",") if v.strip()})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated pixel sizes, got {value!r}")
+    if any(v < 1 for v in out):
+        raise argparse.ArgumentTypeError("sizes must be positive")
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="Extract Cobblemon data from a Minecraft instance into ./out.")
+    ap.add_argument("--watch", action="store_true",
+                    help="After the build, poll mods/, datapacks/, world/datapacks/ and resourcepacks/ "
+                         "and regenerate only the outputs affected by each change.")
+    ap.add_argument("--interval", type=float, default=1.0,
+                    help="Watch mode: seconds between polls.")
+    ap.add_argument("--json-backend", choices=JSON_BACKENDS, default="auto",
+                    help="JSON parser/serializer: orjson if installed (auto), or force one. Output bytes are stable per backend.")
+    ap.add_argument("--bundle", action="store_true",
+                    help="Also pack every output into out/dex.bundle (one memory-mappable file; "
+                         "read it with scripts/dex_bundle.py or site/utils/bundle.js).")
+    ap.add_argument("--sprite-atlas", action="store_true",
+                    help="Also pack each species' list icon into a few sheets under out/atlas/ "
+                         "(out/atlas.json maps ids to sheet offsets) so the dex list loads a handful of images.")
+    ap.add_argument("--optimize-sprites", action="store_true",
+                    help="Losslessly shrink the extracted sprites (strip metadata, recompress); results are "
+                         "cached by source hash in .sprite_cache/ so only new or changed sprites are processed.")
+    ap.add_argument("--sprite-sizes", type=_int_list, default=[],
+                    help="Optimize sprites and also write downscaled <stem>@<px>.png copies, e.g. 32,48.")
+    ap.add_argument("--sprite-webp", action="store_true",
+                    help="Optimize sprites and also write lossless <stem>.webp copies (needs Pillow).")
+    ap.add_argument("--sqlite", action="store_true",
+                    help="Also write out/dex.sqlite: species, forms, spawns (+ expanded biomes), drops, "
+                         "moves, tags and sources as indexed tables for ad-hoc queries.")
+    ap.add_argument("--intern-conditions", action="store_true",
+                    help="Write each distinct spawn condition block once to out/conditions.json and have "
+                         "mon spawns reference it by id (smaller out/mons; the site resolves the ids).")
+    args = ap.parse_args()
+    set_json_backend(args.json_backend)
+
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    MONS_DIR.mkdir(parents=True, exist_ok=True)
+
+    global _ARCHIVE_CACHE
+    if args.watch:
+        _ARCHIVE_CACHE = {}  # keep parsed jar JSON around for incremental rebuilds
+
+    ctx = collect_all()
+    ctx["intern_conditions"] = args.intern_conditions
+    ctx["bundle"] = args.bundle
+    ctx["sqlite"] = args.sqlite
+    ctx["sprite_atlas"] = args.sprite_atlas
+    if args.optimize_sprites or args.sprite_sizes or args.sprite_webp:
+        ctx["sprite_opt"] = {"sizes": args.sprite_sizes, "webp": args.sprite_webp}
+    build_all(ctx)
+
+    if args.watch:
+        watch(ctx, interval=args.interval)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Read out/dex.bundle, the single-file pack written by `dex_build.py --bundle`.
+
+Usage (from project root):
+    python scripts/dex_bundle.py --in site/out/dex.bundle                  # summary
+    python scripts/dex_bundle.py --in site/out/dex.bundle pikachu  # one record + mon JSON
+    python scripts/dex_bundle.py --in site/out/dex.bundle --section dex.json
+
+The file is memory-mapped: opening it reads only the header and the string table, a species
+lookup is a binary search over the fixed-width records, and mon JSON / sections are decoded
+only when asked for. Layout: see "Binary bundle" in dex_build.py.
+
+    with DexBundle("site/out/dex.bundle") as b:
+        fast = [r.id for r in b.records() if r.speed != BUNDLE_NONE and r.speed >= 120]
+        mon = b.mon("pikachu")
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import mmap
+import struct
+import sys
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from dex_build import (  # noqa: E402
+    BUNDLE_HEADER, BUNDLE_MAGIC, BUNDLE_NONE, BUNDLE_RECORD, BUNDLE_VERSION, json_loads,
+)
+
+Record = namedtuple("Record", (
+    "id name dexnum row primaryType secondaryType "
+    "hp attack defence special_attack special_defence speed "
+    "ev_hp ev_attack ev_defence ev_special_attack ev_special_defence ev_speed "
+    "catchRate spawnCount implemented"
+))
+
+
+class DexBundle:
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as fp:
+            self._mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self._count, rec_size, self._records_off, n_strings, strings_off,
+         n_sections, sections_off, self._blobs_off, total, _) = BUNDLE_HEADER.unpack_from(self._mm, 0)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION or rec_size != BUNDLE_RECORD.size:
+            raise ValueError(f"{self.path}: not a v{BUNDLE_VERSION} dex bundle")
+        if total != len(self._mm):
+            raise ValueError(f"{self.path}: truncated ({len(self._mm)} of {total} bytes)")
+        self._str_offsets = struct.unpack_from(f"<{n_strings + 1}I", self._mm, strings_off)
+        self._str_data = strings_off + 4 * (n_strings + 1)
+        self._strings: Dict[int, str] = {}
+        self._sections = {
+            self._string(name): (off, length)
+            for name, off, length in struct.iter_unpack("<III", self._mm[sections_off:sections_off + 12 * n_sections])
+        }
+        self._ids: List[str] | None = None
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _string(self, i: int) -> str:
+        s = self._strings.get(i)
+        if s is None:
+            a, b = self._str_offsets[i], self._str_offsets[i + 1]
+            s = self._strings[i] = self._mm[self._str_data + a:self._str_data + b].decode("utf-8")
+        return s
+
+    def _raw(self, i: int):
+        return BUNDLE_RECORD.unpack_from(self._mm, self._records_off + i * BUNDLE_RECORD.size)
+
+    def _index(self, sid: str) -> int:
+        """Binary search over the id-sorted records; -1 when absent."""
+        key = sid.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = self._raw(mid)[0]
+            a, b = self._str_offsets[name], self._str_offsets[name + 1]
+            cur = self._mm[self._str_data + a:self._str_data + b]
+            if cur == key:
+                return mid
+            if cur < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return -1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, sid: str) -> bool:
+        return self._index(sid) >= 0
+
+    @property
+    def ids(self) -> List[str]:
+        if self._ids is None:
+            self._ids = [self._string(self._raw(i)[0]) for i in range(self._count)]
+        return self._ids
+
+    def _record(self, i: int) -> Record:
+        raw = self._raw(i)
+        return Record(
+            self._string(raw[0]), self._string(raw[1]), raw[2], raw[3],
+            self._string(raw[4]), self._string(raw[5]), *raw[6:20], bool(raw[20] & 1),
+        )
+
+    def record(self, sid: str) -> Record:
+        i = self._index(sid)
+        if i < 0:
+            raise KeyError(sid)
+        return self._record(i)
+
+    def records(self) -> Iterator[Record]:
+        """Every record in id order; numeric fields are BUNDLE_NONE when the source had no number."""
+        return (self._record(i) for i in range(self._count))
+
+    def mon_bytes(self, sid: str) -> bytes:
+        i = self._index(sid)
+        if i < 0:
+            raise KeyError(sid)
+        off, length = self._raw(i)[-2:]
+        start = self._blobs_off + off
+        return self._mm[start:start + length]
+
+    def mon(self, sid: str) -> Dict:
+        """The mon exactly as in out/mons/<id>.json."""
+        return json_loads(self.mon_bytes(sid))
+
+    def sections(self) -> List[str]:
+        return list(self._sections)
+
+    def section_bytes(self, name: str) -> bytes:
+        off, length = self._sections[name]
+        start = self._blobs_off + off
+        return self._mm[start:start + length]
+
+    def section(self, name: str):
+        """An out/-relative file, e.g. "dex.json" or "moves/table.json" (parsed when it's JSON)."""
+        data = self.section_bytes(name)
+        return json_loads(data) if name.endswith(".json") else data
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect a dex_build --bundle file.")
+    ap.add_argument("--in", dest="path", default="site/out/dex.bundle", help="Bundle path (default: site/out/dex.bundle)")
+    ap.add_argument("--section", help="Print one packed file (out/-relative path) instead")
+    ap.add_argument("ids", nargs="*", help="Species ids to print (record + mon JSON)")
+    args = ap.parse_args()
+
+    with DexBundle(args.path) as b:
+        if args.section:
+            sys.stdout.buffer.write(b.section_bytes(args.section))
+            return
+        if not args.ids:
+            sizes = [length for _, length in b._sections.values()]
+            print(f"{args.path}: {len(b)} mons, {len(sizes)} sections ({sum(sizes) / 2**20:.1f} MB)")
+            return
+        for sid in args.ids:
+            if sid not in b:
+                print(f"{sid}: not in bundle", file=sys.stderr)
+                continue
+            print(json.dumps({"record": b.record(sid)._asdict(), "mon": b.mon(sid)}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
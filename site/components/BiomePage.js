@@ -1,11 +1,28 @@
-import { computed } from "https://unpkg.com/vue@3/dist/vue.esm-browser.prod.js";
+import { computed, ref, watch } from "https://unpkg.com/vue@3/dist/vue.esm-browser.prod.js";
 import { flatSpawns } from "../utils/helpers.js";
 
+// out/biome_spawns/<namespace>/<path>.json, written by dex_build.py with tags already expanded
+const biomeSpawnCache = new Map();
+const loadBiomeSpawns = (biome) => {
+  if (!biomeSpawnCache.has(biome)) {
+    const [ns, path = ""] = biome.split(":");
+    biomeSpawnCache.set(
+      biome,
+      fetch(`./out/biome_spawns/${ns}/${path}.json`)
+        .then((r) => (r.ok ? r.json() : { biome, spawns: [] }))
+        .catch(() => ({ biome, spawns: [] }))
+    );
+  }
+  return biomeSpawnCache.get(biome);
+};
+
 export default {
   props: ["dex", "biomes", "route"],
   setup(props) {
     const tag = computed(() => props.route.param || "");
     const allTags = computed(() => Object.keys(props.biomes.tags || {}).sort());
+    const allBiomes = computed(() => props.biomes.all_biomes || []);
+    const isTag = computed(() => tag.value.startsWith("#"));
     const resolved = computed(
       () => (props.biomes.resolved || {})[tag.value] || []
     );
@@ -19,9 +36,72 @@ export default {
         )
       )
     );
+
+    // concrete biome: who spawns here, and the odds within each rarity bucket
+    const spawnsHere = ref([]);
+    const odds = ref({});
+    const spawnsLoading = ref(false);
+    const context = ref("grounded");
+    const time = ref("anytime");
+    const contexts = computed(() => {
+      const set = new Set();
+      for (const byCtx of Object.values(odds.value)) Object.keys(byCtx).forEach((c) => set.add(c));
+      return [...set].sort();
+    });
+    const times = computed(() => {
+      const set = new Set();
+      for (const byCtx of Object.values(odds.value))
+        for (const byTime of Object.values(byCtx)) Object.keys(byTime).forEach((t) => set.add(t));
+      set.delete("anytime");
+      return ["anytime", ...[...set].sort()];
+    });
+    // a bucket/context without timed spawns has only the "anytime" table
+    const chance = (s) => {
+      const tables = odds.value[s.rarity]?.[context.value];
+      const pct = (tables?.[time.value] || tables?.anytime)?.[s.id];
+      return pct == null ? null : pct;
+    };
+    watch(
+      tag,
+      async (t) => {
+        spawnsHere.value = [];
+        odds.value = {};
+        if (!t || t.startsWith("#")) return;
+        spawnsLoading.value = true;
+        const data = await loadBiomeSpawns(t);
+        if (tag.value === t) {
+          spawnsHere.value = data.spawns || [];
+          odds.value = data.odds || {};
+          if (!contexts.value.includes(context.value))
+            context.value = contexts.value[0] || "grounded";
+          if (!times.value.includes(time.value)) time.value = "anytime";
+          spawnsLoading.value = false;
+        }
+      },
+      { immediate: true }
+    );
+    const monName = (id) => props.dex.find((d) => d.id === id)?.name || id;
+
     const back = () =>
       history.length > 1 ? history.back() : (location.hash = "#/biome");
-    return { tag, allTags, resolved, rawVals, usedBy, back };
+    return {
+      tag,
+      allTags,
+      allBiomes,
+      isTag,
+      resolved,
+      rawVals,
+      usedBy,
+      spawnsHere,
+      spawnsLoading,
+      context,
+      time,
+      contexts,
+      times,
+      chance,
+      monName,
+      back,
+    };
   },
   template: `
     <section>
@@ -30,14 +110,58 @@ export default {
         <div class="flex flex-wrap gap-2">
           <a v-for="b in allTags" :key="b" :href="'#/biome/'+encodeURIComponent(b)" class="px-2 py-1 rounded-lg bg-emerald-100 text-emerald-700 hover:underline">{{ b }}</a>
         </div>
+        <h2 class="text-xl font-semibold mt-6 mb-3">Biomes</h2>
+        <div class="flex flex-wrap gap-2">
+          <a v-for="b in allBiomes" :key="b" :href="'#/biome/'+encodeURIComponent(b)" class="px-2 py-1 rounded-lg bg-slate-100 text-slate-700 hover:underline">{{ b }}</a>
+        </div>
       </div>
-      <div v-else>
+      <div v-else-if="isTag">
         <button class="text-sm text-indigo-700 hover:underline" @click="back">← Back</button>
         <h2 class="text-xl font-semibold mt-2">Biome tag: {{ tag }}</h2>
         <div class="mt-3 grid grid-cols-1 md:grid-cols-2 gap-3 text-sm">
           <div class="rounded-lg border p-2"><h3 class="font-semibold mb-1">Raw values</h3><pre class="text-xs whitespace-pre-wrap">{{ JSON.stringify(rawVals, null, 2) }}</pre></div>
-          <div class="rounded-lg border p-2"><h3 class="font-semibold mb-1">Resolved biomes</h3><pre class="text-xs whitespace-pre-wrap">{{ JSON.stringify(resolved, null, 2) }}</pre></div>
+          <div class="rounded-lg border p-2">
+            <h3 class="font-semibold mb-1">Resolved biomes</h3>
+            <ul class="text-xs">
+              <li v-for="b in resolved" :key="b"><a :href="'#/biome/'+encodeURIComponent(b)" class="text-indigo-700 hover:underline">{{ b }}</a></li>
+            </ul>
+          </div>
+        </div>
+      </div>
+      <div v-else>
+        <button class="text-sm text-indigo-700 hover:underline" @click="back">← Back</button>
+        <h2 class="text-xl font-semibold mt-2">Biome: {{ tag }}</h2>
+        <div v-if="spawnsLoading" class="mt-3 text-sm text-slate-600">Loading spawns…</div>
+        <div v-else-if="!spawnsHere.length" class="mt-3 text-sm text-slate-600">Nothing spawns here.</div>
+        <div v-if="spawnsHere.length" class="mt-3 flex flex-wrap items-center gap-3 text-sm">
+          <label>Context
+            <select v-model="context" class="ml-1 rounded-xl border-slate-300">
+              <option v-for="c in contexts" :key="c" :value="c">{{ c }}</option>
+            </select>
+          </label>
+          <label>Time
+            <select v-model="time" class="ml-1 rounded-xl border-slate-300">
+              <option v-for="t in times" :key="t" :value="t">{{ t }}</option>
+            </select>
+          </label>
+          <span class="text-slate-500">Chance = share of the rarity bucket's spawn weight here.</span>
         </div>
+        <table v-if="spawnsHere.length" class="mt-3 w-full text-sm bg-white rounded-2xl ring-1 ring-slate-200">
+          <thead class="text-left text-slate-600">
+            <tr><th class="p-2">Pokémon</th><th class="p-2">Rarity</th><th class="p-2">Chance</th><th class="p-2">Weight</th><th class="p-2">Levels</th><th class="p-2">Times</th><th class="p-2">Contexts</th></tr>
+          </thead>
+          <tbody class="divide-y divide-slate-200">
+            <tr v-for="(s, i) in spawnsHere" :key="s.id + ':' + i" :class="chance(s) == null ? 'text-slate-400' : ''">
+              <td class="p-2"><a :href="'#/mon/'+encodeURIComponent(s.id)" class="text-indigo-700 hover:underline">{{ monName(s.id) }}</a></td>
+              <td class="p-2">{{ s.rarity || '—' }}</td>
+              <td class="p-2">{{ chance(s) == null ? '—' : chance(s) + '%' }}</td>
+              <td class="p-2">{{ s.weight ?? '—' }}</td>
+              <td class="p-2">{{ s.levels || '—' }}</td>
+              <td class="p-2">{{ (s.times || []).join(', ') || 'any' }}</td>
+              <td class="p-2">{{ (s.contexts || []).join(', ') || '—' }}</td>
+            </tr>
+          </tbody>
+        </table>
       </div>
     </section>
   `,
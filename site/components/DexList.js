@@ -6,6 +6,15 @@ import {
   watch,
 } from "https://unpkg.com/vue@3/dist/vue.esm-browser.prod.js";
 import { spriteFrom } from "../utils/helpers.js";
+import { loadAtlas, atlasStyle } from "../utils/atlas.js";
+import { createSearchIndex, parseQuery } from "../utils/search.js";
+
+const searchIndex = createSearchIndex("./out/search");
+
+// The list is windowed: every row is ROW_PX tall, the container is sized for all filtered
+// rows and only the ones in (or OVERSCAN rows around) the viewport are rendered.
+const ROW_PX = 72;
+const OVERSCAN = 6;
 
 export default {
   props: ["dex", "sprites"],
@@ -75,30 +84,78 @@ export default {
       if (keyHandler) window.removeEventListener("keydown", keyHandler);
     });
 
-    const filtered = computed(() =>
-      props.dex
-        .filter((sp) =>
-          (sp.name || sp.id).toLowerCase().includes(q.value.toLowerCase())
-        )
-        .filter(
-          (sp) =>
-            !type.value ||
-            sp.primaryType === type.value ||
-            sp.secondaryType === type.value
-        )
-        .filter((sp) => !noSpawnsOnly.value || (sp.spawnCount ?? 0) === 0)
-        .sort((a, b) => (a.dexnum ?? 9999) - (b.dexnum ?? 9999))
+    // "field:value" terms (move:, ability:, egg:, label:, biome:, name:) go through the
+    // prebuilt index; the remaining text keeps the plain name substring match.
+    const query = computed(() => parseQuery(q.value));
+    const indexRows = ref(null); // Set of dex rows, or null = no field terms
+    let lookupSeq = 0;
+    watch(
+      [query, () => props.dex.length],
+      async ([{ terms }, rowCount]) => {
+        const seq = ++lookupSeq;
+        const rows = await searchIndex.lookup(terms, rowCount);
+        if (seq === lookupSeq) indexRows.value = rows;
+      },
+      { immediate: true }
     );
 
+    // dex.json rows come sorted by dex number, so filtering keeps them in display order
+    const names = computed(() => props.dex.map((sp) => (sp.name || sp.id).toLowerCase()));
+    const filtered = computed(() => {
+      const text = query.value.text.toLowerCase();
+      const rows = indexRows.value;
+      return props.dex.filter(
+        (sp, row) =>
+          names.value[row].includes(text) &&
+          (!rows || rows.has(row)) &&
+          (!type.value || sp.primaryType === type.value || sp.secondaryType === type.value) &&
+          (!noSpawnsOnly.value || (sp.spawnCount ?? 0) === 0)
+      );
+    });
+
+    // --- Windowing: track which slice of `filtered` is on screen
+    const listEl = ref(null);
+    const first = ref(0);
+    const count = ref(0);
+    let frame = 0;
+    const measure = () => {
+      frame = 0;
+      if (!listEl.value) return;
+      const top = listEl.value.getBoundingClientRect().top;
+      first.value = Math.max(0, Math.floor(-top / ROW_PX) - OVERSCAN);
+      count.value = Math.ceil(window.innerHeight / ROW_PX) + 2 * OVERSCAN;
+    };
+    const schedule = () => (frame ||= requestAnimationFrame(measure));
+    onMounted(() => {
+      window.addEventListener("scroll", schedule, { passive: true });
+      window.addEventListener("resize", schedule);
+      measure();
+    });
+    onBeforeUnmount(() => {
+      window.removeEventListener("scroll", schedule);
+      window.removeEventListener("resize", schedule);
+      cancelAnimationFrame(frame);
+    });
+    // a new result set starts from its first row
+    watch(filtered, () => {
+      if (listEl.value?.getBoundingClientRect().top < 0) listEl.value.scrollIntoView();
+      schedule();
+    });
+    const shown = computed(() => filtered.value.slice(first.value, first.value + count.value));
+
     const goto = (sp) => (location.hash = `#/mon/${encodeURIComponent(sp.id)}`);
     const sprite = (id) => spriteFrom(props.sprites, id);
+    // list icons come from the atlas sheets when dex_build ran with --sprite-atlas
+    const atlas = ref(null);
+    loadAtlas().then((a) => (atlas.value = a));
+    const icon = (id) => atlasStyle(atlas.value, id, 32);
 
-    return { q, type, types, noSpawnsOnly, filtered, goto, sprite };
+    return { q, type, types, noSpawnsOnly, filtered, shown, first, listEl, ROW_PX, goto, sprite, icon };
   },
   template: `
     <section class="space-y-4">
       <div class="grid grid-cols-1 md:grid-cols-3 gap-3">
-        <input v-model="q" type="search" placeholder="Search name…" class="rounded-xl border-slate-300 focus:border-indigo-500 focus:ring-indigo-500" />
+        <input v-model="q" type="search" placeholder="Search name… or move:surf ability:levitate egg:dragon biome:jungle" class="rounded-xl border-slate-300 focus:border-indigo-500 focus:ring-indigo-500" />
         <select v-model="type" class="rounded-xl border-slate-300">
           <option value="">Any type</option>
           <option v-for="t in types" :key="t" :value="t">{{ t }}</option>
@@ -118,28 +175,39 @@ export default {
         </div>
       </div>
 
-      <ul class="divide-y divide-slate-200 bg-white rounded-2xl ring-1 ring-slate-200">
-        <li
-          v-for="sp in filtered"
-          :key="sp.id"
-          class="p-3 flex items-center gap-3 hover:bg-slate-50 cursor-pointer"
-          @click="goto(sp)"
+      <div
+        ref="listEl"
+        class="relative overflow-hidden bg-white rounded-2xl ring-1 ring-slate-200"
+        :style="{ height: filtered.length * ROW_PX + 'px' }"
+      >
+        <ul
+          class="absolute inset-x-0 top-0 divide-y divide-slate-200"
+          :style="{ transform: 'translateY(' + first * ROW_PX + 'px)' }"
         >
-          <img v-if="sprite(sp.id)" :src="sprite(sp.id)" loading="lazy" class="h-8 w-8 shrink-0 rounded bg-slate-100 ring-1 ring-slate-200" alt="" />
-          <div class="w-16 text-slate-500 font-mono">#{{ sp.dexnum ?? '—' }}</div>
-          <div class="flex-1">
-            <div class="font-semibold">{{ sp.name }}</div>
-            <div class="text-sm text-slate-600 flex gap-2">
-              <span v-if="sp.primaryType" class="px-2 py-0.5 rounded-full bg-slate-200">{{ sp.primaryType }}</span>
-              <span v-if="sp.secondaryType" class="px-2 py-0.5 rounded-full bg-slate-200">{{ sp.secondaryType }}</span>
-              <span class="px-2 py-0.5 rounded-full" :class="(sp.spawnCount ?? 0) === 0 ? 'bg-rose-100 text-rose-700' : 'bg-emerald-100 text-emerald-700'">
-                spawns {{ sp.spawnCount ?? 0 }}
-              </span>
+          <li
+            v-for="sp in shown"
+            :key="sp.id"
+            class="px-3 flex items-center gap-3 hover:bg-slate-50 cursor-pointer"
+            :style="{ height: ROW_PX + 'px' }"
+            @click="goto(sp)"
+          >
+            <span v-if="icon(sp.id)" :style="icon(sp.id)" class="h-8 w-8 shrink-0 rounded bg-slate-100 ring-1 ring-slate-200 bg-no-repeat"></span>
+            <img v-else-if="sprite(sp.id)" :src="sprite(sp.id)" loading="lazy" class="h-8 w-8 shrink-0 rounded bg-slate-100 ring-1 ring-slate-200" alt="" />
+            <div class="w-16 text-slate-500 font-mono">#{{ sp.dexnum ?? '—' }}</div>
+            <div class="flex-1 min-w-0">
+              <div class="font-semibold truncate">{{ sp.name }}</div>
+              <div class="text-sm text-slate-600 flex gap-2 overflow-hidden whitespace-nowrap">
+                <span v-if="sp.primaryType" class="px-2 py-0.5 rounded-full bg-slate-200">{{ sp.primaryType }}</span>
+                <span v-if="sp.secondaryType" class="px-2 py-0.5 rounded-full bg-slate-200">{{ sp.secondaryType }}</span>
+                <span class="px-2 py-0.5 rounded-full" :class="(sp.spawnCount ?? 0) === 0 ? 'bg-rose-100 text-rose-700' : 'bg-emerald-100 text-emerald-700'">
+                  spawns {{ sp.spawnCount ?? 0 }}
+                </span>
+              </div>
             </div>
-          </div>
-          <span class="text-indigo-700 text-sm">View →</span>
-        </li>
-      </ul>
+            <span class="text-indigo-700 text-sm">View →</span>
+          </li>
+        </ul>
+      </div>
     </section>
   `,
 };
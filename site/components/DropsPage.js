@@ -2,13 +2,55 @@ import {
   ref,
   computed,
   onMounted,
+  watch,
 } from "https://unpkg.com/vue@3/dist/vue.esm-browser.prod.js";
 import { spriteFrom } from "../utils/helpers.js"; // <- adjust path if your utils live elsewhere
 
+// out/drops/index.json: [[item, monCount], ...] sorted by item; mons (already in display order)
+// live in out/drops/<n>.json, `chunk` items per file, fetched only for the page on screen.
+// Older out/ folders only have the single drops_index.json, which is loaded whole instead.
+const fetchJson = async (url) => {
+  const r = await fetch(url);
+  if (!r.ok) throw new Error("Failed to load " + url);
+  return r.json();
+};
+const sortMons = (mons) =>
+  (mons || []).slice().sort((a, b) => {
+    const ap = a.percentage ?? -1;
+    const bp = b.percentage ?? -1;
+    if (ap !== bp) return bp - ap;
+    return (a.name || a.id).localeCompare(b.name || b.id);
+  });
+let dropsIndex = null; // Promise<{ items: [{ item, pos, count, mons? }], chunk }>
+const loadDropsIndex = () =>
+  (dropsIndex ??= fetchJson("./out/drops/index.json")
+    .then((ix) => ({
+      chunk: ix.chunk,
+      items: ix.items.map(([item, count], pos) => ({ item, pos, count })),
+    }))
+    .catch(() =>
+      fetchJson("./out/drops_index.json")
+        .then((d) => ({
+          chunk: 0,
+          items: (d.items || []).map((it, pos) => ({
+            item: it.item,
+            pos,
+            count: (it.mons || []).length,
+            mons: sortMons(it.mons),
+          })),
+        }))
+        .catch(() => ({ chunk: 0, items: [] }))
+    ));
+const chunks = new Map(); // n -> Promise<{ item: mons }>
+const loadChunk = (n) => {
+  if (!chunks.has(n))
+    chunks.set(n, fetchJson(`./out/drops/${n}.json`).catch(() => ({})));
+  return chunks.get(n);
+};
+
 export default {
   name: "DropsPage",
   props: {
-    dropItems: { type: Array, default: () => [] }, // [{ item, mons:[{id,name,percentage,quantityRange,biomes,excludeBiomes}] }]
     sprites: { type: Object, default: () => ({ images: {} }) }, // NEW
     route: { type: Object, default: () => ({}) },
   },
@@ -16,6 +58,10 @@ export default {
     const q = ref("");
     const page = ref(1);
     const pageSize = ref(25);
+    const allItems = ref([]);
+    const chunkSize = ref(0);
+    const loadingIndex = ref(true);
+    const monsByItem = ref({}); // item -> mons, filled chunk by chunk
 
     const normalizeItemName = (id) => {
       if (!id) return "";
@@ -28,8 +74,8 @@ export default {
 
     const filtered = computed(() => {
       const n = needle.value;
-      if (!n) return props.dropItems;
-      return props.dropItems.filter((it) => {
+      if (!n) return allItems.value;
+      return allItems.value.filter((it) => {
         const simple = normalizeItemName(it.item).toLowerCase();
         return (
           it.item.toLowerCase().includes(n) || simple.includes(n)
@@ -43,33 +89,43 @@ export default {
       });
     });
 
-    const normalized = computed(() =>
-      filtered.value.map((it) => {
-        const rows = (it.mons || []).slice().sort((a, b) => {
-          const ap = a.percentage ?? -1;
-          const bp = b.percentage ?? -1;
-          if (ap !== bp) return bp - ap;
-          return (a.name || a.id).localeCompare(b.name || b.id);
-        });
-        return { ...it, mons: rows };
-      })
-    );
-
     const totalPages = computed(() =>
-      Math.max(1, Math.ceil(normalized.value.length / pageSize.value))
+      Math.max(1, Math.ceil(filtered.value.length / pageSize.value))
     );
 
-    const paged = computed(() => {
+    const pageItems = computed(() => {
       const start = (page.value - 1) * pageSize.value;
-      return normalized.value.slice(start, start + pageSize.value);
+      return filtered.value.slice(start, start + pageSize.value);
     });
 
+    // fetch the chunks holding the items on screen
+    watch(
+      pageItems,
+      async (items) => {
+        if (!chunkSize.value) return;
+        const wanted = [...new Set(items.map((it) => Math.floor(it.pos / chunkSize.value)))];
+        const loaded = await Promise.all(wanted.map(loadChunk));
+        monsByItem.value = Object.assign({}, monsByItem.value, ...loaded);
+      },
+      { immediate: true }
+    );
+
+    const paged = computed(() =>
+      pageItems.value.map((it) => ({
+        ...it,
+        mons: it.mons || monsByItem.value[it.item],
+      }))
+    );
+
     const goMon = (id) =>
       id && (location.hash = "#/mon/" + encodeURIComponent(id));
     const sprite = (id) => spriteFrom(props.sprites, id); // NEW
 
-    onMounted(() => {
-      console.log("[DropsPage] items at mount:", props.dropItems.length);
+    onMounted(async () => {
+      const ix = await loadDropsIndex();
+      chunkSize.value = ix.chunk;
+      allItems.value = ix.items;
+      loadingIndex.value = false;
     });
 
     const fmtBiomes = (m) => {
@@ -109,6 +165,7 @@ export default {
       page,
       pageSize,
       totalPages,
+      loadingIndex,
       paged,
       goMon,
       fmtBiomes,
@@ -151,6 +208,7 @@ export default {
       </div>
 
       <!-- Items -->
+      <div v-if="loadingIndex" class="text-sm text-slate-600">Loading drops…</div>
       <ul class="space-y-4">
         <li v-for="it in paged" :key="it.item" class="rounded-2xl ring-1 ring-slate-200 overflow-hidden">
           <div class="px-4 py-3 border-b">
@@ -210,7 +268,10 @@ export default {
                   </td>
                 </tr>
 
-                <tr v-if="(it.mons || []).length === 0">
+                <tr v-if="!it.mons">
+                  <td colspan="5" class="px-4 py-6 text-center text-slate-500">Loading {{ it.count }} mons…</td>
+                </tr>
+                <tr v-else-if="it.mons.length === 0">
                   <td colspan="5" class="px-4 py-6 text-center text-slate-500">No matching mons</td>
                 </tr>
               </tbody>
@@ -12,6 +12,14 @@ import {
   normalizeResultId,
   evolRequirementLabel,
 } from "../utils/helpers.js";
+import { loadMoveTable, monMoves } from "../utils/moves.js";
+
+// out/evolutions.json: every evolution family, resolved by dex_build.py; one fetch serves all mon pages
+let evolutionFamilies = null;
+const loadEvolutionFamilies = () =>
+  (evolutionFamilies ??= fetch("./out/evolutions.json")
+    .then((r) => (r.ok ? r.json() : null))
+    .catch(() => null));
 
 export default {
   // keep props so DexList/route/sprites still flow in
@@ -85,6 +93,37 @@ export default {
         .join(" ");
     const ratioText = (r) => (r == null || r === "" ? "" : String(r));
 
+    // moves: raw strings in older mon files, packed moveRefs into out/moves/table.json now
+    const moveTable = ref(null);
+    loadMoveTable().then((t) => (moveTable.value = t));
+    const moveGroups = computed(() => groupMoves(monMoves(mon.value, moveTable.value)));
+    // "12 tackle" / "earthquake" -> the move page
+    const moveHref = (m) => "#/move/" + encodeURIComponent(String(m).split(" ").pop());
+
+    // Whole family as stages (columns): [[{ id, name, sprite, from: [{ id, name, text }] }]]
+    const families = ref(null);
+    loadEvolutionFamilies().then((data) => (families.value = data));
+    const family = computed(() => {
+      const m = mon.value;
+      const data = families.value;
+      const idx = m && data ? data.family?.[m.id] : undefined;
+      if (idx == null) return null;
+      const { nodes, depth, edges } = data.families[idx];
+      const nameOf = (id) => props.dex.find((x) => x.id === id)?.name || id;
+      const stages = [];
+      nodes.forEach((id, i) => {
+        const from = edges
+          .filter(([, to]) => to === i)
+          .map(([f, , e]) => ({
+            id: nodes[f],
+            name: nameOf(nodes[f]),
+            text: (e.requirements || []).join(", ") || titleize(e.variant),
+          }));
+        (stages[depth[i]] ||= []).push({ id, name: nameOf(id), sprite: sprite(id), from });
+      });
+      return stages;
+    });
+
     onMounted(load);
     watch(
       () => props.route && (props.route.params?.id ?? props.route.param),
@@ -150,9 +189,12 @@ export default {
       goBiome,
       goMon,
       groupMoves,
+      moveGroups,
+      moveHref,
       flatSpawns,
       sprite,
       evolutions,
+      family,
       reqLabel,
       titleize,
       ratioText,
@@ -253,30 +295,51 @@ export default {
           <div>
             <h5 class="font-semibold mb-1">Level-up</h5>
             <ul class="list-disc list-inside">
-              <li v-for="m in groupMoves(mon.moves).level" :key="'lvl-'+m">{{ m }}</li>
+              <li v-for="m in moveGroups.level" :key="'lvl-'+m"><a :href="moveHref(m)" class="hover:underline">{{ m }}</a></li>
             </ul>
           </div>
           <div>
             <h5 class="font-semibold mb-1">Egg</h5>
             <ul class="list-disc list-inside">
-              <li v-for="m in groupMoves(mon.moves).egg" :key="'egg-'+m">{{ m }}</li>
+              <li v-for="m in moveGroups.egg" :key="'egg-'+m"><a :href="moveHref(m)" class="hover:underline">{{ m }}</a></li>
             </ul>
           </div>
           <div>
             <h5 class="font-semibold mb-1">TM</h5>
             <ul class="list-disc list-inside">
-              <li v-for="m in groupMoves(mon.moves).tm" :key="'tm-'+m">{{ m }}</li>
+              <li v-for="m in moveGroups.tm" :key="'tm-'+m"><a :href="moveHref(m)" class="hover:underline">{{ m }}</a></li>
             </ul>
           </div>
           <div>
             <h5 class="font-semibold mb-1">Tutor</h5>
             <ul class="list-disc list-inside">
-              <li v-for="m in groupMoves(mon.moves).tutor" :key="'tutor-'+m">{{ m }}</li>
+              <li v-for="m in moveGroups.tutor" :key="'tutor-'+m"><a :href="moveHref(m)" class="hover:underline">{{ m }}</a></li>
             </ul>
           </div>
         </div>
       </details>
 
+      <!-- Evolution family (out/evolutions.json) -->
+      <section v-if="family" class="space-y-2">
+        <h4 class="font-semibold">Evolution family</h4>
+        <div class="flex flex-wrap items-start gap-4">
+          <div v-for="(stage, d) in family" :key="d" class="space-y-2">
+            <a v-for="n in stage"
+              :key="n.id"
+              :href="'#/mon/'+encodeURIComponent(n.id)"
+              @click.prevent="goMon(n.id)"
+              class="block rounded-lg border p-2 bg-white hover:shadow transition"
+              :class="n.id === mon.id ? 'ring-2 ring-indigo-400' : ''">
+              <div class="flex items-center gap-2">
+                <img v-if="n.sprite" :src="n.sprite" class="h-8 w-8 rounded bg-slate-100 ring-1 ring-slate-200" alt="" />
+                <span class="font-semibold">{{ n.name }}</span>
+              </div>
+              <div v-for="f in n.from" :key="f.id" class="text-xs text-slate-600">from {{ f.name }}: {{ f.text }}</div>
+            </a>
+          </div>
+        </div>
+      </section>
+
       <!-- Evolutions -->
       <section v-if="evolutions.length" class="space-y-2">
         <h4 class="font-semibold">Evolutions</h4>
@@ -0,0 +1,91 @@
+import { computed, ref, watch } from "https://unpkg.com/vue@3/dist/vue.esm-browser.prod.js";
+import { spriteFrom } from "../utils/helpers.js";
+import { loadMoveTable, loadLearners } from "../utils/moves.js";
+
+const METHOD_ORDER = ["level", "egg", "tm", "tutor"];
+
+export default {
+  props: ["dex", "sprites", "route"],
+  setup(props) {
+    const move = computed(() => (props.route.param || "").toLowerCase());
+    const q = ref("");
+    const allMoves = ref([]);
+    const learners = ref([]);
+    const loading = ref(false);
+    const stale = ref(false);
+
+    loadMoveTable().then((t) => {
+      allMoves.value = t?.moves || [];
+      stale.value = !!t && t.rows !== props.dex.length;
+    });
+
+    const matches = computed(() => {
+      const n = q.value.trim().toLowerCase().replace(/\s+/g, "");
+      return n ? allMoves.value.filter((m) => m.includes(n)).slice(0, 100) : [];
+    });
+
+    watch(
+      move,
+      async (m) => {
+        learners.value = [];
+        if (!m) return;
+        loading.value = true;
+        const rows = (await loadLearners(m)) || [];
+        if (move.value !== m) return;
+        learners.value = rows
+          .map((r) => ({ ...r, mon: props.dex[r.row] }))
+          .filter((r) => r.mon)
+          .sort(
+            (a, b) =>
+              (METHOD_ORDER.indexOf(a.method) + 1 || 99) - (METHOD_ORDER.indexOf(b.method) + 1 || 99) ||
+              a.level - b.level ||
+              String(a.mon.name).localeCompare(String(b.mon.name))
+          );
+        loading.value = false;
+      },
+      { immediate: true }
+    );
+
+    const sprite = (id) => spriteFrom(props.sprites, id);
+    const how = (r) => (r.method === "level" ? `Level ${r.level}` : r.method.replace(/_/g, " "));
+    const back = () =>
+      history.length > 1 ? history.back() : (location.hash = "#/move");
+    return { move, q, matches, learners, loading, stale, sprite, how, back };
+  },
+  template: `
+    <section class="space-y-4">
+      <div v-if="!move">
+        <h2 class="text-xl font-semibold mb-3">Moves</h2>
+        <input v-model="q" type="search" placeholder="Find a move (e.g. earthquake)…"
+               class="w-full md:w-1/2 rounded-xl border-slate-300 focus:border-indigo-500 focus:ring-indigo-500" />
+        <div class="mt-3 flex flex-wrap gap-2">
+          <a v-for="m in matches" :key="m" :href="'#/move/'+encodeURIComponent(m)"
+             class="px-2 py-1 rounded-lg bg-slate-100 text-slate-700 hover:underline">{{ m }}</a>
+        </div>
+      </div>
+      <div v-else>
+        <button class="text-sm text-indigo-700 hover:underline" @click="back">← Back</button>
+        <h2 class="text-xl font-semibold mt-2">Who learns {{ move }}</h2>
+        <div v-if="stale" class="mt-2 text-sm text-amber-700">The move index doesn't match dex.json; regenerate out/.</div>
+        <div v-if="loading" class="mt-3 text-sm text-slate-600">Loading learners…</div>
+        <div v-else-if="!learners.length" class="mt-3 text-sm text-slate-600">No Pokémon learn this move.</div>
+        <table v-else class="mt-3 w-full text-sm bg-white rounded-2xl ring-1 ring-slate-200">
+          <thead class="text-left text-slate-600">
+            <tr><th class="p-2">Pokémon</th><th class="p-2">How</th></tr>
+          </thead>
+          <tbody class="divide-y divide-slate-200">
+            <tr v-for="(r, i) in learners" :key="r.mon.id + ':' + i">
+              <td class="p-2">
+                <a :href="'#/mon/'+encodeURIComponent(r.mon.id)" class="flex items-center gap-2 text-indigo-700 hover:underline">
+                  <img v-if="sprite(r.mon.id)" :src="sprite(r.mon.id)" loading="lazy" class="h-8 w-8 rounded bg-slate-100 ring-1 ring-slate-200" alt="" />
+                  {{ r.mon.name || r.mon.id }}
+                </a>
+              </td>
+              <td class="p-2">{{ how(r) }}</td>
+            </tr>
+          </tbody>
+        </table>
+      </div>
+    </section>
+  `,
+};
@@ -11,17 +11,18 @@ import MonPage from "./components/MonPage.js";
 import PresetPage from "./components/PresetPage.js";
 import BiomePage from "./components/BiomePage.js";
 import DropsPage from "./components/DropsPage.js";
-import { parseRoute } from "./utils/helpers.js";
+import MovePage from "./components/MovePage.js";
+import { parseRoute, spritesFromIcons, dexFromRows } from "./utils/helpers.js";
+import { expandConditions } from "./utils/conditions.js";
+import { prefetchNeighbors } from "./utils/prefetch.js";
 
 createApp({
-  components: { DexList, MonPage, PresetPage, BiomePage, DropsPage },
+  components: { DexList, MonPage, PresetPage, BiomePage, DropsPage, MovePage },
   setup() {
     const dex = ref([]); // now a lean index
     const presets = ref({});
     const biomes = ref({ tags: {}, resolved: {}, all_biomes: [] });
     const sprites = ref({ images: {} });
-    const dropsIndex = ref({ items: [] });
-    const dropItems = computed(() => dropsIndex.value?.items ?? []);
     const loading = ref(true);
     const error = ref(null);
     const route = reactive(parseRoute());
@@ -33,11 +34,23 @@ createApp({
       if (!r.ok) throw new Error("Failed to load " + url);
       return r.json();
     };
+    // in-flight requests are shared, so a prefetch and the page asking for the same mon fetch once
+    const pending = new Map();
     const getMon = async (id) => {
       if (monCache.has(id)) return monCache.get(id);
-      const data = await fetchJson(`./out/mons/${id}.json`);
-      monCache.set(id, data);
-      return data;
+      if (!pending.has(id)) {
+        pending.set(
+          id,
+          fetchJson(`./out/mons/${id}.json`)
+            .then(expandConditions)
+            .then((data) => {
+              monCache.set(id, data);
+              return data;
+            })
+            .finally(() => pending.delete(id))
+        );
+      }
+      return pending.get(id);
     };
 
     const currentView = computed(() => {
@@ -46,28 +59,30 @@ createApp({
       if (v === "preset" || v === "presets") return "PresetPage";
       if (v === "biome" || v === "biomes") return "BiomePage";
       if (v === "drops") return "DropsPage";
+      if (v === "move" || v === "moves") return "MovePage";
       return "DexList";
     });
 
     const loadAll = async () => {
       try {
-        const [d, p, b, s, di] = await Promise.all([
-          fetchJson("./out/dex.json"), // ⟵ moved to /out
+        // drops are loaded by DropsPage itself (out/drops/), only when it is opened
+        const [d, p, b, s] = await Promise.all([
+          fetchJson("./out/dex.json").then(dexFromRows), // ⟵ moved to /out
           fetchJson("./out/presets.json").catch(() => ({})), // ⟵ moved to /out
           fetchJson("./out/biomes.json").catch(() => ({
             tags: {},
             resolved: {},
             all_biomes: [],
           })), // ⟵ moved to /out
-          fetchJson("./out/sprites.json").catch(() => ({ images: {} })), // ⟵ moved to /out
-          fetchJson("./out/drops_index.json").catch(() => ({ items: [] })), // NEW
+          // one icon per species; the full normal/shiny lists live in each mon file
+          fetchJson("./out/sprite_icons.json").catch(() => null),
         ]);
         dex.value = d;
         presets.value = p;
         biomes.value = b;
-        sprites.value = s;
-        dropsIndex.value = di; // NEW
-        console.log("[main] dropsIndex loaded:", dropsIndex.value.items.length);
+        sprites.value =
+          spritesFromIcons(s, d) ||
+          (await fetchJson("./out/sprites.json").catch(() => ({ images: {} })));
       } catch (e) {
         error.value = String(e.message || e);
       } finally {
@@ -79,17 +94,21 @@ createApp({
     provide("getMon", getMon);
     provide("monCache", monCache);
 
+    // load the routed mon, then warm its likely next pages while the browser is idle
+    const openMon = (id) =>
+      getMon(id)
+        .then(() => prefetchNeighbors(id, dex.value, getMon, monCache))
+        .catch(() => {});
+
+    const routedMon = () => route.view === "mon" && (route.params?.id ?? route.param);
+
     onMounted(async () => {
       await loadAll();
       // optional: prefetch current mon if landing directly on a mon route
-      if (route.view === "mon" && route.params?.id) {
-        getMon(route.params.id).catch(() => {});
-      }
+      if (routedMon()) openMon(routedMon());
       window.addEventListener("hashchange", () => {
         Object.assign(route, parseRoute());
-        if (route.view === "mon" && route.params?.id) {
-          getMon(route.params.id).catch(() => {});
-        }
+        if (routedMon()) openMon(routedMon());
       });
     });
 
@@ -98,8 +117,6 @@ createApp({
       presets,
       biomes,
       sprites,
-      dropsIndex,
-      dropItems,
       loading,
       error,
       route,
@@ -110,3 +127,11 @@ createApp({
     };
   },
 }).mount("#app");
+
+// offline cache (site/sw.js); it keys everything off out/precache.json, so a redeploy is picked
+// up on the next page load without bumping anything here
+if ("serviceWorker" in navigator) {
+  window.addEventListener("load", () => {
+    navigator.serviceWorker.register("./sw.js").catch((e) => console.warn("[sw] not registered:", e.message || e));
+  });
+}
@@ -0,0 +1,220 @@
+// Offline cache for the dex. out/precache.json (written by dex_build.py) lists every core index,
+// mon file and sprite with its content hash:
+//   - core files are precached into a cache named after the manifest's build hash;
+//   - mons use stale-while-revalidate, sprites cache-first, both filled as they're viewed;
+//   - when a new manifest shows up, only entries whose hash changed are re-fetched or evicted.
+// Other out/ files (search shards, learners, biome spawns, drops chunks) aren't listed; they are
+// cached as they're fetched and dropped wholesale when the build changes.
+// The app shell (this folder) is served from cache. Each navigation stages the deployed build in
+// the background (its core files and a fresh copy of the shell) and the next navigation switches
+// to it before the page loads, so a page never sees its shell and data come from different
+// deploys; pages already open keep reading the core cache of the build they were loaded with.
+// CDN scripts are served stale-while-revalidate.
+
+const CORE_PREFIX = "dex-core-";
+const MONS = "dex-mons";
+const SPRITES = "dex-sprites";
+const DATA = "dex-data";
+const SHELL = "dex-shell";
+const SHELL_NEXT = "dex-shell-next";
+const META = "dex-meta";
+const MANIFEST = "out/precache.json";
+const PENDING = "pending.json"; // META key of the staged manifest
+const SHELL_FILES = [
+  "./",
+  "index.html",
+  "main.js",
+  "theme.css",
+  "components/DexList.js",
+  "components/MonPage.js",
+  "components/PresetPage.js",
+  "components/BiomePage.js",
+  "components/DropsPage.js",
+  "components/MovePage.js",
+  "utils/helpers.js",
+  "utils/search.js",
+  "utils/moves.js",
+  "utils/conditions.js",
+  "utils/atlas.js",
+  "utils/prefetch.js",
+];
+const CDN_HOSTS = ["unpkg.com", "cdn.tailwindcss.com"];
+
+const abs = (path) => new URL(path, self.registration.scope).href;
+const rel = (url) => url.slice(self.registration.scope.length);
+
+let manifest = null; // Promise<manifest | null>: the one the caches currently match
+const builds = new Map(); // clientId -> build hash its page was loaded with
+
+const storedManifest = () =>
+  (manifest ??= caches
+    .open(META)
+    .then((c) => c.match(abs(MANIFEST)))
+    .then((r) => (r ? r.json() : null))
+    .catch(() => null));
+
+const hashOf = (m, group, key) => m?.[group]?.[key]?.[0];
+
+// Stage the deployed build next to the live one: changed core files go into that build's core
+// cache and the shell into SHELL_NEXT. Nothing the running pages read is touched.
+let syncing = null;
+let promoting = null;
+const sync = () =>
+  (syncing ??= (async () => {
+    await promoting;
+    const meta = await caches.open(META);
+    await meta.delete(abs(PENDING));
+    const res = await fetch(abs(MANIFEST), { cache: "no-cache" });
+    if (!res.ok) return;
+    const next = await res.clone().json();
+    const prev = await storedManifest();
+
+    // shell: re-staged every time (mostly 304s), since a shell-only deploy keeps the build hash
+    const staged = await caches.open(SHELL_NEXT);
+    await Promise.all(
+      SHELL_FILES.map(async (file) => {
+        const res = await fetch(abs(file), { cache: "no-cache" });
+        if (!res.ok) throw new Error(`${file}: ${res.status}`);
+        await staged.put(abs(file), res);
+      })
+    );
+
+    // core: copy unchanged entries from the previous build's cache, fetch the rest
+    if (prev?.build !== next.build) {
+      const core = await caches.open(CORE_PREFIX + next.build);
+      const oldCore = prev ? await caches.open(CORE_PREFIX + prev.build) : null;
+      await Promise.all(
+        Object.keys(next.core).map(async (path) => {
+          const url = abs("out/" + path);
+          const same = hashOf(prev, "core", path) === next.core[path][0];
+          const hit = same && oldCore ? await oldCore.match(url) : null;
+          const res = hit || (await fetch(url, { cache: "no-cache" }));
+          if (!res.ok) throw new Error(`${path}: ${res.status}`);
+          await core.put(url, res);
+        })
+      );
+    }
+    await meta.put(abs(PENDING), res);
+  })()
+    .catch((e) => console.warn("[sw] sync failed:", e.message || e))
+    .finally(() => (syncing = null)));
+
+// Switch to the staged build. Only cache work, no network; runs before a navigation is answered
+// (and is skipped while a sync is still staging, the next navigation picks it up).
+const promote = () =>
+  syncing
+    ? Promise.resolve()
+    : (promoting ??= (async () => {
+        const meta = await caches.open(META);
+        const res = await meta.match(abs(PENDING));
+        if (!res) return;
+        const next = await res.clone().json();
+        const prev = await storedManifest();
+
+        const staged = await caches.open(SHELL_NEXT);
+        const shell = await caches.open(SHELL);
+        for (const req of await staged.keys()) await shell.put(req, await staged.match(req));
+
+        if (prev?.build !== next.build) {
+          // runtime caches: drop whatever the new build changed or removed
+          const evict = async (name, group, keyOf) => {
+            const cache = await caches.open(name);
+            for (const req of await cache.keys()) {
+              const key = keyOf(rel(req.url));
+              if (key != null && hashOf(prev, group, key) !== hashOf(next, group, key)) await cache.delete(req);
+            }
+          };
+          await evict(MONS, "mons", (p) => p.match(/^out\/mons\/(.+)\.json$/)?.[1] ?? null);
+          await evict(SPRITES, "sprites", (p) => (p.startsWith("out/") ? p.slice(4) : null));
+          await caches.delete(DATA);
+        }
+
+        await meta.put(abs(MANIFEST), res);
+        await meta.delete(abs(PENDING));
+        manifest = Promise.resolve(next);
+        // keep older core caches only while a page loaded from them is still open
+        const open = new Set((await self.clients.matchAll()).map((c) => c.id));
+        for (const id of builds.keys()) if (!open.has(id)) builds.delete(id);
+        const keep = new Set([next.build, ...builds.values()].map((b) => CORE_PREFIX + b));
+        for (const name of await caches.keys())
+          if (name.startsWith(CORE_PREFIX) && !keep.has(name)) await caches.delete(name);
+      })()
+        .catch((e) => console.warn("[sw] update failed:", e.message || e))
+        .finally(() => (promoting = null)));
+
+// nothing runs against the caches yet, so the first build is switched to right away
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    sync()
+      .then(promote)
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener("activate", (event) => event.waitUntil(self.clients.claim()));
+
+const staleWhileRevalidate = async (event, cacheName) => {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(event.request);
+  const network = fetch(event.request)
+    .then((res) => {
+      if (res.ok || res.type === "opaque") cache.put(event.request, res.clone());
+      return res;
+    })
+    .catch(() => cached);
+  if (cached) {
+    event.waitUntil(network);
+    return cached;
+  }
+  return network.then((res) => res || Response.error());
+};
+
+const cacheFirst = async (request, cacheName) => {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(request);
+  if (cached) return cached;
+  const res = await fetch(request);
+  if (res.ok) cache.put(request, res.clone());
+  return res;
+};
+
+// the cached page right away; the deployed build is staged in the background for the next one
+const navigate = async (event) => {
+  const promoted = promote();
+  event.waitUntil(sync()); // starts once the promotion is done
+  await promoted;
+  const m = await storedManifest();
+  if (m && event.resultingClientId) builds.set(event.resultingClientId, m.build);
+  const shell = await caches.open(SHELL);
+  const hit = (await shell.match(event.request, { ignoreSearch: true })) || (await shell.match(abs("./")));
+  return hit || fetch(event.request);
+};
+
+const data = async (request, path, clientId) => {
+  const m = await storedManifest();
+  if (!m?.core[path]) return cacheFirst(request, DATA);
+  const build = builds.get(clientId) ?? m.build;
+  const hit = await caches.open(CORE_PREFIX + build).then((c) => c.match(request.url));
+  return hit || fetch(request);
+};
+
+self.addEventListener("fetch", (event) => {
+  const { request } = event;
+  if (request.method !== "GET") return;
+  const url = new URL(request.url);
+
+  if (url.origin !== self.location.origin) {
+    if (CDN_HOSTS.includes(url.hostname)) event.respondWith(staleWhileRevalidate(event, SHELL));
+    return;
+  }
+  if (!request.url.startsWith(self.registration.scope)) return;
+  const path = rel(url.origin + url.pathname);
+
+  if (request.mode === "navigate") return event.respondWith(navigate(event));
+  if (path === MANIFEST) return; // always from the network
+  if (path.startsWith("out/mons/")) return event.respondWith(staleWhileRevalidate(event, MONS));
+  if (path.startsWith("out/sprites/") || path.startsWith("out/atlas/"))
+    return event.respondWith(cacheFirst(request, SPRITES));
+  if (path.startsWith("out/")) return event.respondWith(data(request, path.slice(4), event.clientId));
+  event.respondWith(cacheFirst(request, SHELL));
+});
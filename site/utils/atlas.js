@@ -0,0 +1,25 @@
+// Client for the list-icon atlas written by `dex_build.py --sprite-atlas`: out/atlas.json maps
+// species ids to [sheet, x, y, w, h] in out/atlas/<n>.png.
+
+let atlas = null; // Promise<atlas | null>
+
+export const loadAtlas = () =>
+  (atlas ??= fetch("./out/atlas.json")
+    .then((r) => (r.ok ? r.json() : null))
+    .catch(() => null));
+
+// background style drawing `id`'s icon stretched to size x size px (like the <img> it replaces),
+// or null when the species isn't in the atlas
+export const atlasStyle = (a, id, size) => {
+  const slot = a?.sprites?.[id];
+  const sheet = slot && a.sheets[slot[0]];
+  if (!sheet) return null;
+  const [, x, y, w, h] = slot;
+  const sx = size / w;
+  const sy = size / h;
+  return {
+    backgroundImage: `url(./${sheet.file})`,
+    backgroundSize: `${sheet.w * sx}px ${sheet.h * sy}px`,
+    backgroundPosition: `${-x * sx}px ${-y * sy}px`,
+  };
+};
@@ -0,0 +1,109 @@
+// Reader for out/dex.bundle (dex_build.py --bundle): one ArrayBuffer holding every mon as a
+// fixed-width record plus its JSON, and the other out/ files as named sections. Layout: see
+// "Binary bundle" in dex_build.py. Nothing is decoded until it's asked for.
+//
+//   const b = openBundle(await (await fetch("./out/dex.bundle")).arrayBuffer());
+//   b.record("pikachu").baseStats.speed; b.mon("pikachu"); b.section("dex.json");
+
+const MAGIC = "DEXB";
+const VERSION = 2;
+export const BUNDLE_NONE = 0xffff; // u16 "missing" value
+const STATS = ["hp", "attack", "defence", "special_attack", "special_defence", "speed"];
+
+export const openBundle = (buffer) => {
+  const dv = new DataView(buffer);
+  const bytes = new Uint8Array(buffer);
+  const text = new TextDecoder();
+  const magic = String.fromCharCode(...bytes.subarray(0, 4));
+  const version = dv.getUint16(4, true);
+  if (magic !== MAGIC || version !== VERSION) throw new Error(`Not a v${VERSION} dex bundle`);
+  const u32 = (i) => dv.getUint32(8 + 4 * i, true);
+  const [count, recSize, recordsOff, nStrings, stringsOff, nSections, sectionsOff, blobsOff, total] =
+    [0, 1, 2, 3, 4, 5, 6, 7, 8].map(u32);
+  if (total !== buffer.byteLength) throw new Error("Truncated dex bundle");
+
+  const strData = stringsOff + 4 * (nStrings + 1);
+  const strOff = (i) => dv.getUint32(stringsOff + 4 * i, true);
+  const strBytes = (i) => bytes.subarray(strData + strOff(i), strData + strOff(i + 1));
+  const strings = new Map();
+  const str = (i) => {
+    if (!strings.has(i)) strings.set(i, text.decode(strBytes(i)));
+    return strings.get(i);
+  };
+
+  const sections = new Map();
+  for (let i = 0; i < nSections; i++) {
+    const p = sectionsOff + 12 * i;
+    sections.set(str(dv.getUint32(p, true)), [dv.getUint32(p + 4, true), dv.getUint32(p + 8, true)]);
+  }
+
+  const rec = (i) => recordsOff + i * recSize;
+  const cmp = (a, b) => {
+    for (let k = 0; k < Math.min(a.length, b.length); k++) if (a[k] !== b[k]) return a[k] - b[k];
+    return a.length - b.length;
+  };
+  // binary search over the id-sorted records (UTF-8 byte order); -1 when absent
+  const find = (id) => {
+    const key = new TextEncoder().encode(id);
+    let lo = 0;
+    let hi = count;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      const c = cmp(strBytes(dv.getUint32(rec(mid), true)), key);
+      if (c === 0) return mid;
+      if (c < 0) lo = mid + 1;
+      else hi = mid;
+    }
+    return -1;
+  };
+
+  // field layout mirrors BUNDLE_RECORD: "<IIHIII6H6BHHHII"
+  const recordAt = (i) => {
+    const p = rec(i);
+    const r = {
+      id: str(dv.getUint32(p, true)),
+      name: str(dv.getUint32(p + 4, true)),
+      dexnum: dv.getUint16(p + 8, true),
+      row: dv.getUint32(p + 10, true),
+      primaryType: str(dv.getUint32(p + 14, true)),
+      secondaryType: str(dv.getUint32(p + 18, true)),
+      baseStats: {},
+      evYield: {},
+      catchRate: dv.getUint16(p + 40, true),
+      spawnCount: dv.getUint16(p + 42, true),
+      implemented: (dv.getUint16(p + 44, true) & 1) === 1,
+      blob: [dv.getUint32(p + 46, true), dv.getUint32(p + 50, true)],
+    };
+    STATS.forEach((s, k) => {
+      r.baseStats[s] = dv.getUint16(p + 22 + 2 * k, true);
+      r.evYield[s] = dv.getUint8(p + 34 + k);
+    });
+    return r;
+  };
+
+  const blob = ([off, len]) => bytes.subarray(blobsOff + off, blobsOff + off + len);
+  const record = (id) => {
+    const i = find(id);
+    return i < 0 ? null : recordAt(i);
+  };
+
+  return {
+    size: count,
+    find,
+    recordAt,
+    record,
+    // the mon exactly as in out/mons/<id>.json, or null
+    mon: (id) => {
+      const r = record(id);
+      return r && JSON.parse(text.decode(blob(r.blob)));
+    },
+    sections: () => [...sections.keys()],
+    sectionBytes: (name) => (sections.has(name) ? blob(sections.get(name)) : null),
+    // an out/-relative file ("dex.json", "moves/table.json"), parsed when it's JSON
+    section: (name) => {
+      if (!sections.has(name)) return null;
+      const data = blob(sections.get(name));
+      return name.endsWith(".json") ? JSON.parse(text.decode(data)) : data;
+    },
+  };
+};
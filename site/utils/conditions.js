@@ -0,0 +1,28 @@
+// Spawn condition blocks interned by `dex_build.py --intern-conditions` (out/conditions.json,
+// id -> block). Mon files built that way carry { rarity, weight, levels, source, cond: id } per
+// spawn; the table is fetched once, on the first mon that needs it.
+
+let table = null; // Promise<{ [id]: block }>
+const loadConditions = () =>
+  (table ??= fetch("./out/conditions.json")
+    .then((r) => (r.ok ? r.json() : {}))
+    .catch(() => ({})));
+
+const asGroup = (g) => (Array.isArray(g) ? g : [g]);
+const hasRefs = (mon) =>
+  (mon?.spawns || []).some((g) => asGroup(g).some((s) => s && s.cond));
+
+// mon with every spawn's condition keys restored (mons without refs are returned as-is)
+export const expandConditions = async (mon) => {
+  if (!hasRefs(mon)) return mon;
+  const t = await loadConditions();
+  const expand = (s) => {
+    if (!s?.cond) return s;
+    const { cond, ...own } = s;
+    return { ...(t[cond] || {}), ...own };
+  };
+  return {
+    ...mon,
+    spawns: mon.spawns.map((g) => (Array.isArray(g) ? g.map(expand) : expand(g))),
+  };
+};
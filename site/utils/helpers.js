@@ -46,6 +46,30 @@ export const groupMoves = (list) => {
   return out;
 };
 
+// out/dex.json -> [{ id, name, dexnum, ... }] in row order. The build writes
+// { fields, rows: [[...values in field order]] } already sorted by dex number;
+// older out/ folders hold the object array itself.
+export const dexFromRows = (data) => {
+  if (Array.isArray(data)) return data;
+  const { fields, rows } = data;
+  return rows.map((r) => {
+    const sp = {};
+    fields.forEach((f, i) => (sp[f] = r[i]));
+    return sp;
+  });
+};
+
+// out/sprite_icons.json (one icon per dex.json row) -> the { images: { id: { normal: [path] } } }
+// shape spriteFrom reads; null when it doesn't line up with `dex` (then load sprites.json)
+export const spritesFromIcons = (data, dex) => {
+  if (!data || data.rows !== dex.length) return null;
+  const images = {};
+  data.icons.forEach((icon, row) => {
+    if (icon) images[dex[row].id] = { normal: [`${data.dir}${data.namespaces[icon[0]]}/${icon[1]}.png`] };
+  });
+  return { images };
+};
+
 // works with a ref OR a plain object
 export const spriteFrom = (spritesMaybeRef, id, shiny = false) => {
   const root = spritesMaybeRef && (spritesMaybeRef.value || spritesMaybeRef);
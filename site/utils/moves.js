@@ -0,0 +1,60 @@
+// Client for out/moves/ written by dex_build.py: table.json interns move names and learn
+// methods; mon files reference them as packed ints (moveRefs) and learners/<shard>.json maps
+// each move to the dex.json rows that learn it.
+
+let table = null; // Promise<table | null>
+const shards = new Map(); // key -> Promise<shard | null>
+
+const fetchJson = async (url) => {
+  const r = await fetch(url);
+  if (!r.ok) throw new Error("Failed to load " + url);
+  return r.json();
+};
+
+export const loadMoveTable = () =>
+  (table ??= fetchJson("./out/moves/table.json").catch((e) => {
+    console.warn("[moves] table unavailable:", e.message || e);
+    return null;
+  }));
+
+// ref = move << (methodBits + levelBits) | method << levelBits | level
+const unpack = (ref, t) => {
+  const levelMask = (1 << t.levelBits) - 1;
+  const methodMask = (1 << t.methodBits) - 1;
+  return {
+    move: t.moves[Math.floor(ref / 2 ** (t.levelBits + t.methodBits))],
+    method: t.methods[(ref >> t.levelBits) & methodMask],
+    level: ref & levelMask,
+  };
+};
+
+// back to the source strings ("12:tackle", "tm:earthquake") that splitMove/groupMoves expect
+export const decodeMoveRefs = (refs, t) =>
+  t
+    ? (refs || []).map((ref) => {
+        const { move, method, level } = unpack(ref, t);
+        if (method === "level") return `${level}:${move}`;
+        return method === "other" ? move : `${method}:${move}`;
+      })
+    : [];
+
+// mon files from before moveRefs still carry the raw `moves` strings
+export const monMoves = (mon, t) =>
+  Array.isArray(mon?.moves) ? mon.moves : decodeMoveRefs(mon?.moveRefs, t);
+
+const shardOf = (move) => (move[0] >= "a" && move[0] <= "z" ? move[0] : "0");
+
+// [{ row, method, level }] for one move name (rows index dex.json), or null if unavailable
+export const loadLearners = async (move) => {
+  const t = await loadMoveTable();
+  if (!t || !move) return null;
+  const key = shardOf(move);
+  if (!shards.has(key))
+    shards.set(key, fetchJson(`./out/moves/learners/${key}.json`).catch(() => null));
+  const flat = (await shards.get(key))?.[move];
+  if (!flat) return [];
+  const out = [];
+  for (let i = 0; i < flat.length; i += 3)
+    out.push({ row: flat[i], method: t.methods[flat[i + 1]], level: flat[i + 2] });
+  return out;
+};
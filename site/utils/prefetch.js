@@ -0,0 +1,49 @@
+// Idle-time prefetch of the mon pages a visitor is likely to open next, from out/neighbors.json
+// (written by dex_build.py: nearest evolution stages, adjacent dex numbers, other forms).
+
+let neighbors = null; // Promise<data | null>
+
+const loadNeighbors = () =>
+  (neighbors ??= fetch("./out/neighbors.json")
+    .then((r) => (r.ok ? r.json() : null))
+    .catch(() => null));
+
+const idle = (cb) =>
+  window.requestIdleCallback ? window.requestIdleCallback(cb, { timeout: 2000 }) : setTimeout(cb, 200);
+
+let queue = [];
+let running = false;
+
+// one fetch per idle period, so prefetching never competes with the page that was just opened
+const drain = () => {
+  if (running || !queue.length) return;
+  running = true;
+  idle(() => {
+    // the queue may have been replaced (and emptied) by a newer page while we waited
+    const next = queue.shift();
+    if (!next) {
+      running = false;
+      return;
+    }
+    const [id, getMon] = next;
+    getMon(id)
+      .catch(() => {})
+      .finally(() => {
+        running = false;
+        drain();
+      });
+  });
+};
+
+export const prefetchNeighbors = async (id, dex, getMon, monCache) => {
+  const data = await loadNeighbors();
+  if (!data || data.rows !== dex.length) return;
+  const row = dex.findIndex((d) => d.id === id);
+  if (row < 0) return;
+  // the newest page wins: drop hints queued for the previous one
+  queue = (data.neighbors[row] || [])
+    .map((r) => dex[r]?.id)
+    .filter((n) => n && !monCache.has(n))
+    .map((n) => [n, getMon]);
+  drain();
+};
@@ -0,0 +1,109 @@
+// Client for the sharded inverted index written by dex_build.py (out/search/).
+// Shards are keyed by a token's first character and fetched on demand, so a query
+// like "move:surf ability:swift" downloads two small files instead of every mon JSON.
+
+export const SEARCH_FIELDS = ["name", "ability", "move", "egg", "label", "biome"];
+
+const FIELD_ALIASES = {
+  abilities: "ability",
+  moves: "move",
+  egggroup: "egg",
+  egggroups: "egg",
+  labels: "label",
+  biomes: "biome",
+};
+
+// Mirrors search_tokens() in dex_build.py
+export const tokenize = (s) =>
+  String(s || "")
+    .normalize("NFKD")
+    .replace(/[\u0300-\u036f]/g, "")
+    .toLowerCase()
+    .split(/[^a-z0-9]+/)
+    .filter(Boolean);
+
+// "char move:flame thrower egg:dragon" ->
+//   { text: "char", terms: [{field:"move",prefix:"flamethrower"}, {field:"egg",prefix:"dragon"}] }
+// A field term runs until the next "field:" so multi-word values need no quoting; its words
+// are joined (the index stores both single words and joined multi-word values).
+export const parseQuery = (q) => {
+  const text = [];
+  const terms = [];
+  let current = null;
+  for (const word of String(q || "").trim().split(/\s+/).filter(Boolean)) {
+    const m = word.match(/^([a-z]+):(.*)$/i);
+    const field = m && (FIELD_ALIASES[m[1].toLowerCase()] || m[1].toLowerCase());
+    if (m && SEARCH_FIELDS.includes(field)) {
+      current = { field, tokens: tokenize(m[2]) };
+      terms.push(current);
+    } else if (current) {
+      current.tokens.push(...tokenize(word));
+    } else {
+      text.push(word);
+    }
+  }
+  return {
+    text: text.join(" "),
+    terms: terms
+      .filter((t) => t.tokens.length)
+      .map(({ field, tokens }) => ({ field, prefix: tokens.join("") })),
+  };
+};
+
+const shardOf = (token) => (token[0] >= "a" && token[0] <= "z" ? token[0] : "0");
+
+const decodeRows = (deltas) => {
+  let row = 0;
+  return deltas.map((d) => (row += d));
+};
+
+export const createSearchIndex = (base = "./out/search") => {
+  let manifest = null; // Promise<manifest | null>
+  const shards = new Map(); // key -> Promise<shard | null>
+
+  const fetchJson = async (url) => {
+    const r = await fetch(url);
+    if (!r.ok) throw new Error("Failed to load " + url);
+    return r.json();
+  };
+  const loadManifest = () =>
+    (manifest ??= fetchJson(`${base}/manifest.json`).catch((e) => {
+      console.warn("[search] index unavailable:", e.message || e);
+      return null;
+    }));
+  const loadShard = (key) => {
+    if (!shards.has(key))
+      shards.set(key, fetchJson(`${base}/${key}.json`).catch(() => null));
+    return shards.get(key);
+  };
+
+  // rows whose `field` has a token starting with `prefix`
+  const prefixRows = async (field, prefix) => {
+    const shard = await loadShard(shardOf(prefix));
+    const out = new Set();
+    for (const [token, deltas] of Object.entries(shard?.[field] || {})) {
+      if (token.startsWith(prefix)) for (const r of decodeRows(deltas)) out.add(r);
+    }
+    return out;
+  };
+
+  // Set of dex.json row numbers matching every term (AND), or null if the
+  // query has no field terms or the index is missing/stale for `rowCount` rows.
+  const lookup = async (terms, rowCount) => {
+    if (!terms.length) return null;
+    const m = await loadManifest();
+    if (!m) return null;
+    if (m.rows !== rowCount) {
+      console.warn(`[search] index has ${m.rows} rows, dex has ${rowCount}; ignoring it`);
+      return null;
+    }
+    const sets = await Promise.all(
+      terms.map(({ field, prefix }) => prefixRows(field, prefix))
+    );
+    sets.sort((a, b) => a.size - b.size);
+    const [first, ...rest] = sets;
+    return new Set([...first].filter((r) => rest.every((s) => s.has(r))));
+  };
+
+  return { lookup };
+};
@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / "scripts"))
+sys.path.insert(0, str(REPO))
+
+import dex_build  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clean_build_state(monkeypatch):
+    """dex_build keeps the parse log and the watch-mode jar cache at module level."""
+    monkeypatch.setattr(dex_build, "_PARSE_LOG", {"strict": 0, "strict_seconds": 0.0, "files": {}, "moves": {}})
+    monkeypatch.setattr(dex_build, "_ARCHIVE_CACHE", None)
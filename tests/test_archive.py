@@ -0,0 +1,55 @@
+import json
+import os
+import zipfile
+
+import dex_build
+from dex_build import open_archive, read_jsons_from_zip
+
+
+def make_jar(path, entries):
+    with zipfile.ZipFile(path, "w") as z:
+        for name, obj in entries.items():
+            z.writestr(name, obj if isinstance(obj, str) else json.dumps(obj))
+    return path
+
+
+def test_predicate_skips_entries_before_reading(tmp_path):
+    jar = make_jar(tmp_path / "mod.jar", {
+        "data/ns/tags/block/ores.json": {"values": ["minecraft:stone"]},
+        "data/ns/tags/blocks/old.json": {"values": []},
+        "data/ns/loot_tables/x.json": "{not json",
+        "assets/ns/models/block/x.json": {"parent": "block/cube"},
+    })
+    with open_archive(jar) as z:
+        got = dict(read_jsons_from_zip(z, "data/", dex_build._is_block_tag))
+    assert sorted(got) == ["data/ns/tags/block/ores.json", "data/ns/tags/blocks/old.json"]
+    assert dex_build._PARSE_LOG["strict"] == 2
+    assert dex_build._PARSE_LOG["files"] == {}  # the broken loot table was never opened
+
+
+def test_watch_cache_holds_only_requested_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(dex_build, "_ARCHIVE_CACHE", {})
+    jar = make_jar(tmp_path / "mod.jar", {
+        "data/ns/spawn_pool_world/a.json": {"spawns": []},
+        "data/ns/species/b.json": {"name": "B"},
+        "assets/ns/lang/en_us.json": {"k": "v"},
+    })
+    want = lambda n: "/spawn_pool_world/" in n
+    for _ in range(2):
+        with open_archive(jar) as z:
+            assert [n for n, _ in read_jsons_from_zip(z, "data/", want)] == ["data/ns/spawn_pool_world/a.json"]
+    (sig, entries), = dex_build._ARCHIVE_CACHE.values()
+    assert list(entries) == ["data/ns/spawn_pool_world/a.json"]
+    assert dex_build._PARSE_LOG["strict"] == 1  # second pass served from the cache
+
+
+def test_watch_cache_drops_a_changed_jar(tmp_path, monkeypatch):
+    monkeypatch.setattr(dex_build, "_ARCHIVE_CACHE", {})
+    jar = make_jar(tmp_path / "mod.jar", {"data/ns/species/a.json": {"name": "A"}})
+    with open_archive(jar) as z:
+        assert dict(read_jsons_from_zip(z, "data/"))["data/ns/species/a.json"] == {"name": "A"}
+    make_jar(jar, {"data/ns/species/a.json": {"name": "Changed"}})
+    st = jar.stat()
+    os.utime(jar, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    with open_archive(jar) as z:
+        assert dict(read_jsons_from_zip(z, "data/"))["data/ns/species/a.json"] == {"name": "Changed"}
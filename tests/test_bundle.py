@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+import dex_build
+from dex_build import BUNDLE_NONE, BUNDLE_RECORD, _u16, build_bundle
+from dex_bundle import DexBundle
+
+MONS = {
+    "bulbasaur": {"name": "Bulbasaur", "dexnum": 1, "primaryType": "grass", "secondaryType": "poison",
+                  "baseStats": {"hp": 45, "attack": 49, "defence": 49, "special_attack": 65,
+                                "special_defence": 65, "speed": 45},
+                  "evYield": {"special_attack": 1}, "catchRate": 45, "implemented": True},
+    "missingno": {"name": "MissingNo.", "dexnum": "?", "baseStats": {"hp": 70000, "attack": -1},
+                  "evYield": {"hp": 999}, "implemented": False},
+    "pikachu": {"name": "Pikachu", "dexnum": 25, "primaryType": "electric", "catchRate": "190",
+                "implemented": True},
+}
+
+
+@pytest.fixture
+def bundle_path(tmp_path, monkeypatch):
+    out = tmp_path / "out"
+    monkeypatch.setattr(dex_build, "OUT_DIR", out)
+    monkeypatch.setattr(dex_build, "MONS_DIR", out / "mons")
+    monkeypatch.setattr(dex_build, "BUNDLE_OUT", out / "dex.bundle")
+    (out / "mons").mkdir(parents=True)
+    (out / "moves").mkdir()
+    for sid, mon in MONS.items():
+        (out / "mons" / f"{sid}.json").write_text(json.dumps(mon))
+    (out / "dex.json").write_text(json.dumps([{"id": sid} for sid in MONS]))
+    (out / "moves" / "table.json").write_text('{"moves": []}')
+    (out / "parse_report.json").write_text("{}")
+    order = ["pikachu", "bulbasaur", "missingno"]
+    ctx = {"mon_order": order,
+           "dex_rows": {"pikachu": {"spawnCount": 3}, "bulbasaur": {}, "missingno": {"spawnCount": 10**6}}}
+    (out / "dex.bundle").write_bytes(build_bundle(ctx))
+    return out / "dex.bundle"
+
+
+def test_records_round_trip(bundle_path):
+    with DexBundle(bundle_path) as b:
+        assert b.ids == sorted(MONS)
+        bulba = b.record("bulbasaur")
+        assert (bulba.name, bulba.dexnum, bulba.row) == ("Bulbasaur", 1, 1)
+        assert (bulba.primaryType, bulba.secondaryType) == ("grass", "poison")
+        assert (bulba.hp, bulba.special_attack, bulba.ev_special_attack, bulba.ev_hp) == (45, 65, 1, 0)
+        assert (bulba.catchRate, bulba.spawnCount, bulba.implemented) == (45, 0, True)
+        pika = b.record("pikachu")
+        assert (pika.row, pika.secondaryType, pika.catchRate, pika.spawnCount) == (0, "", 190, 3)
+        assert "eevee" not in b
+        with pytest.raises(KeyError):
+            b.record("eevee")
+
+
+def test_out_of_range_numbers_are_none_or_clamped(bundle_path):
+    with DexBundle(bundle_path) as b:
+        mon = b.record("missingno")
+        assert (mon.dexnum, mon.hp, mon.attack, mon.speed, mon.catchRate) == (BUNDLE_NONE,) * 5
+        assert (mon.ev_hp, mon.spawnCount, mon.implemented) == (255, BUNDLE_NONE, False)
+
+
+def test_mon_blobs_and_sections_round_trip(bundle_path):
+    with DexBundle(bundle_path) as b:
+        assert {sid: b.mon(sid) for sid in MONS} == MONS
+        assert sorted(b.sections()) == ["dex.json", "moves/table.json"]  # no mons/, diagnostics or itself
+        assert b.section("dex.json") == [{"id": sid} for sid in MONS]
+
+
+def test_truncated_bundle_is_rejected(bundle_path):
+    bundle_path.write_bytes(bundle_path.read_bytes()[:-1])
+    with pytest.raises(ValueError, match="truncated"):
+        DexBundle(bundle_path)
+
+
+@pytest.mark.parametrize("value, packed", [
+    (0, 0), (65534, 65534), (65535, BUNDLE_NONE), (-1, BUNDLE_NONE), ("12", 12), (None, BUNDLE_NONE), ("x", BUNDLE_NONE),
+])
+def test_u16(value, packed):
+    assert _u16(value) == packed
+
+
+def test_dex_row_is_wider_than_u16():
+    fields = [0] * 23
+    fields[3] = 0x10000 + 7  # dex.json row
+    fields[-1] = 0xFFFFFFFF  # blob length
+    assert BUNDLE_RECORD.unpack(BUNDLE_RECORD.pack(*fields)) == tuple(fields)
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+import dex_build
+from dex_build import _json5_to_json, _parse_lenient, read_json_from_fs
+
+
+def lenient(text):
+    converted, fixes = _json5_to_json(text)
+    return json.loads(converted), dict(fixes)
+
+
+def test_strict_json_needs_no_fixes():
+    text = '{"a": [1, 2.5, "x"], "b": {"c": null, "d": true}}'
+    obj, fixes = lenient(text)
+    assert obj == json.loads(text)
+    assert not fixes
+
+
+@pytest.mark.parametrize("text, expected, fix", [
+    ('{"a": 1, // note\n"b": 2}', {"a": 1, "b": 2}, "comments"),
+    ('{"a": /* x, y */ 1}', {"a": 1}, "comments"),
+    ('{"a": [1, 2,], "b": 3,}', {"a": [1, 2], "b": 3}, "trailing_commas"),
+    ("{'a': 'it\\'s'}", {"a": "it's"}, "single_quotes"),
+    ('{a: 1, $b_2: 2}', {"a": 1, "$b_2": 2}, "unquoted_keys"),
+    ('﻿{"a": 1}', {"a": 1}, "bom"),
+])
+def test_json5_fixes(text, expected, fix):
+    obj, fixes = lenient(text)
+    assert obj == expected
+    assert fixes.get(fix)
+
+
+def test_comment_markers_inside_strings_are_kept():
+    obj, fixes = lenient('{"url": "http://x/*y*/", "s": "a,]", }')
+    assert obj == {"url": "http://x/*y*/", "s": "a,]"}
+    assert fixes == {"trailing_commas": 1}
+
+
+def test_double_quotes_inside_single_quoted_strings_are_escaped():
+    obj, _ = lenient("{'say': 'a \"b\"'}")
+    assert obj == {"say": 'a "b"'}
+
+
+def test_parse_lenient_records_recovered_and_failed_files():
+    err = ValueError("strict failed")
+    assert _parse_lenient(lambda: b"{a: 1,}", "ok.json", err, 0.001) == {"a": 1}
+    assert _parse_lenient(lambda: b"{\"a\": ", "bad.json", err, 0.001) is None
+    files = dex_build._PARSE_LOG["files"]
+    assert files["ok.json"]["status"] == "recovered"
+    assert files["ok.json"]["fixes"] == {"trailing_commas": 1, "unquoted_keys": 1}
+    assert files["bad.json"]["status"] == "failed"
+    assert files["bad.json"]["strictError"].startswith("ValueError")
+
+
+def test_fixed_file_leaves_the_report(tmp_path):
+    p = tmp_path / "species.json"
+    p.write_text("{'name': 'Bulbasaur'}", encoding="utf-8")
+    assert read_json_from_fs(p) == {"name": "Bulbasaur"}
+    assert dex_build._PARSE_LOG["files"][p.as_posix()]["status"] == "recovered"
+    p.write_text('{"name": "Bulbasaur"}', encoding="utf-8")  # watch mode: the author fixed it
+    assert read_json_from_fs(p) == {"name": "Bulbasaur"}
+    assert p.as_posix() not in dex_build._PARSE_LOG["files"]
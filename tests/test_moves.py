@@ -0,0 +1,64 @@
+import pytest
+
+import dex_build
+from dex_build import (
+    MOVE_LEVEL_BITS, MOVE_METHOD_BITS, MOVE_METHODS, _moves_field, build_move_table, encode_moves, parse_move,
+)
+
+
+@pytest.mark.parametrize("entry, parsed", [
+    ("12:tackle", ("level", "tackle", 12)),
+    ("0:growl", ("level", "growl", 0)),
+    ("tm:earthquake", ("tm", "earthquake", 0)),
+    ("Egg:Curse", ("egg", "Curse", 0)),
+    ("tackle", ("other", "tackle", 0)),
+    (" 5 : ember ", ("level", "ember", 5)),
+    ("legacy:surf:extra", ("legacy", "surf", 0)),
+])
+def test_parse_move(entry, parsed):
+    assert parse_move(entry) == parsed
+
+
+def species_ctx(moves_by_species):
+    ctx = {"mon_order": list(moves_by_species),
+           "species_full": {sid: {"moves": moves} for sid, moves in moves_by_species.items()}}
+    ctx["move_table"] = build_move_table(ctx)
+    return ctx
+
+
+def unpack(ref, table):
+    level = ref & ((1 << MOVE_LEVEL_BITS) - 1)
+    method = table["methods"][(ref >> MOVE_LEVEL_BITS) & ((1 << MOVE_METHOD_BITS) - 1)]
+    return method, table["moves"][ref >> (MOVE_LEVEL_BITS + MOVE_METHOD_BITS)], level
+
+
+def test_table_keeps_fixed_method_ids_then_sorted_extras():
+    ctx = species_ctx({"a": ["zz:x", "1:y", "aa:z", "w"]})
+    assert ctx["move_table"]["methods"] == [*MOVE_METHODS, "aa", "other", "zz"]
+    assert ctx["move_table"]["moves"] == ["w", "x", "y", "z"]
+
+
+def test_refs_round_trip_in_source_order():
+    ctx = species_ctx({"a": ["1:tackle", "tm:surf", "egg:curse", "1023:splash", "tutor:tackle", "growl"]})
+    refs = encode_moves(ctx["move_lists"]["a"], ctx["move_table"])
+    assert [unpack(r, ctx["move_table"]) for r in refs] == ctx["move_lists"]["a"]
+
+
+@pytest.mark.parametrize("moves", [
+    ["1:tackle", f"{1 << MOVE_LEVEL_BITS}:tackle"],               # level past the bit width
+    ["1:tackle"] + [f"m{i:02d}:growl" for i in range(1 << MOVE_METHOD_BITS)],  # method id past it
+])
+def test_unpackable_moves_keep_the_raw_strings(moves):
+    ctx = species_ctx({"a": moves})
+    assert encode_moves(ctx["move_lists"]["a"], ctx["move_table"]) is None
+    field = _moves_field("a", ctx["species_full"]["a"], ctx)
+    assert field == {"moves": moves}
+    reported = dex_build._PARSE_LOG["moves"]["a"]
+    assert reported and set(reported) <= set(moves) and "1:tackle" not in reported
+
+
+def test_packable_moves_clear_an_earlier_report():
+    ctx = species_ctx({"a": ["1:tackle"]})
+    dex_build._PARSE_LOG["moves"]["a"] = ["9999:tackle"]
+    assert "moveRefs" in _moves_field("a", ctx["species_full"]["a"], ctx)
+    assert "a" not in dex_build._PARSE_LOG["moves"]
@@ -0,0 +1,129 @@
+import struct
+import zlib
+
+import pytest
+
+from dex_build import (
+    _png_chunk, PNG_SIG, pack_shelves, png_decode, png_downscale, png_encode, png_strip,
+)
+
+
+def make_png(w, h, depth, ctype, rows, extra=(), interlace=0):
+    """A PNG built by hand: each row is unfiltered (filter byte 0) raw scanline bytes."""
+    ihdr = struct.pack(">IIBBBBB", w, h, depth, ctype, 0, 0, interlace)
+    raw = b"".join(b"\0" + bytes(row) for row in rows)
+    return b"".join((PNG_SIG, _png_chunk(b"IHDR", ihdr), *(_png_chunk(k, b) for k, b in extra),
+                     _png_chunk(b"IDAT", zlib.compress(raw)), _png_chunk(b"IEND", b"")))
+
+
+def gradient(w, h):
+    """RGBA with varied pixels, so every scanline filter gets picked somewhere."""
+    return bytearray(v for y in range(h) for x in range(w)
+                     for v in ((x * 37) & 255, (y * 11 + x) & 255, (x * y) & 255, 0 if (x + y) % 5 == 0 else 255 - x))
+
+
+@pytest.mark.parametrize("w, h", [(1, 1), (7, 3), (32, 32)])
+def test_encode_decode_round_trip(w, h):
+    rgba = gradient(w, h)
+    assert png_decode(png_encode(w, h, rgba)) == (w, h, rgba)
+
+
+def test_decodes_palette_with_transparency():
+    palette = bytes((255, 0, 0, 0, 255, 0, 0, 0, 255, 9, 9, 9))
+    rows = [(0b00011011,), (0b11100100,)]  # 2-bit indices 0 1 2 3 / 3 2 1 0
+    data = make_png(4, 2, 2, 3, rows, extra=[(b"PLTE", palette), (b"tRNS", b"\x00\x80")])
+    w, h, rgba = png_decode(data)
+    px = [tuple(rgba[i:i + 4]) for i in range(0, len(rgba), 4)]
+    assert (w, h) == (4, 2)
+    assert px[:4] == [(255, 0, 0, 0), (0, 255, 0, 128), (0, 0, 255, 255), (9, 9, 9, 255)]
+    assert px[4:] == px[3::-1]
+
+
+@pytest.mark.parametrize("depth, ctype, row, expected", [
+    (8, 2, (1, 2, 3, 4, 5, 6), (1, 2, 3, 255, 4, 5, 6, 255)),                    # RGB
+    (8, 0, (7, 200), (7, 7, 7, 255, 200, 200, 200, 255)),                         # gray
+    (8, 4, (7, 1, 200, 2), (7, 7, 7, 1, 200, 200, 200, 2)),                       # gray + alpha
+    (16, 6, (1, 99, 2, 99, 3, 99, 4, 99) * 2, (1, 2, 3, 4) * 2),                  # RGBA16 keeps the high byte
+])
+def test_decodes_other_color_types(depth, ctype, row, expected):
+    assert png_decode(make_png(2, 1, depth, ctype, [row])) == (2, 1, bytearray(expected))
+
+
+@pytest.mark.parametrize("data", [
+    b"GIF89a" + bytes(32),
+    make_png(2, 1, 8, 6, [bytes(8)], interlace=1),
+    make_png(8, 1, 1, 0, [(0b10101010,)]),  # 1-bit gray
+    make_png(1, 1, 8, 3, [(0,)]),           # palette PNG without PLTE
+    make_png(2, 2, 8, 6, [bytes(8)]),       # fewer rows than the header says
+])
+def test_unsupported_or_broken_pngs_decode_to_none(data):
+    assert png_decode(data) is None
+
+
+def test_downscale_keeps_flat_colors_and_ignores_transparent_pixels():
+    rgba = bytearray((10, 20, 30, 255, 0, 0, 0, 0) * 8)  # 4x4, every other pixel transparent black
+    assert png_downscale(4, 4, rgba, 2, 2) == bytearray((10, 20, 30, 128) * 4)
+
+
+def test_pack_shelves_places_everything_without_overlap():
+    sizes = {f"s{i}": (8 + i % 5 * 7, 6 + i % 3 * 9) for i in range(60)}
+    placed, sheets = pack_shelves(sizes, 64)
+    assert set(placed) == set(sizes) and len(sheets) > 1
+    boxes = {}
+    for key, (sheet, x, y) in placed.items():
+        w, h = sizes[key]
+        assert x + w <= sheets[sheet][0] <= 64 and y + h <= sheets[sheet][1] <= 64
+        boxes.setdefault(sheet, []).append((x, y, x + w, y + h))
+    for rects in boxes.values():
+        for i, (ax, ay, bx, by) in enumerate(rects):
+            for cx, cy, dx, dy in rects[i + 1:]:
+                assert bx <= cx or dx <= ax or by <= cy or dy <= ay
+
+
+def chunk_kinds(data):
+    pos, kinds = 8, []
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        kinds.append(kind)
+        pos += 12 + length
+    return kinds
+
+
+def with_metadata(data, chunks):
+    """data with extra chunks right after IHDR (IHDR is always 25 bytes in)."""
+    return data[:33] + b"".join(_png_chunk(k, b) for k, b in chunks) + data[33:]
+
+
+def test_strip_drops_metadata_and_keeps_pixels():
+    rgba = gradient(16, 16)
+    src = with_metadata(make_png(16, 16, 8, 6, [rgba[y * 64:(y + 1) * 64] for y in range(16)]),
+                        [(b"iTXt", b"XML:com.adobe.xmp\0" + b"x" * 4000), (b"sRGB", b"\0"), (b"tEXt", b"Software\0y")])
+    out = png_strip(src)
+    assert len(out) < len(src)
+    assert chunk_kinds(out) == [b"IHDR", b"sRGB", b"IDAT", b"IEND"]
+    assert png_decode(out) == png_decode(src) == (16, 16, rgba)
+
+
+def test_strip_merges_split_idat_in_place():
+    palette = bytes(range(12))
+    rows = [(i % 4,) * 6 for i in range(6)]
+    one = make_png(6, 6, 8, 3, rows, extra=[(b"PLTE", palette)])
+    idat = zlib.compress(b"".join(b"\0" + bytes(r) for r in rows), 0)
+    split = one[:one.index(b"IDAT") - 4] + b"".join(
+        _png_chunk(b"IDAT", idat[i:i + 5]) for i in range(0, len(idat), 5)) + _png_chunk(b"IEND", b"")
+    out = png_strip(split)
+    assert chunk_kinds(out) == [b"IHDR", b"PLTE", b"IDAT", b"IEND"]
+    assert png_decode(out) == png_decode(one)
+
+
+def test_strip_never_grows_the_file():
+    src = png_encode(8, 8, gradient(8, 8))
+    assert png_strip(src) == src
+
+
+@pytest.mark.parametrize("data", [
+    b"GIF89a" + bytes(32),
+    with_metadata(png_encode(4, 4, bytes(64)), [(b"acTL", struct.pack(">II", 2, 0)), (b"tEXt", b"k\0" + b"v" * 500)]),
+])
+def test_strip_leaves_non_png_and_apng_alone(data):
+    assert png_strip(data) is data
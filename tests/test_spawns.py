@@ -0,0 +1,69 @@
+from dex_build import invert_spawns_by_biome, spawn_odds
+
+TAGS = {"#c:forest": ["minecraft:forest", "#c:birch"], "#c:birch": ["minecraft:birch_forest"]}
+
+
+def spawn(include, exclude=(), **extra):
+    return {"rarity": "common", "weight": 10, "levels": "5-10", "contexts": ["grounded"],
+            "biomeTags": {"include": list(include), "exclude": list(exclude)}, **extra}
+
+
+def invert(spawns_by_species):
+    ctx = {"mon_order": list(spawns_by_species), "spawn_entries": spawns_by_species, "biome_tag_map": TAGS}
+    return invert_spawns_by_biome(ctx)
+
+
+def test_tags_expand_to_concrete_biomes_minus_excludes():
+    by_biome = invert({"pidgey": [[spawn(["#c:forest"], ["minecraft:birch_forest"])]]})
+    assert sorted(by_biome) == ["minecraft:forest"]
+    assert by_biome["minecraft:forest"] == [
+        {"id": "pidgey", "rarity": "common", "weight": 10, "levels": "5-10", "contexts": ["grounded"]}]
+
+
+def test_copies_of_one_spawn_in_several_pools_count_once():
+    jar = spawn(["minecraft:plains"], source="mod.jar!/data/x/spawn_pool_world/pidgey.json")
+    datapack = spawn(["minecraft:plains"], source="datapacks/x/data/x/spawn_pool_world/pidgey.json")
+    assert len(invert({"pidgey": [[jar], [datapack]]})["minecraft:plains"]) == 1
+
+
+def test_spawns_differing_outside_the_row_are_kept():
+    outpost = spawn(["minecraft:plains"], presets=["pillager_outpost"])
+    mansion = spawn(["minecraft:plains"], presets=["mansion"])
+    rows = invert({"maschiff": [[outpost, mansion]]})["minecraft:plains"]
+    assert len(rows) == 2 and rows[0] == rows[1]
+
+
+def row(sid, weight, rarity="common", contexts=("grounded",), times=None):
+    r = {"id": sid, "rarity": rarity, "weight": weight, "contexts": list(contexts)}
+    if times:
+        r["times"] = list(times)
+    return r
+
+
+def test_odds_are_weight_shares_within_a_bucket():
+    odds = spawn_odds([row("a", 30), row("b", 10), row("a", 10)])
+    assert odds == {"common": {"grounded": {"anytime": {"a": 80.0, "b": 20.0}}}}
+
+
+def test_untimed_spawns_count_toward_every_time():
+    odds = spawn_odds([row("a", 10), row("b", 10, times=["night"]), row("c", 20, times=["day", "night"])])
+    assert odds["common"]["grounded"] == {
+        "anytime": {"a": 100.0},
+        "day": {"c": 66.67, "a": 33.33},
+        "night": {"c": 50.0, "a": 25.0, "b": 25.0},
+    }
+
+
+def test_buckets_and_contexts_are_separate_tables():
+    odds = spawn_odds([
+        row("a", 1, rarity="rare"), row("b", 1, rarity="common"),
+        row("c", 1, contexts=("grounded", "surface")), row("d", 1, contexts=()),
+    ])
+    assert list(odds) == ["common", "rare"]  # RARITY_ORDER, not alphabetical
+    assert odds["common"]["surface"]["anytime"] == {"c": 100.0}
+    assert odds["common"]["any"]["anytime"] == {"d": 100.0}
+    assert odds["rare"]["grounded"]["anytime"] == {"a": 100.0}
+
+
+def test_spawns_without_a_positive_weight_are_ignored():
+    assert spawn_odds([row("a", 0), row("b", None), row("c", "10"), row("d", -5)]) == {}